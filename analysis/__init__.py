@@ -0,0 +1,5 @@
+"""
+Shared helpers for the traffic-revenue analysis scripts.
+
+Used by run_analysis.py, run_analysis_with_visuals.py and analysis.ipynb.
+"""
@@ -0,0 +1,130 @@
+"""
+Join-based alignment of traffic snapshots with monthly revenue.
+
+Replaces the per-row helpers (get_same_month_latest / get_same_month_avg /
+get_lagged_traffic), which each scanned the whole traffic frame, with one
+groupby for the same-month methods and a pair of merge_asof joins per lag.
+Results are the same as the helpers, including their tie-breaking:
+
+    latest  last snapshot inside the revenue month (first row for that date)
+    avg     mean of every snapshot inside the revenue month
+    lagN    snapshot closest to month end - N days, within tolerance_days;
+            equal distances go to the row that comes first in traffic_long
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LAGS = (30, 60)
+LAG_TOLERANCE_DAYS = 30
+
+
+def method_columns(lags=DEFAULT_LAGS):
+    """Combined-dataset traffic columns in the order the scripts report them."""
+    return ['traffic_latest', 'traffic_avg'] + [f'traffic_lag{lag}' for lag in lags]
+
+
+def _month_start(dates):
+    return dates.dt.to_period('M').dt.to_timestamp()
+
+
+def _snapshots(traffic_long):
+    """traffic_long with its row position, one row per (website, date)."""
+    snaps = traffic_long[['website', 'date', 'traffic']].copy()
+    snaps['pos'] = np.arange(len(snaps))
+    return snaps.drop_duplicates(['website', 'date'], keep='first')
+
+
+def month_aggregates(traffic_long):
+    """
+    Same-month latest and average traffic for every (website, month).
+
+    Returns:
+        DataFrame with website, month, traffic_latest, traffic_avg
+    """
+    months = _month_start(traffic_long['date'])
+    avg = (traffic_long.assign(month=months)
+           .groupby(['website', 'month'], sort=False)['traffic'].mean()
+           .rename('traffic_avg'))
+
+    snaps = _snapshots(traffic_long)
+    snaps['month'] = _month_start(snaps['date'])
+    latest = (snaps.sort_values(['website', 'month', 'date'], kind='mergesort')
+              .groupby(['website', 'month'], sort=False)['traffic'].last()
+              .rename('traffic_latest'))
+
+    return pd.concat([latest, avg], axis=1).reset_index()
+
+
+def lagged_snapshots(keys, traffic_long, lag_days, tolerance_days=LAG_TOLERANCE_DAYS, snaps=None):
+    """
+    Traffic closest to (month end - lag_days) for each (website, month) key.
+
+    Args:
+        keys: DataFrame with website and month (first of month) columns
+        traffic_long: DataFrame with website, date, traffic columns
+        lag_days: Days before month end to look up
+        tolerance_days: Maximum distance from the target date
+        snaps: Optional precomputed _snapshots(traffic_long)
+
+    Returns:
+        Series of traffic values aligned with keys.index (NaN when nothing
+        is within tolerance)
+    """
+    if snaps is None:
+        snaps = _snapshots(traffic_long)
+    tolerance = pd.Timedelta(days=tolerance_days)
+
+    left = keys[['website', 'month']].copy()
+    left['row'] = np.arange(len(left))
+    left['target'] = left['month'] + pd.offsets.MonthEnd(0) - pd.Timedelta(days=lag_days)
+    left = left.sort_values('target', kind='mergesort')
+    right = snaps.sort_values('date', kind='mergesort')
+
+    # Nearest neighbour on each side, then pick the closer one (ties -> earlier row)
+    picks = []
+    for direction in ('backward', 'forward'):
+        matched = pd.merge_asof(left, right, left_on='target', right_on='date', by='website',
+                                direction=direction, tolerance=tolerance)
+        matched['dist'] = (matched['date'] - matched['target']).abs()
+        picks.append(matched.set_index('row')[['dist', 'pos', 'traffic']])
+    back, fwd = picks[0].sort_index(), picks[1].sort_index()
+
+    use_fwd = back['traffic'].isna() | (
+        fwd['traffic'].notna() & ((fwd['dist'] < back['dist']) |
+                                  ((fwd['dist'] == back['dist']) & (fwd['pos'] < back['pos']))))
+    values = np.where(use_fwd, fwd['traffic'], back['traffic'])
+    return pd.Series(values, index=keys.index, dtype=np.float64)
+
+
+def align_traffic(revenue_df, traffic_long, lags=DEFAULT_LAGS, tolerance_days=LAG_TOLERANCE_DAYS):
+    """
+    Build the combined revenue/traffic dataset in one pass.
+
+    Args:
+        revenue_df: DataFrame with website, month, niche, revenue
+        traffic_long: DataFrame with website, date, traffic (any set of domains)
+        lags: Lag variants to add as traffic_lag<N> columns
+        tolerance_days: Maximum snapshot distance for the lag variants
+
+    Returns:
+        DataFrame with website, month, niche, revenue and method_columns(lags),
+        one row per revenue row in the same order
+    """
+    combined = revenue_df[['website', 'month', 'niche', 'revenue']].reset_index(drop=True)
+    if len(combined) == 0:
+        return combined.reindex(columns=list(combined.columns) + method_columns(lags))
+
+    month_keys = combined[['website']].copy()
+    month_keys['month'] = _month_start(combined['month'])
+
+    aggregates = month_aggregates(traffic_long)
+    same_month = month_keys.merge(aggregates, on=['website', 'month'], how='left')
+    combined['traffic_latest'] = same_month['traffic_latest'].to_numpy(dtype=np.float64)
+    combined['traffic_avg'] = same_month['traffic_avg'].to_numpy(dtype=np.float64)
+
+    snaps = _snapshots(traffic_long)
+    for lag in lags:
+        combined[f'traffic_lag{lag}'] = lagged_snapshots(month_keys, traffic_long, lag,
+                                                         tolerance_days, snaps=snaps).to_numpy()
+    return combined
@@ -0,0 +1,189 @@
+"""
+Bootstrap confidence intervals and permutation p-values for correlations.
+
+Resamples are drawn in batches as NumPy index matrices (one row per
+resample), so each batch is a handful of array operations instead of a loop
+over pearsonr. Batches are spread over a process pool. Every batch gets its
+own seed derived from (seed, cell, batch), so results do not depend on the
+number of workers or on scheduling order.
+
+The pool uses the 'fork' start method: the analysis scripts are top-level
+code without a __main__ guard, and 'spawn' would re-run them in every
+worker. Where fork is unavailable (Windows) batches run in-process.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr, spearmanr, rankdata
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_BATCH_SIZE = 500
+INTERVAL_COLUMNS = ['n', 'pearson_r', 'pearson_lo', 'pearson_hi', 'pearson_perm_p',
+                    'spearman_r', 'spearman_lo', 'spearman_hi', 'spearman_perm_p']
+
+
+def _rowwise_pearson(xb, yb):
+    """
+    Pearson r for each row of two equally shaped 2-D arrays, from one-pass
+    sums. Inputs should be roughly centred (e.g. on the full-sample mean) to
+    keep the sums well conditioned; NaN for rows with a constant side.
+    """
+    n = xb.shape[1]
+    sx, sy = xb.sum(axis=1), yb.sum(axis=1)
+    cov = n * np.einsum('ij,ij->i', xb, yb) - sx * sy
+    var_x = n * np.einsum('ij,ij->i', xb, xb) - sx * sx
+    var_y = n * np.einsum('ij,ij->i', yb, yb) - sy * sy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+
+
+def _permutation_pearson(x, y, perm):
+    """Pearson r of x against y[perm] per row (means and variances are unchanged by permuting)."""
+    xc = x - x.mean()
+    yc = y - y.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (yc[perm] @ xc) / np.sqrt((xc @ xc) * (yc @ yc))
+
+
+def _resampled_ranks(codes, n_unique, idx):
+    """
+    Average ranks of x[idx] per row without sorting.
+
+    codes are x's dense value codes (np.unique inverse); a value's rank in a
+    resample is the count of smaller values drawn plus (its own count + 1) / 2,
+    which is exactly rankdata(x[idx], axis=1).
+    """
+    flat = codes[idx] + np.arange(idx.shape[0])[:, None] * n_unique
+    counts = np.bincount(flat.ravel(), minlength=idx.shape[0] * n_unique)
+    counts = counts.reshape(idx.shape[0], n_unique)
+    avg_rank = np.cumsum(counts, axis=1) - counts + (counts + 1) / 2.0
+    return avg_rank.ravel()[flat]
+
+
+def _run_batch(task):
+    """Bootstrap + permutation statistics for one batch of one cell (runs in a worker)."""
+    cell, batch, x, y, size, seed = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(cell, batch)))
+    n = len(x)
+
+    # Bootstrap: resample (x, y) pairs with replacement
+    idx = rng.integers(0, n, size=(size, n), dtype=np.int32)
+    boot_pearson = _rowwise_pearson((x - x.mean())[idx], (y - y.mean())[idx])
+    x_unique, x_codes = np.unique(x, return_inverse=True)
+    y_unique, y_codes = np.unique(y, return_inverse=True)
+    x_ranks = _resampled_ranks(x_codes, len(x_unique), idx)
+    y_ranks = _resampled_ranks(y_codes, len(y_unique), idx)
+    mid_rank = (n + 1) / 2.0
+    boot_spearman = _rowwise_pearson(x_ranks - mid_rank, y_ranks - mid_rank)
+
+    # Permutation: shuffle y against fixed x
+    perm = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+    perm_pearson = _permutation_pearson(x, y, perm)
+    perm_spearman = _permutation_pearson(rankdata(x), rankdata(y), perm)
+
+    return cell, batch, boot_pearson, boot_spearman, perm_pearson, perm_spearman
+
+
+def _pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def _map_batches(tasks, workers):
+    context = _pool_context()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or context is None or len(tasks) <= 1:
+        return [_run_batch(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+        return list(pool.map(_run_batch, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def _perm_p(observed, null):
+    null = null[~np.isnan(null)]
+    if np.isnan(observed) or len(null) == 0:
+        return np.nan
+    return (np.sum(np.abs(null) >= abs(observed)) + 1) / (len(null) + 1)
+
+
+def correlation_intervals(cells, n_resamples=DEFAULT_RESAMPLES, confidence=0.95, seed=0,
+                          batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """
+    Percentile bootstrap CIs and two-sided permutation p-values for many cells.
+
+    Args:
+        cells: Dict of label -> (x, y) arrays; pairs with a NaN are dropped
+        n_resamples: Bootstrap resamples and permutations per cell
+        confidence: Interval coverage (0.95 -> 2.5th..97.5th percentiles)
+        seed: Base seed; the same seed always gives the same intervals
+        batch_size: Resamples per index matrix (bounds memory per task)
+        workers: Process count (None = all CPUs, 1 = run in-process)
+
+    Returns:
+        DataFrame indexed by cell label with INTERVAL_COLUMNS; cells with
+        fewer than 3 pairs get NaN statistics
+    """
+    labels = list(cells)
+    prepared = []
+    tasks = []
+    for cell, label in enumerate(labels):
+        x, y = (np.asarray(a, dtype=np.float64) for a in cells[label])
+        keep = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[keep], y[keep]
+        prepared.append((x, y))
+        if len(x) < 3:
+            continue
+        for batch, start in enumerate(range(0, n_resamples, batch_size)):
+            tasks.append((cell, batch, x, y, min(batch_size, n_resamples - start), seed))
+
+    collected = {}
+    for cell, batch, *stats in _map_batches(tasks, workers):
+        collected.setdefault(cell, []).append((batch, stats))
+
+    tail = 100 * (1 - confidence) / 2
+    rows = []
+    for cell, label in enumerate(labels):
+        x, y = prepared[cell]
+        row = dict.fromkeys(INTERVAL_COLUMNS, np.nan)
+        row['n'] = len(x)
+        if cell in collected:
+            batches = [stats for _, stats in sorted(collected[cell], key=lambda item: item[0])]
+            boot_p, boot_s, perm_p, perm_s = (np.concatenate(parts) for parts in zip(*batches))
+            row['pearson_r'] = pearsonr(x, y)[0]
+            row['spearman_r'] = spearmanr(x, y)[0]
+            row['pearson_lo'], row['pearson_hi'] = np.nanpercentile(boot_p, [tail, 100 - tail])
+            row['spearman_lo'], row['spearman_hi'] = np.nanpercentile(boot_s, [tail, 100 - tail])
+            row['pearson_perm_p'] = _perm_p(row['pearson_r'], perm_p)
+            row['spearman_perm_p'] = _perm_p(row['spearman_r'], perm_s)
+        rows.append(row)
+    index = pd.Index(labels, name='cell', tupleize_cols=False)
+    return pd.DataFrame(rows, index=index, columns=INTERVAL_COLUMNS)
+
+
+def segment_intervals(combined_df, segments, methods, revenue_col='revenue', **kwargs):
+    """
+    correlation_intervals for every segment x traffic method of the combined dataset.
+
+    Args:
+        combined_df: Output of analysis.align.align_traffic
+        segments: Dict of segment name -> list of websites
+        methods: Dict of traffic column -> display label
+        **kwargs: Passed to correlation_intervals
+
+    Returns:
+        DataFrame with Segment, Method and INTERVAL_COLUMNS
+    """
+    cells = {}
+    for seg_name, sites in segments.items():
+        seg_data = combined_df[combined_df['website'].isin(sites)]
+        for column, label in methods.items():
+            cells[(seg_name, label)] = (seg_data[column].to_numpy(dtype=np.float64),
+                                        seg_data[revenue_col].to_numpy(dtype=np.float64))
+    intervals = correlation_intervals(cells, **kwargs)
+    keys = pd.DataFrame(list(cells), columns=['Segment', 'Method'])
+    return pd.concat([keys, intervals.reset_index(drop=True)], axis=1)
@@ -0,0 +1,637 @@
+"""
+The ten analysis charts as independent render tasks.
+
+chart_data() reduces the analysis frames to the small, picklable inputs the
+charts draw from; render_charts() draws every chart from them on a process
+pool (Agg backend, one figure per task), so the whole set takes about as
+long as the slowest chart. The inputs are saved next to the pipeline cache,
+so charts can be redrawn - restyled, or as SVG/WebP - without rerunning the
+analysis:
+
+    python -m analysis.charts --format svg
+"""
+
+import os
+import time
+import pickle
+import argparse
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.patches import Patch
+import seaborn as sns
+
+from analysis.pipeline import DEFAULT_CACHE_DIR, SEGMENTS, METHOD_LABELS
+
+DEFAULT_CHART_DATA = os.path.join(DEFAULT_CACHE_DIR, 'chart-data.pkl')
+FORMATS = ('png', 'svg', 'webp')
+DEFAULT_DPI = 150
+
+SEGMENT_ORDER = ['Top 10', 'Top 50', 'Top 100', 'Top 250']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+QUADRANT_ORDER = ['Stable + Growing', 'Volatile + Growing', 'Stable + Declining', 'Volatile + Declining']
+QUADRANT_COLORS = {
+    'Stable + Growing': '#2ecc71',      # Green
+    'Stable + Declining': '#3498db',    # Blue
+    'Volatile + Growing': '#f39c12',    # Orange
+    'Volatile + Declining': '#e74c3c',  # Red
+    'Unknown': 'gray'
+}
+
+
+def _setup_style():
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+
+
+def _short_name(website):
+    return website.replace('.com', '').replace('.net', '').replace('.org', '')
+
+
+def stability_split(site_with_stability, median_cv):
+    """Average monthly revenue of stable (CV <= median) vs volatile sites."""
+    stable_sites = site_with_stability[site_with_stability['cv'] <= median_cv]['avg_monthly_revenue']
+    volatile_sites = site_with_stability[site_with_stability['cv'] > median_cv]['avg_monthly_revenue']
+    stable_mean = stable_sites.mean()
+    volatile_mean = volatile_sites.mean()
+    return {
+        'stable_n': len(stable_sites),
+        'volatile_n': len(volatile_sites),
+        'stable_mean': stable_mean,
+        'volatile_mean': volatile_mean,
+        'pct_diff': 100 * (stable_mean - volatile_mean) / volatile_mean if volatile_mean > 0 else 0,
+    }
+
+
+def chart_data(results_df, site_summary, combined_df, site_with_stability, median_cv, band_stats):
+    """
+    Picklable inputs for every chart, computed once in the analysis process.
+
+    Returns:
+        Dict of small DataFrames and scalars (see CHARTS for who reads what)
+    """
+    monthly_avg = combined_df.groupby(combined_df['month'].dt.month).agg({
+        'revenue': 'mean',
+        'traffic_avg': 'mean'
+    }).round(2)
+    monthly_avg.index = [MONTH_NAMES[i-1] for i in monthly_avg.index]
+
+    return {
+        'results': results_df[['Segment', 'Method', 'Pearson r', 'Spearman r']].copy(),
+        'site_summary': site_summary[['website', 'revenue', 'traffic_avg', 'rptu']].copy(),
+        'monthly_avg': monthly_avg,
+        'stability': site_with_stability[['website', 'cv', 'slope_pct_per_period', 'mean_traffic',
+                                          'avg_monthly_revenue', 'quadrant']].copy(),
+        'median_cv': median_cv,
+        'band_stats': band_stats.copy(),
+    }
+
+
+# 1. CORRELATION HEATMAP
+def plot_correlation_heatmap(data):
+    results_df = data['results']
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Pearson heatmap
+    pivot_pearson = results_df.pivot(index='Segment', columns='Method', values='Pearson r')
+    pivot_pearson = pivot_pearson[METHOD_LABELS].reindex(SEGMENT_ORDER)
+    sns.heatmap(pivot_pearson, annot=True, fmt='.3f', cmap='RdYlGn', center=0,
+                ax=axes[0], vmin=0, vmax=0.8, cbar_kws={'label': 'Correlation'})
+    axes[0].set_title('Pearson Correlation (r)\nTraffic vs Revenue', fontsize=14, fontweight='bold')
+    axes[0].set_xlabel('')
+    axes[0].set_ylabel('')
+
+    # Spearman heatmap
+    pivot_spearman = results_df.pivot(index='Segment', columns='Method', values='Spearman r')
+    pivot_spearman = pivot_spearman[METHOD_LABELS].reindex(SEGMENT_ORDER)
+    sns.heatmap(pivot_spearman, annot=True, fmt='.3f', cmap='RdYlGn', center=0,
+                ax=axes[1], vmin=0, vmax=0.9, cbar_kws={'label': 'Correlation'})
+    axes[1].set_title('Spearman Correlation (ρ)\nTraffic vs Revenue', fontsize=14, fontweight='bold')
+    axes[1].set_xlabel('')
+    axes[1].set_ylabel('')
+    return fig
+
+
+# 2. TRAFFIC VS REVENUE SCATTER PLOT
+def plot_traffic_revenue_scatter(data):
+    site_summary = data['site_summary']
+    fig, ax = plt.subplots(figsize=(12, 8))
+
+    valid_sites = site_summary[site_summary['traffic_avg'].notna() & site_summary['revenue'].notna() & (site_summary['traffic_avg'] > 0)]
+
+    # Color by efficiency quartile
+    q1 = valid_sites['rptu'].quantile(0.25)
+    q3 = valid_sites['rptu'].quantile(0.75)
+    colors = np.select(
+        [valid_sites['rptu'].isna(), valid_sites['rptu'] >= q3, valid_sites['rptu'] <= q1],
+        ['gray', '#2ecc71', '#e74c3c'],  # Green - High efficiency, Red - Low efficiency
+        default='#3498db'                # Blue - Average
+    )
+
+    ax.scatter(valid_sites['traffic_avg'], valid_sites['revenue'],
+               c=colors, alpha=0.6, s=80, edgecolors='white', linewidth=0.5)
+
+    ax.set_xlabel('Average Monthly Traffic Estimate', fontsize=12)
+    ax.set_ylabel('Total Revenue ($)', fontsize=12)
+    ax.set_title('Traffic vs Revenue by Site\n🟢 High Efficiency  🔵 Average  🔴 Low Efficiency (Monetization Opportunities)',
+                 fontsize=14, fontweight='bold')
+
+    # Add trend line
+    z = np.polyfit(valid_sites['traffic_avg'], valid_sites['revenue'], 1)
+    p = np.poly1d(z)
+    x_line = np.linspace(valid_sites['traffic_avg'].min(), valid_sites['traffic_avg'].max(), 100)
+    ax.plot(x_line, p(x_line), "k--", alpha=0.5, linewidth=2, label=f'Trend line')
+
+    # Label top outliers
+    for _, row in valid_sites.nlargest(5, 'revenue').iterrows():
+        ax.annotate(_short_name(row['website']), (row['traffic_avg'], row['revenue']), fontsize=8, alpha=0.8)
+
+    # Format y-axis as currency
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+# 3. METHOD COMPARISON BAR CHART
+def plot_method_comparison(data):
+    results_df = data['results']
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    x = np.arange(len(SEGMENTS))
+    width = 0.2
+    colors_bar = ['#3498db', '#2ecc71', '#f39c12', '#9b59b6']
+
+    for i, label in enumerate(METHOD_LABELS):
+        method_data = results_df[results_df['Method'] == label]
+        method_data = method_data.set_index('Segment').reindex(SEGMENT_ORDER)
+        ax.bar(x + i*width, method_data['Pearson r'], width, label=label, color=colors_bar[i], alpha=0.8)
+
+    ax.set_xlabel('Segment', fontsize=12)
+    ax.set_ylabel('Pearson Correlation (r)', fontsize=12)
+    ax.set_title('Traffic Method Comparison by Segment\nWhich snapshot timing correlates best with revenue?',
+                 fontsize=14, fontweight='bold')
+    ax.set_xticks(x + width * 1.5)
+    ax.set_xticklabels(SEGMENT_ORDER)
+    ax.legend(loc='upper left')
+    ax.set_ylim(0, 0.8)
+    ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.5, label='r=0.5 (moderate)')
+    ax.grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+# 4. EFFICIENCY DISTRIBUTION
+def plot_efficiency_analysis(data):
+    site_summary = data['site_summary']
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Histogram of RPTU
+    valid_rptu = site_summary[site_summary['rptu'].notna() & (site_summary['rptu'] < 50)]  # Filter extreme outliers
+    axes[0].hist(valid_rptu['rptu'], bins=30, color='#3498db', alpha=0.7, edgecolor='white')
+    axes[0].axvline(valid_rptu['rptu'].median(), color='red', linestyle='--', linewidth=2, label=f'Median: {valid_rptu["rptu"].median():.2f}')
+    axes[0].set_xlabel('Revenue Per Traffic Unit (RPTU)', fontsize=12)
+    axes[0].set_ylabel('Number of Sites', fontsize=12)
+    axes[0].set_title('Distribution of Monetization Efficiency', fontsize=14, fontweight='bold')
+    axes[0].legend()
+
+    # Top/Bottom efficiency comparison
+    top_10_eff = site_summary.nlargest(10, 'rptu')[['website', 'rptu']].copy()
+    bottom_10_eff = site_summary[site_summary['rptu'].notna()].nsmallest(10, 'rptu')[['website', 'rptu']].copy()
+
+    combined_eff = pd.concat([
+        top_10_eff.assign(category='Top 10 (Efficient)'),
+        bottom_10_eff.assign(category='Bottom 10 (Opportunities)')
+    ])
+    combined_eff['website_short'] = combined_eff['website'].str.replace('.com','').str.replace('.net','').str.replace('.org','')
+
+    colors_eff = ['#2ecc71' if 'Top' in cat else '#e74c3c' for cat in combined_eff['category']]
+    axes[1].barh(range(len(combined_eff)), combined_eff['rptu'], color=colors_eff, alpha=0.8)
+    axes[1].set_yticks(range(len(combined_eff)))
+    axes[1].set_yticklabels(combined_eff['website_short'], fontsize=9)
+    axes[1].set_xlabel('Revenue Per Traffic Unit (RPTU)', fontsize=12)
+    axes[1].set_title('Top 10 vs Bottom 10 Efficiency\n🟢 Most Efficient  🔴 Monetization Opportunities', fontsize=14, fontweight='bold')
+    axes[1].axvline(x=1, color='gray', linestyle='--', alpha=0.5)
+    return fig
+
+
+# 5. PORTFOLIO CONCENTRATION (Pareto Chart)
+def plot_portfolio_concentration(data):
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    site_summary_sorted = data['site_summary'].sort_values('revenue', ascending=False).reset_index(drop=True)
+    site_summary_sorted['cumulative_revenue'] = site_summary_sorted['revenue'].cumsum()
+    site_summary_sorted['cumulative_pct'] = 100 * site_summary_sorted['cumulative_revenue'] / site_summary_sorted['revenue'].sum()
+    site_summary_sorted['site_pct'] = 100 * (site_summary_sorted.index + 1) / len(site_summary_sorted)
+
+    ax.fill_between(site_summary_sorted['site_pct'], site_summary_sorted['cumulative_pct'],
+                    alpha=0.3, color='#3498db')
+    ax.plot(site_summary_sorted['site_pct'], site_summary_sorted['cumulative_pct'],
+            color='#3498db', linewidth=2)
+
+    # Add reference lines
+    ax.axhline(y=80, color='red', linestyle='--', alpha=0.7, label='80% of revenue')
+    ax.axvline(x=20, color='gray', linestyle='--', alpha=0.5)
+
+    # Find where 80% revenue is reached
+    idx_80 = (site_summary_sorted['cumulative_pct'] >= 80).idxmax()
+    pct_sites_for_80 = site_summary_sorted.loc[idx_80, 'site_pct']
+    ax.plot(pct_sites_for_80, 80, 'ro', markersize=10)
+    ax.annotate(f'{pct_sites_for_80:.0f}% of sites\ngenerate 80% revenue',
+                (pct_sites_for_80, 80), xytext=(pct_sites_for_80+10, 70),
+                fontsize=10, arrowprops=dict(arrowstyle='->', color='red'))
+
+    ax.set_xlabel('% of Sites (ranked by revenue)', fontsize=12)
+    ax.set_ylabel('% of Total Revenue (cumulative)', fontsize=12)
+    ax.set_title('Portfolio Concentration (Pareto Analysis)\nHow much revenue comes from top sites?',
+                 fontsize=14, fontweight='bold')
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 105)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+# 6. SEASONALITY
+def plot_seasonality(data):
+    monthly_avg = data['monthly_avg']
+    fig, ax1 = plt.subplots(figsize=(12, 5))
+
+    x = range(len(monthly_avg))
+    ax1.bar(x, monthly_avg['revenue'], alpha=0.7, color='#2ecc71', label='Avg Revenue')
+    ax1.set_xlabel('Month', fontsize=12)
+    ax1.set_ylabel('Average Revenue ($)', color='#2ecc71', fontsize=12)
+    ax1.tick_params(axis='y', labelcolor='#2ecc71')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(monthly_avg.index)
+
+    ax2 = ax1.twinx()
+    ax2.plot(x, monthly_avg['traffic_avg'], color='#e67e22', marker='o', linewidth=2, markersize=8, label='Avg Traffic')
+    ax2.set_ylabel('Average Traffic', color='#e67e22', fontsize=12)
+    ax2.tick_params(axis='y', labelcolor='#e67e22')
+
+    plt.title('Seasonality: Average Revenue & Traffic by Month', fontsize=14, fontweight='bold')
+    fig.legend(loc='upper right', bbox_to_anchor=(0.9, 0.9))
+    return fig
+
+
+# 7. TRAFFIC STABILITY VS REVENUE
+def plot_traffic_consistency(data):
+    site_with_stability = data['stability']
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Left plot: CV vs Revenue scatter
+    valid_stability = site_with_stability[
+        site_with_stability['cv'].notna() &
+        site_with_stability['avg_monthly_revenue'].notna() &
+        (site_with_stability['cv'] < 10)  # Filter extreme outliers
+    ]
+
+    # Color by average traffic
+    scatter = axes[0].scatter(
+        valid_stability['cv'],
+        valid_stability['avg_monthly_revenue'],
+        c=valid_stability['mean_traffic'],
+        cmap='viridis',
+        alpha=0.6,
+        s=50
+    )
+    plt.colorbar(scatter, ax=axes[0], label='Avg Traffic')
+
+    # Add trend line
+    z = np.polyfit(valid_stability['cv'], valid_stability['avg_monthly_revenue'], 1)
+    p = np.poly1d(z)
+    x_line = np.linspace(valid_stability['cv'].min(), valid_stability['cv'].max(), 100)
+    axes[0].plot(x_line, p(x_line), 'r--', linewidth=2, label=f'Trend (r={np.corrcoef(valid_stability["cv"], valid_stability["avg_monthly_revenue"])[0,1]:.2f})')
+
+    axes[0].set_xlabel('Traffic Volatility (CV = std/mean)', fontsize=12)
+    axes[0].set_ylabel('Average Monthly Revenue ($)', fontsize=12)
+    axes[0].set_title('Traffic Stability vs Revenue\n(Lower CV = More Stable)', fontsize=14, fontweight='bold')
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    # Right plot: Stable vs Volatile comparison
+    split = stability_split(site_with_stability, data['median_cv'])
+    stable_mean, volatile_mean = split['stable_mean'], split['volatile_mean']
+
+    bars = axes[1].bar(['Stable Traffic\n(CV ≤ median)', 'Volatile Traffic\n(CV > median)'],
+                       [stable_mean, volatile_mean],
+                       color=['#2ecc71', '#e74c3c'],
+                       alpha=0.8)
+
+    axes[1].set_ylabel('Average Monthly Revenue ($)', fontsize=12)
+    axes[1].set_title('Stable vs Volatile Sites\n(Revenue Comparison)', fontsize=14, fontweight='bold')
+
+    # Add value labels
+    for bar, val in zip(bars, [stable_mean, volatile_mean]):
+        axes[1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 10,
+                     f'${val:,.0f}', ha='center', va='bottom', fontsize=14, fontweight='bold')
+
+    # Add percentage difference annotation
+    axes[1].annotate(f'+{split["pct_diff"]:.0f}%', xy=(0.5, stable_mean/2), fontsize=20,
+                     color='#2ecc71', fontweight='bold', ha='center')
+
+    axes[1].grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+# 8. TREND + STABILITY COMBINED (2x2 Matrix)
+def plot_trend_stability(data):
+    site_with_stability = data['stability']
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Left: Scatter plot with quadrant coloring
+    for quadrant, color in QUADRANT_COLORS.items():
+        subset = site_with_stability[site_with_stability['quadrant'] == quadrant]
+        if len(subset) > 0:
+            axes[0].scatter(subset['slope_pct_per_period'], subset['cv'],
+                            c=color, label=quadrant, alpha=0.6, s=50)
+
+    axes[0].axhline(y=data['median_cv'], color='gray', linestyle='--', alpha=0.5)
+    axes[0].axvline(x=0, color='gray', linestyle='--', alpha=0.5)
+    axes[0].set_xlabel('Trend (% change per period)', fontsize=12)
+    axes[0].set_ylabel('Volatility (CV)', fontsize=12)
+    axes[0].set_title('Traffic Trend vs Stability\n(4 Quadrants)', fontsize=14, fontweight='bold')
+    axes[0].legend(loc='upper right')
+    axes[0].set_xlim(-50, 50)
+    axes[0].set_ylim(0, 3)
+    axes[0].grid(True, alpha=0.3)
+
+    # Right: Revenue by quadrant
+    quadrant_revenue = site_with_stability.groupby('quadrant')['avg_monthly_revenue'].mean()
+    quadrant_revenue = quadrant_revenue.reindex([q for q in QUADRANT_ORDER if q in quadrant_revenue.index])
+
+    colors_quad = [QUADRANT_COLORS[q] for q in quadrant_revenue.index]
+    bars = axes[1].bar(range(len(quadrant_revenue)), quadrant_revenue.values, color=colors_quad, alpha=0.8)
+    axes[1].set_xticks(range(len(quadrant_revenue)))
+    axes[1].set_xticklabels([q.replace(' + ', '\n') for q in quadrant_revenue.index], fontsize=10)
+    axes[1].set_ylabel('Average Monthly Revenue ($)', fontsize=12)
+    axes[1].set_title('Revenue by Site Category\n(Trend + Stability)', fontsize=14, fontweight='bold')
+
+    # Add value labels
+    for bar, val in zip(bars, quadrant_revenue.values):
+        axes[1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
+                     f'${val:,.0f}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    axes[1].grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+# 9. TRAFFIC BANDS (month-level: same-month avg traffic vs that month's revenue)
+def plot_traffic_bands(data):
+    band_stats = data['band_stats'].copy()
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+
+    # Left: Revenue by traffic band
+    colors_band = plt.cm.Blues(np.linspace(0.3, 0.9, len(band_stats)))
+    bars = axes[0].bar(range(len(band_stats)), band_stats['Avg Revenue'], color=colors_band, alpha=0.9)
+    axes[0].set_xticks(range(len(band_stats)))
+    axes[0].set_xticklabels(band_stats['Traffic Band'], fontsize=10)
+    axes[0].set_xlabel('Traffic Band (Same-Month Avg)', fontsize=12)
+    axes[0].set_ylabel('Average Revenue ($)', fontsize=12)
+    axes[0].set_title('Revenue by Traffic Band\n(Month-Level: Each month is one data point)', fontsize=14, fontweight='bold')
+
+    # Add labels with observation counts
+    for bar, row in zip(bars, band_stats.itertuples()):
+        axes[0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 20,
+                     f'${row._3:,.0f}\n(n={row.n_observations})', ha='center', va='bottom', fontsize=9)
+
+    # Highlight the jump from 0-1K to 1K-5K
+    if len(band_stats) >= 2:
+        rev_0_1k = band_stats.iloc[0]['Avg Revenue']
+        rev_1_5k = band_stats.iloc[1]['Avg Revenue']
+        pct_jump = 100 * (rev_1_5k - rev_0_1k) / rev_0_1k if rev_0_1k > 0 else 0
+        axes[0].annotate(f'+{pct_jump:.0f}%', xy=(0.5, (rev_0_1k + rev_1_5k)/2),
+                         fontsize=12, color='#e74c3c', fontweight='bold')
+
+    axes[0].grid(True, alpha=0.3, axis='y')
+
+    # Middle: Monetization efficiency ($ per visitor), best and worst bands highlighted
+    best_band_idx = band_stats['Revenue per Visitor'].idxmax()
+    worst_band_idx = band_stats['Revenue per Visitor'].idxmin()
+
+    colors_eff = ['#3498db'] * len(band_stats)
+    colors_eff[best_band_idx] = '#2ecc71'  # Green for best
+    colors_eff[worst_band_idx] = '#e74c3c'  # Red for worst
+
+    bars = axes[1].bar(range(len(band_stats)), band_stats['Revenue per Visitor'], color=colors_eff, alpha=0.8)
+    axes[1].set_xticks(range(len(band_stats)))
+    axes[1].set_xticklabels(band_stats['Traffic Band'], fontsize=10)
+    axes[1].set_xlabel('Traffic Band', fontsize=12)
+    axes[1].set_ylabel('Revenue per Visitor ($)', fontsize=12)
+    axes[1].set_title('Monetization Efficiency\n($ per Visitor)', fontsize=14, fontweight='bold')
+
+    # Add value labels
+    for bar, val in zip(bars, band_stats['Revenue per Visitor']):
+        axes[1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.005,
+                     f'${val:.2f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    legend_elements = [Patch(facecolor='#2ecc71', label='Most Efficient'),
+                       Patch(facecolor='#e74c3c', label='Least Efficient')]
+    axes[1].legend(handles=legend_elements, loc='upper right')
+    axes[1].grid(True, alpha=0.3, axis='y')
+
+    # Right: % of Total Revenue, sweet spot = highest efficiency * revenue share
+    band_stats['Value Score'] = band_stats['Revenue per Visitor'] * band_stats['% of Total Revenue']
+    best_value_idx = band_stats['Value Score'].idxmax()
+
+    colors_share = ['#3498db'] * len(band_stats)
+    colors_share[best_value_idx] = '#2ecc71'  # Highlight sweet spot
+
+    bars = axes[2].bar(range(len(band_stats)), band_stats['% of Total Revenue'], color=colors_share, alpha=0.8)
+    axes[2].set_xticks(range(len(band_stats)))
+    axes[2].set_xticklabels(band_stats['Traffic Band'], fontsize=8, rotation=45, ha='right')
+    axes[2].set_xlabel('Traffic Band', fontsize=12)
+    axes[2].set_ylabel('% of Total Revenue', fontsize=12)
+    axes[2].set_title('Revenue Contribution by Band\n(Where does the money come from?)', fontsize=14, fontweight='bold')
+
+    # Add value labels
+    for bar, pct in zip(bars, band_stats['% of Total Revenue']):
+        axes[2].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+                     f'{pct:.1f}%', ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+    # Highlight the sweet spot
+    sweet_spot_pct = band_stats.iloc[best_value_idx]['% of Total Revenue']
+    sweet_spot_eff = band_stats.iloc[best_value_idx]['Revenue per Visitor']
+    axes[2].annotate(f'SWEET SPOT\n${sweet_spot_eff:.2f}/visitor',
+                     xy=(best_value_idx, sweet_spot_pct),
+                     xytext=(best_value_idx + 1.5, sweet_spot_pct + 5),
+                     fontsize=10, color='#2ecc71', fontweight='bold',
+                     arrowprops=dict(arrowstyle='->', color='#2ecc71'))
+
+    axes[2].grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+# 10. SUMMARY DASHBOARD
+def plot_summary_dashboard(data):
+    results_df = data['results']
+    site_with_stability = data['stability']
+    split = stability_split(site_with_stability, data['median_cv'])
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+    # Top-left: Correlation by method (simplified)
+    best_method_data = results_df[results_df['Segment'] == 'Top 250'][['Method', 'Pearson r']]
+    colors_method = ['#3498db', '#2ecc71', '#f39c12', '#9b59b6']
+    bars = axes[0, 0].bar(range(len(best_method_data)), best_method_data['Pearson r'], color=colors_method, alpha=0.8)
+    axes[0, 0].set_xticks(range(len(best_method_data)))
+    axes[0, 0].set_xticklabels(best_method_data['Method'], fontsize=9, rotation=15)
+    axes[0, 0].set_ylabel('Pearson Correlation (r)', fontsize=11)
+    axes[0, 0].set_title('Traffic Method Comparison\n(Top 250 Sites)', fontsize=12, fontweight='bold')
+    axes[0, 0].set_ylim(0, 0.7)
+    for bar, val in zip(bars, best_method_data['Pearson r']):
+        axes[0, 0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+                        f'{val:.3f}', ha='center', va='bottom', fontsize=10)
+    axes[0, 0].grid(True, alpha=0.3, axis='y')
+
+    # Top-right: Quadrant distribution
+    quadrant_counts = site_with_stability['quadrant'].value_counts()
+    quadrant_counts = quadrant_counts.reindex([q for q in QUADRANT_ORDER if q in quadrant_counts.index])
+    colors_quad_pie = [QUADRANT_COLORS[q] for q in quadrant_counts.index]
+    axes[0, 1].pie(quadrant_counts.values, labels=[q.replace(' + ', '\n') for q in quadrant_counts.index],
+                   colors=colors_quad_pie, autopct='%1.0f%%', startangle=90)
+    axes[0, 1].set_title('Site Distribution by Category\n(Trend + Stability)', fontsize=12, fontweight='bold')
+
+    # Bottom-left: Key metrics summary
+    metrics_text = f"""
+KEY FINDINGS
+{'='*40}
+
+Traffic-Revenue Correlation:
+  • Best method: Same-Month Average
+  • Correlation (r): {results_df[results_df['Method'] == 'Same-Month Avg']['Pearson r'].mean():.3f}
+
+Stability Analysis:
+  • Stable sites earn: ${split['stable_mean']:,.0f}/month avg
+  • Volatile sites earn: ${split['volatile_mean']:,.0f}/month avg
+  • Difference: +{split['pct_diff']:.0f}% for stable sites
+
+Portfolio:
+  • Total sites analyzed: {len(site_with_stability)}
+  • Best category: Stable + Growing
+"""
+    axes[1, 0].text(0.1, 0.5, metrics_text, fontsize=11, family='monospace',
+                    verticalalignment='center', transform=axes[1, 0].transAxes)
+    axes[1, 0].axis('off')
+    axes[1, 0].set_title('Key Metrics Summary', fontsize=12, fontweight='bold')
+
+    # Bottom-right: Revenue distribution histogram
+    axes[1, 1].hist(site_with_stability['avg_monthly_revenue'].dropna(), bins=30,
+                    color='#3498db', alpha=0.7, edgecolor='white')
+    axes[1, 1].axvline(site_with_stability['avg_monthly_revenue'].median(), color='red',
+                       linestyle='--', linewidth=2, label=f'Median: ${site_with_stability["avg_monthly_revenue"].median():,.0f}')
+    axes[1, 1].set_xlabel('Average Monthly Revenue ($)', fontsize=11)
+    axes[1, 1].set_ylabel('Number of Sites', fontsize=11)
+    axes[1, 1].set_title('Revenue Distribution', fontsize=12, fontweight='bold')
+    axes[1, 1].legend()
+    axes[1, 1].grid(True, alpha=0.3)
+    return fig
+
+
+# (file stem, description, render function, chart_data keys it reads)
+CHARTS = [
+    ('1_correlation_heatmap', 'Correlation by segment & method', plot_correlation_heatmap, ('results',)),
+    ('2_traffic_revenue_scatter', 'Sites plotted with efficiency coloring', plot_traffic_revenue_scatter, ('site_summary',)),
+    ('3_method_comparison', 'Bar chart comparing snapshot methods', plot_method_comparison, ('results',)),
+    ('4_efficiency_analysis', 'RPTU distribution & top/bottom sites', plot_efficiency_analysis, ('site_summary',)),
+    ('5_portfolio_concentration', 'Pareto chart of revenue concentration', plot_portfolio_concentration, ('site_summary',)),
+    ('6_seasonality', 'Monthly patterns', plot_seasonality, ('monthly_avg',)),
+    ('7_traffic_consistency', 'Stability (CV) vs revenue analysis', plot_traffic_consistency, ('stability', 'median_cv')),
+    ('8_traffic_dr_combined', 'Trend + Stability quadrant analysis', plot_trend_stability, ('stability', 'median_cv')),
+    ('9_traffic_bands', 'Revenue by traffic tier', plot_traffic_bands, ('band_stats',)),
+    ('10_summary_dashboard', 'Combined summary dashboard', plot_summary_dashboard, ('results', 'stability', 'median_cv')),
+]
+
+
+def _render_task(task):
+    """Draw and save one chart (runs in a worker)."""
+    index, data, out_dir, fmt, dpi = task
+    stem, _, render, _ = CHARTS[index]
+    started = time.perf_counter()
+    _setup_style()
+    fig = render(data)
+    plt.tight_layout()
+    path = os.path.join(out_dir, f'{stem}.{fmt}')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return path, time.perf_counter() - started
+
+
+def _pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def render_charts(data, out_dir='.', fmt='png', workers=None, dpi=DEFAULT_DPI, only=None):
+    """
+    Render the charts in parallel, one process per figure.
+
+    Args:
+        data: Output of chart_data (or load_chart_data)
+        out_dir: Directory for the image files
+        fmt: 'png', 'svg' or 'webp'
+        workers: Process count (None = all CPUs, 1 = render in-process)
+        dpi: Resolution for raster formats
+        only: Optional list of chart stems to render
+
+    Yields:
+        (path, seconds) per chart, in CHARTS order
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt} (expected one of {', '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(i, {key: data[key] for key in keys}, out_dir, fmt, dpi)
+             for i, (stem, _, _, keys) in enumerate(CHARTS) if only is None or stem in only]
+
+    context = _pool_context()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or context is None or len(tasks) <= 1:
+        for task in tasks:
+            yield _render_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+        yield from pool.map(_render_task, tasks)
+
+
+def save_chart_data(data, path=DEFAULT_CHART_DATA):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_chart_data(path=DEFAULT_CHART_DATA):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Redraw the analysis charts from the last run')
+    parser.add_argument('--data', default=DEFAULT_CHART_DATA, help='Chart inputs saved by run_analysis_with_visuals.py')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--only', nargs='+', default=None, help='Chart stems, e.g. 9_traffic_bands')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    if not os.path.exists(args.data):
+        parser.error(f"{args.data} not found - run run_analysis_with_visuals.py first")
+    started = time.perf_counter()
+    for path, seconds in render_charts(load_chart_data(args.data), args.out_dir, args.format,
+                                       args.workers, args.dpi, args.only):
+        print(f"   ✓ Saved: {path} ({seconds:.1f}s)")
+    print(f"✅ Rendered in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
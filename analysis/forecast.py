@@ -0,0 +1,294 @@
+"""
+Batched per-domain forecasts for monthly traffic and revenue.
+
+Fits additive Holt-Winters with a damped trend (no seasonal term for short
+histories) on log1p values, for every domain and every grid point at once:
+the smoothing recursion runs over months on (domains x parameter grid)
+arrays, and each domain keeps the grid point with the lowest one-step
+squared error. Intervals come from the ETS(A,Ad,A) forecast variance.
+
+Depends on numpy only, so the sync Lambda ships this file as forecast.py
+(see lambda/deploy.sh) and publishes forecast.json for the dashboard.
+
+    python -m analysis.forecast --metric traffic --metric revenue --out forecast.json
+"""
+
+import json
+import time
+import warnings
+from datetime import date, datetime
+from statistics import NormalDist
+
+import numpy as np
+
+SEASON_LENGTH = 12
+DEFAULT_HORIZON = 6
+DEFAULT_INTERVAL = 0.8
+MIN_HISTORY = 6       # observed months needed to fit a domain at all
+STALE_MONTHS = 3      # skip domains with no observation in the last N months
+CHUNK_ROWS = 1024     # domains per batch (bounds memory to ~40MB per chunk)
+
+# Smoothing grid. beta and gamma are fractions of alpha and (1 - alpha) so
+# every grid point stays inside the usual admissible region.
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETA_FRACTIONS = (0.0, 0.05, 0.15, 0.3)
+GAMMA_FRACTIONS = (0.0, 0.1, 0.3)
+PHIS = (0.8, 0.9, 0.98)
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def parameter_grid(seasonal=True):
+    """
+    Flattened smoothing grid.
+
+    Returns:
+        (alpha, beta, gamma, phi) arrays of equal length
+    """
+    gammas = GAMMA_FRACTIONS if seasonal else (0.0,)
+    a, bf, gf, p = np.meshgrid(ALPHAS, BETA_FRACTIONS, gammas, PHIS, indexing='ij')
+    a, bf, gf, p = a.ravel(), bf.ravel(), gf.ravel(), p.ravel()
+    return a, a * bf, (1.0 - a) * gf, p
+
+
+def _initial_state(y, start, m):
+    """
+    Level (as of the column before each row's start), trend and seasonal slots
+    from each row's first one or two seasons.
+    """
+    n, n_t = y.shape
+    rows = np.arange(n)[:, None]
+    offsets = np.arange(max(m, 1))
+    idx = start[:, None] + offsets
+    first = np.where(idx < n_t, y[rows, np.minimum(idx, n_t - 1)], np.nan)
+
+    level = np.nanmean(first, axis=1) if m > 1 else y[np.arange(n), start]
+    trend = np.zeros(n)
+    season = np.zeros((n, max(m, 1)))
+    if m > 1:
+        idx2 = idx + m
+        second = np.where(idx2 < n_t, y[rows, np.minimum(idx2, n_t - 1)], np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # rows without a second season
+            second_mean = np.nanmean(second, axis=1)
+        trend = np.nan_to_num((second_mean - level) / m)
+        # The season mean sits mid-season: seasonal slots are deviations from the
+        # trend line through it, and the level is moved back to just before start
+        centred = level[:, None] + trend[:, None] * (offsets - (m - 1) / 2)
+        # Slot = calendar position (column % m), so seasons line up across domains
+        season[rows, idx % m] = np.nan_to_num(first - centred)
+        level = level - trend * ((m - 1) / 2 + 1)
+    return level, trend, season
+
+
+def _fit_batch(y, start, m, grid):
+    """
+    Run the recursion for one batch of rows over every grid point.
+
+    Args:
+        y: (n, T) log values, NaN where missing
+        start: (n,) column of each row's first observation
+        m: Season length, or 1 for no seasonal term
+        grid: Output of parameter_grid
+
+    Returns:
+        (best grid index, residual sigma, final level, trend, seasonal state) per row
+    """
+    n, n_t = y.shape
+    alpha, beta, gamma, phi = (g[None, :] for g in grid)
+    n_grid = alpha.shape[1]
+
+    level0, trend0, season0 = _initial_state(y, start, m)
+    level = np.repeat(level0[:, None], n_grid, axis=1)
+    trend = np.repeat(trend0[:, None], n_grid, axis=1)
+    season = np.repeat(season0[:, :, None], n_grid, axis=2)  # (n, m, grid)
+
+    sse = np.zeros((n, n_grid))
+    n_err = np.zeros(n)
+    warmup = start + (m if m > 1 else 1)
+
+    for t in range(n_t):
+        y_t = y[:, t]
+        observed = ~np.isnan(y_t)
+        active = (t >= start)[:, None]
+        slot = t % m
+        damped = phi * trend
+        error = np.where(observed[:, None], np.nan_to_num(y_t)[:, None] - (level + damped + season[:, slot]), 0.0)
+        level = np.where(active, level + damped + alpha * error, level)
+        trend = np.where(active, damped + beta * error, trend)
+        season[:, slot] += gamma * error
+        scored = observed & (t >= warmup)
+        sse += np.where(scored[:, None], error * error, 0.0)
+        n_err += scored
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n)
+    sigma = np.sqrt(sse[rows, best] / np.maximum(n_err, 1))
+    return best, sigma, level[rows, best], trend[rows, best], season[rows, :, best]
+
+
+def _horizon_paths(grid, best, level, trend, season, n_t, m, horizon):
+    """Point forecasts and log-scale half widths for horizons 1..H."""
+    alpha, beta, gamma, phi = (g[best][:, None] for g in grid)
+    steps = np.arange(1, horizon + 1)[None, :]
+    phi_h = np.cumsum(phi ** steps, axis=1)  # phi + phi^2 + ... + phi^h
+    slots = (n_t - 1 + steps) % m
+    mean = level[:, None] + phi_h * trend[:, None] + np.take_along_axis(season, np.broadcast_to(slots, (len(best), horizon)), axis=1)
+
+    # Var(h) = sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha + beta * phi_j + gamma * [j % m == 0]
+    c = alpha + beta * phi_h + gamma * ((steps % m) == 0)
+    var_factor = 1.0 + np.concatenate([np.zeros((len(best), 1)), np.cumsum(c * c, axis=1)[:, :-1]], axis=1)
+    return mean, np.sqrt(var_factor)
+
+
+def fit_forecast(values, horizon=DEFAULT_HORIZON, interval=DEFAULT_INTERVAL,
+                 season_length=SEASON_LENGTH, min_history=MIN_HISTORY):
+    """
+    Forecast every row of a domain x month matrix.
+
+    Rows with at least two full seasons of data get the seasonal model, other
+    rows a damped trend only. Rows with fewer than min_history observations,
+    or none in the last STALE_MONTHS months, are not fitted.
+
+    Args:
+        values: (n_domains, n_months) array-like, NaN where missing
+        horizon: Months to forecast past the last column
+        interval: Central coverage of the lower/upper band
+        season_length: Months per season
+        min_history: Observed months needed to fit a row
+
+    Returns:
+        Dict of arrays: 'fitted' (n,) bool, 'mean'/'lower'/'upper' (n, horizon)
+        on the original scale (NaN for unfitted rows), 'params' (n, 4) as
+        alpha/beta/gamma/phi, 'seasonal' (n,) bool
+    """
+    values = np.asarray(values, dtype=float)
+    n, n_t = values.shape
+    y = np.log1p(np.where(values >= 0, values, np.nan))
+    observed = ~np.isnan(y)
+    n_obs = observed.sum(axis=1)
+    start = np.where(n_obs > 0, observed.argmax(axis=1), 0)
+    recent = observed[:, max(n_t - STALE_MONTHS, 0):].any(axis=1)
+
+    fitted = (n_obs >= min_history) & recent
+    seasonal = fitted & (n_t - start >= 2 * season_length) & (n_obs >= 2 * season_length)
+    z = NormalDist().inv_cdf(0.5 + interval / 2)
+
+    log_mean = np.full((n, horizon), np.nan)
+    half = np.full((n, horizon), np.nan)
+    params = np.full((n, 4), np.nan)
+
+    for is_seasonal in (True, False):
+        m = season_length if is_seasonal else 1
+        grid = parameter_grid(is_seasonal)
+        batch = np.flatnonzero(fitted & (seasonal == is_seasonal))
+        for lo in range(0, len(batch), CHUNK_ROWS):
+            rows = batch[lo:lo + CHUNK_ROWS]
+            best, sigma, level, trend, season = _fit_batch(y[rows], start[rows], m, grid)
+            mean, spread = _horizon_paths(grid, best, level, trend, season, n_t, m, horizon)
+            log_mean[rows] = mean
+            half[rows] = z * sigma[:, None] * spread
+            params[rows] = np.stack([g[best] for g in grid], axis=1)
+
+    return {
+        'fitted': fitted,
+        'seasonal': seasonal,
+        'mean': np.maximum(np.expm1(log_mean), 0.0),
+        'lower': np.maximum(np.expm1(log_mean - half), 0.0),
+        'upper': np.expm1(log_mean + half),
+        'params': params
+    }
+
+
+def future_months(last_month, horizon):
+    """The horizon month starts after last_month (a date or Timestamp)."""
+    months = []
+    year, month = last_month.year, last_month.month
+    for _ in range(horizon):
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+        months.append(date(year, month, 1))
+    return months
+
+
+def forecast_document(datasets, horizon=DEFAULT_HORIZON, interval=DEFAULT_INTERVAL, generated_at=None):
+    """
+    Build the forecast.json document for the dashboard.
+
+    Args:
+        datasets: Dict of key (e.g. 'traffic_monthly', 'revenue') ->
+                  (domains, months, values) with months a sorted list of
+                  month-start dates matching the columns of values
+        generated_at: ISO timestamp to record (default: now)
+
+    Returns:
+        Dict with per-dataset, per-domain {'dates', 'values', 'lower', 'upper'}
+        in dashboard date format ('Jan 1 2026')
+    """
+    def format_value(v):
+        return int(v) if v == int(v) else round(float(v), 2)
+
+    series = {}
+    for key, (domains, months, values) in datasets.items():
+        if not len(domains) or not len(months):
+            series[key] = {}
+            continue
+        started = time.perf_counter()
+        result = fit_forecast(values, horizon=horizon, interval=interval)
+        dates = [f"{MONTH_NAMES[d.month - 1]} {d.day} {d.year}" for d in future_months(months[-1], horizon)]
+        by_domain = {}
+        for i in np.flatnonzero(result['fitted']):
+            by_domain[domains[i]] = {
+                'dates': dates,
+                'values': [format_value(v) for v in np.round(result['mean'][i], 2)],
+                'lower': [format_value(v) for v in np.round(result['lower'][i], 2)],
+                'upper': [format_value(v) for v in np.round(result['upper'][i], 2)]
+            }
+        series[key] = by_domain
+        print(f"Forecast: {key} -> {len(by_domain)}/{len(domains)} domains "
+              f"({int(result['seasonal'].sum())} seasonal) in {time.perf_counter() - started:.1f}s")
+
+    return {
+        'generated_at': generated_at or datetime.utcnow().isoformat() + 'Z',
+        'horizon': horizon,
+        'interval': interval,
+        'model': 'holt-winters-damped',
+        'series': series
+    }
+
+
+def main():
+    import argparse
+    from analysis.ranks import metric_matrix
+
+    dataset_keys = {'traffic': 'traffic_monthly', 'revenue': 'revenue'}
+
+    parser = argparse.ArgumentParser(description='Forecast monthly traffic and revenue for every domain')
+    parser.add_argument('--metric', action='append', choices=sorted(dataset_keys),
+                        help='Metric to forecast (repeatable, default: both)')
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument('--out', default='forecast.json')
+    args = parser.parse_args()
+
+    this_month = date.today().replace(day=1)
+    datasets = {}
+    for metric in args.metric or sorted(dataset_keys):
+        matrix = metric_matrix(metric)
+        # Same month window as the sync: no future columns, complete months only for revenue
+        keep = [m.date() < this_month or (m.date() == this_month and metric != 'revenue') for m in matrix.columns]
+        matrix = matrix.loc[:, keep]
+        matrix.index = matrix.index.str.strip().str.lower()
+        matrix = matrix[~matrix.index.duplicated()]
+        datasets[dataset_keys[metric]] = (list(matrix.index), list(matrix.columns), matrix.to_numpy(dtype=float))
+
+    document = forecast_document(datasets, horizon=args.horizon, interval=args.interval)
+    with open(args.out, 'w') as f:
+        json.dump(document, f, separators=(',', ':'))
+    print(f"✓ Saved: {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Lag sweep: traffic vs revenue correlation for every lag from 0 to 180 days.
+
+The lagged variants in analysis.align look up the snapshot closest to
+(month end - N days). Here that lookup is done once per site per calendar day
+(a daily "nearest snapshot" matrix), so every lag is a shifted gather from the
+same array. Pearson and Spearman (Pearson on average ranks) are computed for
+all lags at once with NaN-masked reductions, per segment and per site.
+
+Lag 30 and lag 60 reproduce the traffic_lag30 / traffic_lag60 correlations.
+Lag 0 is the snapshot nearest month end, not the same-month methods.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata, t as t_dist
+
+DEFAULT_MAX_LAG = 180
+LAG_TOLERANCE_DAYS = 30
+SWEEP_COLUMNS = ['lag', 'n', 'pearson_r', 'pearson_p', 'spearman_r', 'spearman_p']
+
+
+def daily_nearest(traffic_long, start, end, tolerance_days=LAG_TOLERANCE_DAYS):
+    """
+    Nearest traffic snapshot for every site and every day in start..end.
+
+    Ties between an earlier and a later snapshot go to the one that comes
+    first in traffic_long, like get_lagged_traffic.
+
+    Returns:
+        (sites Index, first day as Timestamp, float64 matrix n_sites x n_days)
+    """
+    snaps = traffic_long[['website', 'date', 'traffic']].copy()
+    snaps['pos'] = np.arange(len(snaps))
+    snaps = snaps.drop_duplicates(['website', 'date'], keep='first')
+
+    first = min(pd.Timestamp(start), snaps['date'].min()) if len(snaps) else pd.Timestamp(start)
+    last = max(pd.Timestamp(end), snaps['date'].max()) if len(snaps) else pd.Timestamp(end)
+    n_days = (last - first).days + 1
+    sites = pd.Index(snaps['website'].unique())
+
+    values = np.full((len(sites), n_days), np.nan)
+    order = np.full((len(sites), n_days), np.inf)
+    rows = sites.get_indexer(snaps['website'])
+    cols = (snaps['date'] - first).dt.days.to_numpy()
+    values[rows, cols] = snaps['traffic'].to_numpy(dtype=np.float64)
+    order[rows, cols] = snaps['pos'].to_numpy()
+
+    present = ~np.isnan(values)
+    day = np.arange(n_days)
+    prev = np.maximum.accumulate(np.where(present, day, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(present, day, n_days)[:, ::-1], axis=1)[:, ::-1]
+    has_prev = prev >= 0
+    has_next = nxt < n_days
+    d_prev = np.where(has_prev, day - prev, np.iinfo(np.int64).max)
+    d_next = np.where(has_next, nxt - day, np.iinfo(np.int64).max)
+
+    r = np.arange(len(sites))[:, None]
+    prev_c = np.maximum(prev, 0)
+    next_c = np.minimum(nxt, n_days - 1)
+    use_next = has_next & ((d_next < d_prev) | ((d_next == d_prev) & (order[r, next_c] < order[r, prev_c])))
+    picked = np.where(use_next, values[r, next_c], values[r, prev_c])
+    dist = np.where(use_next, d_next, d_prev)
+    nearest = np.where((has_prev | has_next) & (dist <= tolerance_days), picked, np.nan)
+    return sites, first, nearest
+
+
+def lagged_matrix(revenue_df, traffic_long, lags, tolerance_days=LAG_TOLERANCE_DAYS):
+    """
+    Traffic at (month end - lag) for every revenue row and every lag.
+
+    Returns:
+        float64 matrix n_lags x n_revenue_rows (NaN when no snapshot is within
+        tolerance)
+    """
+    lags = np.asarray(lags)
+    month_end = (revenue_df['month'].dt.to_period('M').dt.to_timestamp() + pd.offsets.MonthEnd(0))
+    if len(revenue_df) == 0:
+        return np.empty((len(lags), 0))
+    start = month_end.min() - pd.Timedelta(days=int(lags.max()))
+    sites, first, nearest = daily_nearest(traffic_long, start, month_end.max(), tolerance_days)
+
+    # Sites without traffic read from an all-NaN row appended at the end
+    nearest = np.vstack([nearest, np.full((1, nearest.shape[1]), np.nan)])
+    site_rows = sites.get_indexer(revenue_df['website'])
+    site_rows = np.where(site_rows < 0, len(sites), site_rows)
+    target = (month_end - first).dt.days.to_numpy()
+    return nearest[site_rows[None, :], target[None, :] - lags[:, None]]
+
+
+def masked_pearson(x, y, min_pairs=3, axis=-1):
+    """
+    Pearson r and two-sided p along axis, using only positions where both
+    x and y are present.
+
+    Returns:
+        (r, p, n) arrays with axis reduced; NaN where n < min_pairs
+    """
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    n = valid.sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx = np.where(valid, x, 0.0).sum(axis=axis, keepdims=True) / np.expand_dims(n, axis)
+        my = np.where(valid, y, 0.0).sum(axis=axis, keepdims=True) / np.expand_dims(n, axis)
+        dx = np.where(valid, x - mx, 0.0)
+        dy = np.where(valid, y - my, 0.0)
+        r = (dx * dy).sum(axis=axis) / np.sqrt((dx * dx).sum(axis=axis) * (dy * dy).sum(axis=axis))
+        r = np.clip(r, -1.0, 1.0)
+        r = np.where(n >= min_pairs, r, np.nan)
+        dof = n - 2
+        t_stat = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p = np.where(np.abs(r) == 1.0, 0.0, 2 * t_dist.sf(np.abs(t_stat), np.maximum(dof, 1)))
+    return r, np.where(np.isnan(r), np.nan, p), n
+
+
+def masked_spearman(x, y, min_pairs=3, axis=-1):
+    """Spearman rho (Pearson on average ranks) with the same masking as masked_pearson."""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x_ranks = rankdata(np.where(valid, x, np.nan), axis=axis, nan_policy='omit')
+    y_ranks = rankdata(np.where(valid, y, np.nan), axis=axis, nan_policy='omit')
+    return masked_pearson(x_ranks, y_ranks, min_pairs=min_pairs, axis=axis)
+
+
+def _sweep_frame(lags, pearson, spearman):
+    r, p, n = pearson
+    rho, rho_p, _ = spearman
+    return pd.DataFrame({'lag': lags, 'n': n, 'pearson_r': r, 'pearson_p': p,
+                         'spearman_r': rho, 'spearman_p': rho_p})
+
+
+def lag_sweep(revenue_df, traffic_long, segments, lags=None, tolerance_days=LAG_TOLERANCE_DAYS, min_pairs=3):
+    """
+    Correlation curve over lags for each segment of sites.
+
+    Args:
+        revenue_df: DataFrame with website, month, revenue
+        traffic_long: DataFrame with website, date, traffic
+        segments: Dict of segment name -> list of (lowercase) websites
+        lags: Lags in days (default 0..180)
+        tolerance_days: Maximum snapshot distance from the lagged date
+        min_pairs: Minimum site-months for a correlation (as calc_correlation)
+
+    Returns:
+        DataFrame with segment + SWEEP_COLUMNS, one row per segment and lag
+    """
+    lags = np.arange(DEFAULT_MAX_LAG + 1) if lags is None else np.asarray(lags)
+    traffic = lagged_matrix(revenue_df, traffic_long, lags, tolerance_days)
+    revenue = revenue_df['revenue'].to_numpy(dtype=np.float64)
+
+    frames = []
+    for name, sites in segments.items():
+        cols = revenue_df['website'].isin(sites).to_numpy()
+        x = traffic[:, cols]
+        y = np.broadcast_to(revenue[cols], x.shape)
+        frame = _sweep_frame(lags, masked_pearson(x, y, min_pairs), masked_spearman(x, y, min_pairs))
+        frame.insert(0, 'segment', name)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def site_lag_sweep(revenue_df, traffic_long, lags=None, tolerance_days=LAG_TOLERANCE_DAYS, min_pairs=6):
+    """
+    Correlation curve over lags for each site, across that site's months.
+
+    A site needs at least min_pairs months with both revenue and lagged
+    traffic for a value at a given lag.
+
+    Returns:
+        DataFrame with website + SWEEP_COLUMNS, one row per site and lag
+    """
+    lags = np.arange(DEFAULT_MAX_LAG + 1) if lags is None else np.asarray(lags)
+    traffic = lagged_matrix(revenue_df, traffic_long, lags, tolerance_days)
+    revenue = revenue_df['revenue'].to_numpy(dtype=np.float64)
+
+    # Pad to lags x sites x months so every site reduces along the last axis
+    site_codes, sites = pd.factorize(revenue_df['website'])
+    slot = pd.Series(site_codes).groupby(site_codes).cumcount().to_numpy()
+    width = int(slot.max()) + 1 if len(slot) else 0
+    x = np.full((len(lags), len(sites), width), np.nan)
+    y = np.full((len(sites), width), np.nan)
+    x[:, site_codes, slot] = traffic
+    y[site_codes, slot] = revenue
+    y = np.broadcast_to(y, x.shape)
+
+    r, p, n = masked_pearson(x, y, min_pairs)
+    rho, rho_p, _ = masked_spearman(x, y, min_pairs)
+    return pd.DataFrame({
+        'website': np.tile(np.asarray(sites, dtype=object), len(lags)),
+        'lag': np.repeat(lags, len(sites)),
+        'n': n.ravel(),
+        'pearson_r': r.ravel(),
+        'pearson_p': p.ravel(),
+        'spearman_r': rho.ravel(),
+        'spearman_p': rho_p.ravel(),
+    })
+
+
+def best_lags(sweep_df, by, metric='pearson_r'):
+    """
+    Row with the strongest |metric| for each group (e.g. by='segment' or 'website').
+
+    Groups where the metric is NaN at every lag are dropped.
+    """
+    valid = sweep_df[sweep_df[metric].notna()]
+    if valid.empty:
+        return valid.reset_index(drop=True)
+    best = valid[metric].abs().groupby(valid[by], sort=False).idxmax()
+    return valid.loc[best.to_numpy()].reset_index(drop=True)
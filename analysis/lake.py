@@ -0,0 +1,263 @@
+"""
+Long-format Parquet metrics lake.
+
+Converts the wide CSVs written by the sync Lambda into one columnar dataset:
+
+    domain | date | metric | source | value
+
+partitioned as <root>/metric=<metric>/month=<YYYY-MM>/part-0.parquet, with
+domain stored as a dictionary column. A small domains table with niche
+lives at <root>/_dimensions/domains.parquet.
+
+The Lambda package has no pyarrow, so the lake is built locally from a
+directory of synced CSVs or straight from the S3 bucket:
+
+    python -m analysis.lake build --src . --out metrics-lake
+    python -m analysis.lake build --bucket traffic-dashboard-theta --out metrics-lake
+"""
+
+import io
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis.loaders import DATE_DTYPE, melt_wide, website_column
+
+DEFAULT_LAKE_DIR = 'metrics-lake'
+
+# metric -> (S3 file name, source, header layout)
+LAKE_METRICS = {
+    'traffic_monthly': ('traffic-data.csv', 'internal', 'daily'),
+    'traffic_average': ('internal-average-traffic.csv', 'internal', 'daily'),
+    'dr': ('DR History.csv', 'ahrefs', 'daily'),
+    'rd': ('RD History.csv', 'ahrefs', 'daily'),
+    'revenue': ('revenue-history.csv', 'internal', 'monthly'),
+}
+
+LAKE_COLUMNS = ['domain', 'date', 'metric', 'source', 'value']
+
+def wide_to_long(wide_df, metric, source, layout):
+    """
+    Melt one wide sheet export into lake rows.
+
+    Args:
+        wide_df: DataFrame read with dtype=str
+        metric: Metric name stored in the 'metric' column
+        source: 'internal' or 'ahrefs'
+        layout: 'daily' ('Mon D - YYYY' headers) or 'monthly' ('Mon YYYY' headers)
+
+    Returns:
+        DataFrame with LAKE_COLUMNS; empty, '-' and 'x' cells are dropped
+    """
+    website_col = website_column(wide_df)
+    raw = wide_df[website_col].astype('string').str.strip().str.lower()
+    valid = (raw != '-') & (raw != 'website')
+    long_df = melt_wide(wide_df, layout, 'value', row_mask=valid.fillna(False))
+    if long_df.empty:
+        return pd.DataFrame(columns=LAKE_COLUMNS)
+
+    return pd.DataFrame({
+        'domain': long_df['website'].to_numpy(dtype=object),
+        'date': long_df['date'].to_numpy(),
+        'metric': metric,
+        'source': source,
+        'value': long_df['value'].to_numpy(dtype=np.float64),
+    })
+
+
+def load_sources(src_dir=None, bucket=None, metrics=None):
+    """
+    Read the wide CSVs for each metric from a local directory or S3.
+
+    Returns:
+        Dict of metric -> wide DataFrame (dtype=str); missing files are skipped
+    """
+    frames = {}
+    s3_client = None
+    if bucket:
+        import boto3
+        s3_client = boto3.client('s3')
+
+    for metric in (metrics or LAKE_METRICS):
+        file_name = LAKE_METRICS[metric][0]
+        try:
+            if s3_client:
+                body = s3_client.get_object(Bucket=bucket, Key=file_name)['Body'].read()
+                frames[metric] = pd.read_csv(io.BytesIO(body), dtype=str)
+            else:
+                frames[metric] = pd.read_csv(os.path.join(src_dir or '.', file_name), dtype=str)
+        except Exception as e:
+            print(f"   Skipping {metric} ({file_name}): {e}")
+    return frames
+
+
+def _domain_dimension(revenue_wide):
+    website_col = website_column(revenue_wide)
+    dims = pd.DataFrame({
+        'domain': revenue_wide[website_col].astype('string').str.strip().str.lower(),
+        'niche': revenue_wide['Niche'] if 'Niche' in revenue_wide.columns else 'Unknown',
+    })
+    dims = dims[dims['domain'].notna() & (dims['domain'] != '') & (dims['domain'] != '-')]
+    return dims.drop_duplicates('domain')
+
+
+def write_lake(frames, out_dir=DEFAULT_LAKE_DIR):
+    """
+    Write wide DataFrames to the partitioned lake, replacing touched partitions.
+
+    Args:
+        frames: Dict of metric -> wide DataFrame (from load_sources)
+        out_dir: Lake root directory
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = pa.schema([
+        ('domain', pa.dictionary(pa.int32(), pa.string())),
+        ('date', pa.date32()),
+        ('source', pa.dictionary(pa.int8(), pa.string())),
+        ('value', pa.float64()),
+        ('metric', pa.string()),
+        ('month', pa.string()),
+    ])
+
+    total = 0
+    for metric, wide_df in frames.items():
+        _, source, layout = LAKE_METRICS[metric]
+        long_df = wide_to_long(wide_df, metric, source, layout)
+        if long_df.empty:
+            print(f"   {metric}: no values")
+            continue
+        long_df['month'] = long_df['date'].dt.strftime('%Y-%m')
+        long_df['date'] = long_df['date'].dt.date
+        table = pa.Table.from_pandas(long_df[schema.names], schema=schema, preserve_index=False)
+        ds.write_dataset(
+            table, out_dir, format='parquet',
+            partitioning=ds.partitioning(pa.schema([('metric', pa.string()), ('month', pa.string())]), flavor='hive'),
+            existing_data_behavior='delete_matching',
+            basename_template='part-{i}.parquet',
+        )
+        total += len(long_df)
+        print(f"   {metric}: {len(long_df):,} rows, {long_df['domain'].nunique():,} domains, {long_df['month'].nunique()} months")
+
+    if 'revenue' in frames:
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.join(out_dir, '_dimensions'), exist_ok=True)
+        dims = _domain_dimension(frames['revenue'])
+        pq.write_table(pa.Table.from_pandas(dims, preserve_index=False),
+                       os.path.join(out_dir, '_dimensions', 'domains.parquet'))
+
+    return total
+
+
+def read_lake(root=DEFAULT_LAKE_DIR, metrics=None, start=None, end=None, columns=None, domains=None):
+    """
+    Read a slice of the lake, pruning partitions and columns.
+
+    Args:
+        root: Lake root directory
+        metrics: Metric names to read (default: all)
+        start, end: Optional inclusive date bounds (anything pd.Timestamp accepts)
+        columns: Columns to return (default: LAKE_COLUMNS)
+        domains: Optional iterable of domains (lowercase)
+
+    Returns:
+        DataFrame with 'date' as datetime64 (DATE_DTYPE) and 'domain' as category
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(
+        root, format='parquet',
+        partitioning=ds.partitioning(pa.schema([('metric', pa.string()), ('month', pa.string())]), flavor='hive'),
+    )
+
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if metrics:
+        expr = both(expr, ds.field('metric').isin(list(metrics)))
+    if start is not None:
+        start = pd.Timestamp(start)
+        expr = both(expr, ds.field('month') >= start.strftime('%Y-%m'))
+        expr = both(expr, ds.field('date') >= pa.scalar(start.date(), pa.date32()))
+    if end is not None:
+        end = pd.Timestamp(end)
+        expr = both(expr, ds.field('month') <= end.strftime('%Y-%m'))
+        expr = both(expr, ds.field('date') <= pa.scalar(end.date(), pa.date32()))
+    if domains is not None:
+        expr = both(expr, ds.field('domain').cast(pa.string()).isin([d.lower() for d in domains]))
+
+    table = dataset.to_table(columns=list(columns or LAKE_COLUMNS), filter=expr)
+    df = table.to_pandas()
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date']).astype(DATE_DTYPE)
+    return df
+
+
+def read_domains(root=DEFAULT_LAKE_DIR):
+    """Return the domain dimension (domain, niche), or an empty frame if missing."""
+    path = os.path.join(root, '_dimensions', 'domains.parquet')
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['domain', 'niche'])
+    return pd.read_parquet(path)
+
+
+def load_analysis_frames(root=DEFAULT_LAKE_DIR, domains=None):
+    """
+    Read revenue and traffic in the long layout the analysis scripts use.
+
+    Returns:
+        (revenue_long, traffic_long) with columns
+        (website, niche, month, revenue) and (website, date, traffic)
+    """
+    revenue = read_lake(root, metrics=['revenue'], columns=['domain', 'date', 'value'], domains=domains)
+    revenue_long = revenue.rename(columns={'domain': 'website', 'date': 'month', 'value': 'revenue'})
+    revenue_long['website'] = revenue_long['website'].astype(object)
+    niches = read_domains(root).rename(columns={'domain': 'website'})
+    niches['website'] = niches['website'].astype(object)
+    revenue_long = revenue_long.merge(niches, on='website', how='left')
+    if niches.empty:
+        revenue_long['niche'] = 'Unknown'
+    revenue_long = revenue_long[['website', 'niche', 'month', 'revenue']]
+
+    traffic = read_lake(root, metrics=['traffic_monthly'], columns=['domain', 'date', 'value'], domains=domains)
+    traffic_long = traffic.rename(columns={'domain': 'website', 'value': 'traffic'})
+    traffic_long = traffic_long[traffic_long['traffic'] > 0]
+
+    # Match the CSV loaders: website-major rows in date order (the lake reads
+    # month-major) and the same website dtype, so the frames join with each other
+    revenue_long = revenue_long.sort_values(['website', 'month'], kind='mergesort').reset_index(drop=True)
+    traffic_long = traffic_long.sort_values(['website', 'date'], kind='mergesort').reset_index(drop=True)
+    revenue_long['website'] = revenue_long['website'].astype('str')
+    traffic_long['website'] = traffic_long['website'].astype('str')
+
+    return revenue_long, traffic_long
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the long-format Parquet metrics lake')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_cmd = sub.add_parser('build', help='Convert synced wide CSVs into the lake')
+    build_cmd.add_argument('--src', default='.', help='Directory containing the synced CSVs')
+    build_cmd.add_argument('--bucket', help='Read the CSVs from this S3 bucket instead of --src')
+    build_cmd.add_argument('--out', default=DEFAULT_LAKE_DIR, help='Lake root directory')
+    build_cmd.add_argument('--metric', action='append', choices=sorted(LAKE_METRICS), help='Only rebuild these metrics')
+    args = parser.parse_args()
+
+    print(f"📂 Loading wide CSVs from {'s3://' + args.bucket if args.bucket else args.src}...")
+    frames = load_sources(src_dir=args.src, bucket=args.bucket, metrics=args.metric)
+    print(f"🧱 Writing lake to {args.out}/...")
+    total = write_lake(frames, args.out)
+    print(f"✅ {total:,} rows written")
+
+
+if __name__ == '__main__':
+    main()
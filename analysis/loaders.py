@@ -0,0 +1,271 @@
+"""
+Vectorised loaders for the wide sheet exports.
+
+Each date header is parsed once per column instead of once per cell, and
+values are melted and cleaned with pandas string/numeric operations instead
+of iterrows loops. Output frames keep the column names the analysis scripts
+already use:
+
+    load_traffic_long()  -> website, date, traffic   (traffic > 0 only)
+    load_revenue_long()  -> website, niche, month, revenue
+    load_dr_long()       -> website, date, dr
+
+Files are read through a per-dataset profile (READ_PROFILES): only the
+Website column, the profile's id columns and the first column for each date
+inside the optional start/end window are parsed, with pyarrow, and cells are
+cleaned straight to float32/float64 - the duplicated second series, metadata
+columns and out-of-window dates are never materialised as Python strings.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+_MONTHS = '(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+DAILY_HEADER_RE = re.compile(r'^' + _MONTHS + r'\s+(\d{1,2})\s*-\s*(\d{4})$')
+MONTHLY_HEADER_RE = re.compile(r'^' + _MONTHS + r'\s+(\d{4})$')
+NUMBER_RE = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+# Datetime unit pandas gives parsed header dates; other sources (the lake,
+# the matrix store) cast to it so their frames join with the loaders' frames
+DATE_DTYPE = pd.to_datetime(['2000-01-01']).dtype
+
+# dataset -> header layout, columns kept besides Website and the dates, value dtype.
+# Revenue stays float64 so cents survive; traffic and DR are whole numbers.
+READ_PROFILES = {
+    'traffic': {'layout': 'daily', 'id_columns': (), 'dtype': 'float32'},
+    'revenue': {'layout': 'monthly', 'id_columns': ('Niche',), 'dtype': 'float64'},
+    'dr': {'layout': 'daily', 'id_columns': (), 'dtype': 'float32'},
+}
+
+
+def parse_header_dates(columns, layout='daily'):
+    """
+    Parse date headers once per column.
+
+    Suffixed duplicates ('_1', or '.1' from pandas de-duplication) never
+    match, and only the first column for each date is kept - the same rule
+    the dashboard and the sync use.
+
+    Args:
+        columns: Column labels
+        layout: 'daily' ('Mon D - YYYY') or 'monthly' ('Mon YYYY')
+
+    Returns:
+        Dict of column label -> Timestamp, in column order
+    """
+    pattern = DAILY_HEADER_RE if layout == 'daily' else MONTHLY_HEADER_RE
+    fmt = '%b %d %Y' if layout == 'daily' else '%b %Y'
+    dates = {}
+    seen = set()
+    for col in columns:
+        match = pattern.match(str(col).strip())
+        if not match:
+            continue
+        try:
+            parsed = pd.to_datetime(' '.join(match.groups()), format=fmt)
+        except ValueError:
+            continue
+        if parsed in seen:
+            continue
+        seen.add(parsed)
+        dates[col] = parsed
+    return dates
+
+
+def website_column(df):
+    """The 'Website' column, or the second column (the traffic export layout)."""
+    columns = df.columns if isinstance(df, pd.DataFrame) else list(df)
+    for col in columns:
+        if str(col).strip().lower() == 'website':
+            return col
+    return columns[1]
+
+
+def clean_numeric(values):
+    """
+    Vectorised version of parse_revenue: strips '$', ',' and whitespace;
+    '-', 'x' and empty cells become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+    cleaned = values.astype('string').str.replace(r'[\$,\s]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').astype('float64')
+
+
+def _arrow_numeric(column, dtype):
+    """clean_numeric in pyarrow compute: currency strings -> float array, NaN for the rest."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    cleaned = pc.replace_substring_regex(column, r'[\$,\s]', '')
+    cleaned = pc.if_else(pc.match_substring_regex(cleaned, NUMBER_RE), cleaned, pa.scalar(None, pa.string()))
+    return pc.cast(cleaned, pa.from_numpy_dtype(np.dtype(dtype))).to_numpy(zero_copy_only=False)
+
+
+def _select_columns(columns, profile, start=None, end=None):
+    """Positions of the Website and id columns, then the in-window date columns a profile reads."""
+    columns = list(columns)
+    website_col = website_column(columns)
+    keep = [columns.index(website_col)]
+    keep += [columns.index(col) for col in profile['id_columns'] if col in columns and col != website_col]
+    for col, parsed in parse_header_dates(columns, profile['layout']).items():
+        if (start is None or parsed >= start) and (end is None or parsed <= end):
+            keep.append(columns.index(col))
+    return keep
+
+
+def _read_profiled(source, columns, positions, n_ids, dtype):
+    """Read columns by position: the first n_ids as strings, the rest cleaned to dtype."""
+    labels = [columns[i] for i in positions]
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pv
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        # Positional names: the exports repeat date headers, which include_columns can't tell apart
+        names = [f'c{i}' for i in range(len(columns))]
+        try:
+            table = pv.read_csv(
+                source,
+                read_options=pv.ReadOptions(column_names=names, skip_rows=1),
+                convert_options=pv.ConvertOptions(
+                    include_columns=[names[i] for i in positions],
+                    column_types={names[i]: pa.string() for i in positions},
+                    strings_can_be_null=True,
+                ),
+            )
+        except pa.ArrowInvalid:
+            table = None
+        if table is not None:
+            data = {}
+            for k, (i, label) in enumerate(zip(positions, labels)):
+                column = table.column(names[i])
+                data[label] = column.to_pandas().astype(object) if k < n_ids else _arrow_numeric(column, dtype)
+            return pd.DataFrame(data)
+
+    # No pyarrow (or a ragged file): C parser on the same columns
+    wide_df = pd.read_csv(source, usecols=positions, dtype=str)
+    wide_df.columns = [columns[i] for i in sorted(positions)]
+    wide_df = wide_df[labels]
+    for label in labels[n_ids:]:
+        wide_df[label] = clean_numeric(wide_df[label]).astype(dtype)
+    return wide_df
+
+
+def read_wide_csv(source, profile=None, start=None, end=None):
+    """
+    Read a wide export (a DataFrame is passed through).
+
+    Args:
+        source: CSV path or DataFrame
+        profile: Key of READ_PROFILES; without one every column is read as str
+        start, end: Optional Timestamps; date columns outside [start, end]
+            are skipped before anything is parsed
+
+    Returns:
+        DataFrame; with a profile, only the Website, id and first-occurrence
+        date columns, with dates already numeric
+    """
+    if profile is None or isinstance(source, pd.DataFrame):
+        wide_df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source, dtype=str)
+        if profile is None or (start is None and end is None):
+            return wide_df
+        positions = _select_columns(wide_df.columns, READ_PROFILES[profile], start, end)
+        return wide_df.iloc[:, positions]
+
+    profile = READ_PROFILES[profile]
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    positions = _select_columns(columns, profile, start, end)
+    n_ids = 1 + sum(col in columns and col != website_column(columns) for col in profile['id_columns'])
+    return _read_profiled(source, columns, positions, n_ids, profile['dtype'])
+
+
+def melt_wide(wide_df, layout='daily', value_name='value', row_mask=None, positive_only=False):
+    """
+    Melt a wide export into (website, date, value) rows.
+
+    Rows come out website-major in sheet order, then by date column, with
+    empty and unparseable cells dropped.
+
+    Args:
+        wide_df: Wide DataFrame (ideally read with dtype=str)
+        layout: 'daily' or 'monthly' header format
+        value_name: Name of the value column
+        row_mask: Optional boolean Series selecting rows to keep
+        positive_only: Drop zero and negative cells as well as empty ones
+
+    Returns:
+        DataFrame with website (lowercase), date and value_name columns;
+        the original row label is kept as the index
+    """
+    website_col = website_column(wide_df)
+    header_dates = parse_header_dates(wide_df.columns, layout)
+
+    websites = wide_df[website_col].astype('string').str.strip().str.lower()
+    keep = websites.notna() & (websites != '')
+    if row_mask is not None:
+        keep &= row_mask
+    if not header_dates or not keep.any():
+        return pd.DataFrame({'website': pd.Series(dtype=object),
+                             'date': pd.Series(dtype='datetime64[ns]'),
+                             value_name: pd.Series(dtype=float)})
+
+    # One numeric site x date matrix, then the non-empty cells in row-major
+    # (website-major, then date) order - no stacked MultiIndex of strings
+    block = wide_df.loc[keep, list(header_dates)]
+    matrix = np.empty(block.shape, dtype=np.float64)
+    for j, col in enumerate(block.columns):
+        matrix[:, j] = clean_numeric(block.iloc[:, j]).to_numpy(dtype=np.float64, na_value=np.nan)
+    present = matrix > 0 if positive_only else ~np.isnan(matrix)
+    rows, cols = np.nonzero(present)
+
+    return pd.DataFrame({
+        'website': pd.array(websites[keep].to_numpy(dtype=object), dtype='str').take(rows),
+        'date': pd.DatetimeIndex(list(header_dates.values()))[cols],
+        value_name: matrix[rows, cols],
+    }, index=block.index[rows], copy=False)
+
+
+def load_traffic_long(source='traffic-data.csv', positive_only=True, start=None, end=None):
+    """
+    Internal traffic snapshots in long format.
+
+    Args:
+        start, end: Optional Timestamps bounding the snapshot dates read
+
+    Returns:
+        DataFrame (website, date, traffic); zero/negative snapshots dropped
+        unless positive_only is False
+    """
+    wide_df = read_wide_csv(source, 'traffic', start, end)
+    return melt_wide(wide_df, 'daily', 'traffic', positive_only=positive_only).reset_index(drop=True)
+
+
+def load_revenue_long(source='revenue-history.csv', start=None, end=None):
+    """
+    Monthly revenue in long format.
+
+    Args:
+        start, end: Optional Timestamps bounding the months read
+
+    Returns:
+        DataFrame (website, niche, month, revenue); rows whose Website is
+        missing or '-' are skipped, '-' / 'x' / empty cells are dropped
+    """
+    wide_df = read_wide_csv(source, 'revenue', start, end)
+    website_col = website_column(wide_df)
+    valid = wide_df[website_col].notna() & (wide_df[website_col] != '-')
+    long_df = melt_wide(wide_df, 'monthly', 'revenue', row_mask=valid)
+    long_df = long_df.rename(columns={'date': 'month'})
+    niche = wide_df['Niche'] if 'Niche' in wide_df.columns else pd.Series('Unknown', index=wide_df.index)
+    long_df.insert(1, 'niche', niche.loc[long_df.index].to_numpy(dtype=object))
+    return long_df.reset_index(drop=True)
+
+
+def load_dr_long(source='DR History.csv', start=None, end=None):
+    """Domain Rating snapshots in long format: (website, date, dr)."""
+    return melt_wide(read_wide_csv(source, 'dr', start, end), 'daily', 'dr').reset_index(drop=True)
@@ -0,0 +1,403 @@
+"""
+Cached, incremental analysis pipeline shared by the analysis scripts.
+
+Stages and what they read:
+
+    load        raw CSVs (or the Parquet lake; traffic from the matrix store
+                when there is no lake) -> top-N revenue and traffic
+    align       load -> combined site-month dataset, cached per month
+    correlate   align -> Pearson/Spearman per segment x traffic method
+    efficiency  align -> revenue per traffic unit (RPTU) per site
+    stability   load, align, efficiency -> CV, trend and quadrant per site
+    bands       align -> revenue by same-month traffic band
+    intervals   align -> bootstrap confidence intervals (analysis/bootstrap.py)
+    lag_sweep   load -> 0-180 day lag curves (analysis/lagsweep.py)
+
+Each stage's output is pickled under .analysis-cache/<stage>/<key>.pkl. The
+key hashes the stage's code (its method plus the engine modules it calls),
+its parameters and the content fingerprints of its inputs, so editing a
+script's printing or charts reuses everything, and a stage whose inputs come
+out unchanged is not rerun. align is cached per revenue month, keyed on that
+month's revenue rows and the traffic snapshots its lookups can reach, so a
+sync that only touched the current month recomputes only that month. Month
+entries live under .analysis-cache/align-months/; the ones a run did not use
+are deleted when the stage finishes.
+
+    pipeline = Pipeline(TOP_250_LOWER)
+    combined_df = pipeline.get('align')
+
+Set ANALYSIS_CACHE=0 (or cache_dir=None) to recompute everything.
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import inspect
+
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr, spearmanr
+
+from analysis import align as align_engine
+from analysis import bootstrap as bootstrap_engine
+from analysis import lagsweep as lagsweep_engine
+from analysis import lake as lake_engine
+from analysis import loaders as loaders_engine
+from analysis import stability as stability_engine
+from analysis import store as store_engine
+
+DEFAULT_CACHE_DIR = '.analysis-cache'
+PIPELINE_VERSION = 1
+
+SEGMENTS = [10, 50, 100, 250]
+TRAFFIC_METHODS = ['traffic_latest', 'traffic_avg', 'traffic_lag30', 'traffic_lag60']
+METHOD_LABELS = ['Same-Month Latest', 'Same-Month Avg', '30-Day Lagged', '60-Day Lagged']
+TRAFFIC_BANDS = [0, 250, 500, 750, 1000, 1500, 2500, 5000, 10000, 25000, 50000, 100000, np.inf]
+BAND_LABELS = ['0-250', '250-500', '500-750', '750-1K', '1K-1.5K', '1.5K-2.5K', '2.5K-5K', '5K-10K',
+               '10K-25K', '25K-50K', '50K-100K', '100K+']
+
+# stage -> (upstream stages, engine modules whose source is part of the code version)
+STAGES = {
+    'load': ((), (loaders_engine, lake_engine, store_engine)),
+    'align': (('load',), (align_engine,)),
+    'correlate': (('align',), ()),
+    'efficiency': (('align',), ()),
+    'stability': (('load', 'align', 'efficiency'), (stability_engine,)),
+    'bands': (('align',), ()),
+    'intervals': (('align',), (bootstrap_engine,)),
+    'lag_sweep': (('load',), (lagsweep_engine,)),
+}
+
+
+def calc_correlation(df, traffic_col, revenue_col='revenue'):
+    valid = df[[traffic_col, revenue_col]].dropna()
+    if len(valid) < 3:
+        return {'pearson_r': np.nan, 'pearson_p': np.nan, 'spearman_r': np.nan, 'spearman_p': np.nan, 'n': len(valid)}
+    pearson_r, pearson_p = pearsonr(valid[traffic_col], valid[revenue_col])
+    spearman_r, spearman_p = spearmanr(valid[traffic_col], valid[revenue_col])
+    return {'pearson_r': pearson_r, 'pearson_p': pearson_p, 'spearman_r': spearman_r, 'spearman_p': spearman_p, 'n': len(valid)}
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+def row_hashes(df):
+    """One uint64 per row covering every column's values."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def fingerprint(obj):
+    """Content hash of a stage output (DataFrames hashed row-wise, dicts by key)."""
+    if isinstance(obj, pd.DataFrame):
+        return _digest('frame', list(map(str, obj.columns)), list(map(str, obj.dtypes)),
+                       row_hashes(obj).tobytes(), pd.util.hash_pandas_object(obj.index).to_numpy().tobytes())
+    if isinstance(obj, pd.Series):
+        return fingerprint(obj.to_frame())
+    if isinstance(obj, dict):
+        return _digest('dict', [(key, fingerprint(obj[key])) for key in sorted(obj)])
+    return _digest('value', pickle.dumps(obj, protocol=4))
+
+
+def _code_version(stage_name, method):
+    sources = [inspect.getsource(method)]
+    for module in STAGES[stage_name][1]:
+        with open(module.__file__, 'rb') as f:
+            sources.append(f.read())
+    return _digest(PIPELINE_VERSION, *sources)
+
+
+class Pipeline:
+    """Lazily computes and caches the analysis stages for one ranked site list."""
+
+    def __init__(self, sites, src_dir='.', lake_dir=lake_engine.DEFAULT_LAKE_DIR,
+                 store_dir=store_engine.DEFAULT_STORE_DIR, cache_dir=DEFAULT_CACHE_DIR,
+                 n_resamples=bootstrap_engine.DEFAULT_RESAMPLES, seed=0, verbose=True):
+        if os.environ.get('ANALYSIS_CACHE', '1') == '0':
+            cache_dir = None
+        self.sites = [s.lower() for s in sites]
+        self.params = {
+            'sites': self.sites,
+            'segments': SEGMENTS,
+            'n_resamples': n_resamples,
+            'seed': seed,
+        }
+        self.src_dir = src_dir
+        self.lake_dir = lake_dir
+        self.store_dir = store_dir
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self._outputs = {}
+        self._fingerprints = {}
+
+    # ---- cache plumbing -------------------------------------------------
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def _cache_path(self, stage, key):
+        return os.path.join(self.cache_dir, stage, f'{key}.pkl')
+
+    def _read_cache(self, stage, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(stage, key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _write_cache(self, stage, key, entry):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"   ⚠️  Could not cache {stage}: {e}")
+
+    def _prune_cache(self, stage, keep):
+        """Delete the stage's cache entries whose key is not in keep; returns how many."""
+        stage_dir = os.path.join(self.cache_dir, stage) if self.cache_dir else None
+        if not stage_dir or not os.path.isdir(stage_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(stage_dir):
+            if name.endswith('.pkl') and name[:-len('.pkl')] not in keep:
+                try:
+                    os.remove(os.path.join(stage_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _uses_store(self):
+        return not os.path.isdir(self.lake_dir) and store_engine.has_store(self.store_dir, 'traffic_monthly')
+
+    @staticmethod
+    def _dir_stats(root):
+        stats = []
+        for dirpath, _, files in os.walk(root):
+            for name in sorted(files):
+                st = os.stat(os.path.join(dirpath, name))
+                stats.append((os.path.relpath(os.path.join(dirpath, name), root), st.st_size, st.st_mtime_ns))
+        return sorted(stats)
+
+    def _source_fingerprint(self):
+        """Raw input identity for the load stage (file bytes, or lake / store file stats)."""
+        if os.path.isdir(self.lake_dir):
+            return _digest('lake', self._dir_stats(self.lake_dir))
+        names = ['revenue-history.csv']
+        if not self._uses_store():
+            names.append('traffic-data.csv')
+        digests = []
+        for name in names:
+            with open(os.path.join(self.src_dir, name), 'rb') as f:
+                digests.append(hashlib.sha256(f.read()).hexdigest())
+        if self._uses_store():
+            return _digest('csv+store', digests, self._dir_stats(os.path.join(self.store_dir, 'traffic_monthly')))
+        return _digest('csv', digests)
+
+    # ---- public API -----------------------------------------------------
+
+    def get(self, stage):
+        """Output of a stage, computing (or loading) its upstream stages first."""
+        if stage in self._outputs:
+            return self._outputs[stage]
+        upstream, _ = STAGES[stage]
+        inputs = {name: self.get(name) for name in upstream}
+        method = getattr(self, f'_stage_{stage}')
+
+        input_prints = [self._fingerprints[name] for name in upstream]
+        if stage == 'load':
+            input_prints.append(self._source_fingerprint())
+        key = _digest(stage, _code_version(stage, method), self.params, input_prints)
+
+        entry = self._read_cache(stage, key)
+        if entry is not None:
+            self._log(f"   ♻️  {stage}: cached")
+        else:
+            started = time.perf_counter()
+            output = method(**inputs)
+            entry = {'output': output, 'fingerprint': fingerprint(output)}
+            self._write_cache(stage, key, entry)
+            self._log(f"   ⚙️  {stage}: computed in {time.perf_counter() - started:.2f}s")
+
+        self._outputs[stage] = entry['output']
+        self._fingerprints[stage] = entry['fingerprint']
+        return entry['output']
+
+    def run(self, stages=None):
+        """Compute the given stages (default: all) and return {stage: output}."""
+        for stage in (stages or STAGES):
+            self.get(stage)
+        return dict(self._outputs)
+
+    # ---- stages ---------------------------------------------------------
+
+    def _stage_load(self):
+        if os.path.isdir(self.lake_dir):
+            self._log(f"   Reading {self.lake_dir}/")
+            revenue_long, traffic_long = lake_engine.load_analysis_frames(self.lake_dir)
+            traffic_records = len(traffic_long)
+        elif self._uses_store():
+            # Only the selected sites' rows are read from the memmap
+            self._log(f"   Reading {self.store_dir}/traffic_monthly")
+            revenue_long = loaders_engine.load_revenue_long(os.path.join(self.src_dir, 'revenue-history.csv'))
+            store = store_engine.open_store(self.store_dir, 'traffic_monthly')
+            traffic_long = store_engine.load_traffic_long(store, self.sites)
+            traffic_records = store_engine.count_present(store)
+        else:
+            revenue_long = loaders_engine.load_revenue_long(os.path.join(self.src_dir, 'revenue-history.csv'))
+            traffic_long = loaders_engine.load_traffic_long(os.path.join(self.src_dir, 'traffic-data.csv'))
+            traffic_records = len(traffic_long)
+
+        revenue = revenue_long[revenue_long['website'].isin(self.sites)].reset_index(drop=True)
+        traffic = traffic_long[traffic_long['website'].isin(self.sites)].reset_index(drop=True)
+        traffic_min_date = traffic['date'].min()
+        return {
+            'revenue_records': len(revenue_long),
+            'traffic_records': traffic_records,
+            'revenue': revenue,
+            'traffic': traffic,
+            'revenue_filtered': revenue[revenue['month'] >= traffic_min_date.replace(day=1)].reset_index(drop=True),
+        }
+
+    def _stage_align(self, load):
+        revenue = load['revenue_filtered']
+        traffic = load['traffic']
+        lags = align_engine.DEFAULT_LAGS
+        tolerance = align_engine.LAG_TOLERANCE_DAYS
+        code = _code_version('align', self._stage_align)
+
+        # A month's lookups only see snapshots from (month end - max lag - tolerance)
+        # to month end + tolerance, so that window plus the month's revenue rows
+        # decides its result
+        traffic_hashes = row_hashes(traffic[['website', 'date', 'traffic']])
+        traffic_dates = traffic['date'].to_numpy()
+        revenue_hashes = row_hashes(revenue)
+        months = revenue['month'].dt.to_period('M').dt.to_timestamp()
+
+        chunks = []
+        keys = set()
+        reused = 0
+        for month, positions in months.groupby(months, sort=True).indices.items():
+            month_end = month + pd.offsets.MonthEnd(0)
+            window_start = min(month, month_end - pd.Timedelta(days=max(lags) + tolerance))
+            window_end = month_end + pd.Timedelta(days=max(0, tolerance - min(lags)))
+            in_window = (traffic_dates >= np.datetime64(window_start)) & (traffic_dates <= np.datetime64(window_end))
+            key = _digest('align-month', code, lags, tolerance,
+                          revenue_hashes[positions].tobytes(), traffic_hashes[in_window].tobytes())
+            keys.add(key)
+
+            entry = self._read_cache('align-months', key)
+            if entry is None:
+                entry = align_engine.align_traffic(revenue.iloc[positions], traffic[in_window], lags, tolerance)
+                self._write_cache('align-months', key, entry)
+            else:
+                reused += 1
+            chunks.append(entry.set_axis(positions))
+
+        self._log(f"   ♻️  align: {reused}/{len(chunks)} months reused")
+        removed = self._prune_cache('align-months', keys)
+        if removed:
+            self._log(f"   🧹 align: removed {removed} stale month entries")
+        if not chunks:
+            return align_engine.align_traffic(revenue, traffic, lags, tolerance)
+        return pd.concat(chunks).sort_index().reset_index(drop=True)
+
+    def _stage_correlate(self, align):
+        results = []
+        for seg_size in SEGMENTS:
+            seg_data = align[align['website'].isin(self.sites[:seg_size])]
+            for method, label in zip(TRAFFIC_METHODS, METHOD_LABELS):
+                corr = calc_correlation(seg_data, method)
+                results.append({
+                    'Segment': f'Top {seg_size}',
+                    'Method': label,
+                    'Pearson r': corr['pearson_r'],
+                    'Spearman r': corr['spearman_r'],
+                    'N': corr['n']
+                })
+        return pd.DataFrame(results)
+
+    def _stage_efficiency(self, align):
+        site_summary = align.groupby('website').agg({
+            'revenue': 'sum',
+            'traffic_avg': 'mean',
+            'niche': 'first'
+        }).reset_index()
+        site_summary['rptu'] = site_summary['revenue'] / site_summary['traffic_avg']
+        site_summary['rptu'] = site_summary['rptu'].replace([np.inf, -np.inf], np.nan)
+        rank = {site: i + 1 for i, site in reversed(list(enumerate(self.sites)))}
+        site_summary['rank'] = site_summary['website'].map(rank).fillna(999).astype(int)
+        return site_summary
+
+    def _stage_stability(self, load, align, efficiency):
+        sites, _, monthly_values = stability_engine.monthly_average_matrix(load['traffic'])
+        stability_df = stability_engine.site_stability(sites=sites, values=monthly_values)
+
+        site_with_stability = efficiency.merge(stability_df, on='website', how='inner')
+        months_in_data = align.groupby('website')['month'].nunique().reset_index()
+        months_in_data.columns = ['website', 'n_months']
+        site_with_stability = site_with_stability.merge(months_in_data, on='website', how='left')
+        site_with_stability['avg_monthly_revenue'] = site_with_stability['revenue'] / site_with_stability['n_months']
+
+        median_cv = site_with_stability['cv'].median()
+        site_with_stability['quadrant'] = stability_engine.classify_quadrants(
+            site_with_stability['cv'], site_with_stability['slope_pct_per_period'], median_cv
+        )
+        return {
+            'n_site_months': int((~np.isnan(monthly_values)).sum()),
+            'stability': stability_df,
+            'site_with_stability': site_with_stability,
+            'median_cv': median_cv,
+        }
+
+    def _stage_bands(self, align):
+        traffic_band_data = align[['website', 'month', 'revenue', 'traffic_avg']].copy()
+        traffic_band_data = traffic_band_data.dropna(subset=['traffic_avg', 'revenue'])
+        traffic_band_data['traffic_band'] = pd.cut(
+            traffic_band_data['traffic_avg'],
+            bins=TRAFFIC_BANDS,
+            labels=BAND_LABELS,
+            include_lowest=True
+        )
+
+        # Each site-month is one observation
+        band_stats = traffic_band_data.groupby('traffic_band', observed=True).agg({
+            'website': 'count',
+            'revenue': ['mean', 'sum'],
+            'traffic_avg': 'mean'
+        }).reset_index()
+        band_stats.columns = ['Traffic Band', 'n_observations', 'Avg Revenue', 'Total Revenue', 'Avg Traffic']
+        band_stats['Revenue per Visitor'] = band_stats['Avg Revenue'] / band_stats['Avg Traffic']
+        band_stats['% of Total Revenue'] = 100 * band_stats['Total Revenue'] / band_stats['Total Revenue'].sum()
+        band_stats['Cumulative %'] = band_stats['% of Total Revenue'].cumsum()
+        return {'n_observations': len(traffic_band_data), 'band_stats': band_stats}
+
+    def _stage_intervals(self, align):
+        return bootstrap_engine.segment_intervals(
+            align, {f'Top {n}': self.sites[:n] for n in SEGMENTS}, dict(zip(TRAFFIC_METHODS, METHOD_LABELS)),
+            n_resamples=self.params['n_resamples'], seed=self.params['seed']
+        )
+
+    def _stage_lag_sweep(self, load):
+        revenue, traffic = load['revenue_filtered'], load['traffic']
+        segment_sites = {f'Top {n}': self.sites[:n] for n in SEGMENTS}
+        sweep = lagsweep_engine.lag_sweep(revenue, traffic, segment_sites)
+        return {
+            'sweep': sweep,
+            'segment_best': lagsweep_engine.best_lags(sweep, 'segment'),
+            'site_best': lagsweep_engine.best_lags(lagsweep_engine.site_lag_sweep(revenue, traffic), 'website'),
+        }
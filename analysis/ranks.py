@@ -0,0 +1,106 @@
+"""
+Portfolio rank evolution for any metric (revenue, traffic, DR).
+
+Builds one site x month matrix and ranks every month in a single
+DataFrame.rank call, instead of re-ranking the whole portfolio for each
+site x month pair. The bump chart switches to WebGL traces past
+WEBGL_THRESHOLD lines so it stays responsive with hundreds of sites.
+
+    python rank_evolution_bump_chart.py --metric traffic --top 100 --out ranks.html
+"""
+
+import pandas as pd
+
+from analysis.loaders import load_dr_long, load_revenue_long, load_traffic_long
+
+WEBGL_THRESHOLD = 30
+
+# metric -> (loader, default source, value column, date column, monthly aggregation, label)
+METRICS = {
+    'revenue': (load_revenue_long, 'revenue-history.csv', 'revenue', 'month', 'sum', 'Revenue'),
+    'traffic': (load_traffic_long, 'traffic-data.csv', 'traffic', 'date', 'mean', 'Traffic'),
+    'dr': (load_dr_long, 'DR History.csv', 'dr', 'date', 'mean', 'DR'),
+}
+
+
+def metric_matrix(metric='revenue', source=None, long_df=None):
+    """
+    Site x month matrix of a metric.
+
+    Revenue months without a figure count as 0 (no sale that month); traffic
+    and DR months without a snapshot stay NaN and are left unranked.
+
+    Args:
+        metric: Key of METRICS
+        source: CSV path (default: the metric's sheet export)
+        long_df: Already loaded long frame, instead of reading source
+
+    Returns:
+        DataFrame indexed by website (sheet order) with one column per month
+    """
+    loader, default_source, value_col, date_col, how, _ = METRICS[metric]
+    if long_df is None:
+        long_df = loader(source or default_source)
+    months = long_df[date_col].dt.to_period('M').dt.to_timestamp()
+    matrix = long_df.groupby([long_df['website'], months])[value_col].agg(how).unstack()
+    matrix = matrix.reindex(index=pd.unique(long_df['website']))
+    if len(matrix.columns):
+        matrix = matrix.reindex(columns=pd.date_range(matrix.columns.min(), matrix.columns.max(), freq='MS'))
+    if metric == 'revenue':
+        matrix = matrix.fillna(0.0)
+    matrix.columns.name = 'month'
+    return matrix
+
+
+def rank_matrix(matrix):
+    """Portfolio-wide rank of every site in every month (1 = highest, ties share the best rank)."""
+    return matrix.rank(axis=0, method='min', ascending=False)
+
+
+def top_sites(matrix, n=15, metric='revenue'):
+    """The n largest sites by the metric's total (revenue) or average (traffic, DR)."""
+    how = METRICS[metric][4]
+    totals = matrix.sum(axis=1) if how == 'sum' else matrix.mean(axis=1)
+    return totals.nlargest(n).index.tolist()
+
+
+def bump_chart(ranks, sites, metric='revenue', webgl=None):
+    """
+    Plotly bump chart of the given sites' rank per month.
+
+    Args:
+        ranks: Output of rank_matrix
+        sites: Websites to draw, in legend order
+        metric: Key of METRICS (for titles)
+        webgl: Force Scattergl on/off (default: on past WEBGL_THRESHOLD lines)
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    import plotly.graph_objects as go
+
+    if webgl is None:
+        webgl = len(sites) > WEBGL_THRESHOLD
+    label = METRICS[metric][5]
+    x_vals = ranks.columns
+
+    fig = go.Figure()
+    for site in sites:
+        y_vals = ranks.loc[site].to_numpy()
+        if webgl:
+            # WebGL has no spline lines; thinner lines keep hundreds of them readable
+            fig.add_trace(go.Scattergl(x=x_vals, y=y_vals, mode='lines+markers', name=site,
+                                       line=dict(width=2), marker=dict(size=5)))
+        else:
+            fig.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='lines+markers', name=site,
+                                     line=dict(shape='spline', width=3), marker=dict(size=8)))
+
+    fig.update_layout(
+        title=f"Top {len(sites)} Sites: Portfolio {label} Rank Evolution",
+        xaxis_title="Timeline",
+        yaxis=dict(title=f"{label} Rank (Portfolio Wide)", autorange='reversed', gridcolor='lightgrey'),
+        plot_bgcolor='white',
+        height=max(800, 12 * len(sites)),
+        hovermode='closest' if webgl else 'x unified'
+    )
+    return fig
@@ -0,0 +1,219 @@
+"""
+Traffic stability (CV) and trend engine over a site x month matrix.
+
+Builds the same-month average matrix once and computes every site's CV,
+least-squares trend and quadrant with masked NumPy reductions - the same
+numbers as the per-site linregress loop in run_analysis_with_visuals.py
+(section 7). Months without data are skipped, not interpolated: the trend
+x axis counts a site's months that have data, as the loop did.
+
+The matrix functions need numpy only (pandas is imported where a table is
+built), so the sync Lambda ships this file as stability.py next to
+forecast.py and publishes stability.json every run from the forecast's
+monthly traffic matrix (see stability_document). Locally it runs on the
+long traffic table or on the matrix store:
+
+    python -m analysis.store fetch --metric traffic_monthly
+    python -m analysis.stability --out stability.csv
+"""
+
+import os
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+MIN_MONTHS = 3
+QUADRANTS = ['Stable + Growing', 'Stable + Declining', 'Volatile + Growing', 'Volatile + Declining']
+STABILITY_COLUMNS = ['website', 'mean_traffic', 'std_traffic', 'cv', 'trend_slope', 'slope_pct_per_period',
+                     'trend_adjusted_cv', 'trend_r_squared', 'n_traffic_months']
+
+
+def monthly_average_matrix(traffic_long):
+    """
+    Same-month average traffic as a site x month matrix.
+
+    Returns:
+        (sites Index sorted by name, PeriodIndex of months, float64 matrix
+        with NaN where a site has no snapshot that month)
+    """
+    import pandas as pd
+
+    months = traffic_long['date'].dt.to_period('M')
+    monthly = traffic_long.groupby([traffic_long['website'], months])['traffic'].mean()
+    matrix = monthly.unstack().sort_index()
+    if len(matrix.columns):
+        matrix = matrix.reindex(columns=pd.period_range(matrix.columns.min(), matrix.columns.max(), freq='M'))
+    return matrix.index, matrix.columns, matrix.to_numpy(dtype=np.float64)
+
+
+def stability_metrics(values, min_months=MIN_MONTHS):
+    """
+    CV and linear trend for every row of a site x month matrix.
+
+    Args:
+        values: float64 matrix, NaN = no data for that month
+        min_months: Rows with fewer months with data get NaN metrics
+
+    Returns:
+        Dict of column name -> 1-D array (STABILITY_COLUMNS minus website)
+    """
+    present = ~np.isnan(values)
+    n = present.sum(axis=1)
+    v = np.where(present, values, 0.0)
+    x = np.where(present, np.cumsum(present, axis=1) - 1, 0).astype(np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = v.sum(axis=1) / n
+        dv = np.where(present, values - mean[:, None], 0.0)
+        std = np.sqrt((dv * dv).sum(axis=1) / n)
+
+        x_mean = (n - 1) / 2.0
+        dx = np.where(present, x - x_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dv).sum(axis=1)
+        syy = (dv * dv).sum(axis=1)
+        slope = sxy / sxx
+        intercept = mean - slope * x_mean
+        residuals = np.where(present, values - (slope[:, None] * x + intercept[:, None]), 0.0)
+        residual_std = np.sqrt((residuals * residuals).sum(axis=1) / n)
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)  # NaN for flat traffic, like linregress
+
+        positive = mean > 0
+        cv = np.where(positive, std / mean, np.nan)
+        slope_pct = np.where(positive, 100 * slope / mean, 0.0)
+        trend_adjusted_cv = np.where(positive, residual_std / mean, np.nan)
+
+    enough = n >= min_months
+    metrics = {
+        'mean_traffic': mean,
+        'std_traffic': std,
+        'cv': cv,
+        'trend_slope': slope,
+        'slope_pct_per_period': slope_pct,
+        'trend_adjusted_cv': trend_adjusted_cv,
+        'trend_r_squared': r ** 2,
+    }
+    metrics = {name: np.where(enough, column, np.nan) for name, column in metrics.items()}
+    metrics['n_traffic_months'] = n
+    return metrics
+
+
+def site_stability(traffic_long=None, sites=None, values=None, min_months=MIN_MONTHS):
+    """
+    Stability table for every site with at least min_months months of data.
+
+    Pass either traffic_long (website, date, traffic) or a precomputed
+    (sites, values) site x month matrix, e.g. from analysis.store.monthly_matrix.
+
+    Returns:
+        DataFrame with STABILITY_COLUMNS, one row per site, sorted by website
+    """
+    import pandas as pd
+
+    if values is None:
+        sites, _, values = monthly_average_matrix(traffic_long)
+    metrics = stability_metrics(values, min_months)
+    stability = pd.DataFrame({'website': np.asarray(sites, dtype=object), **metrics}, columns=STABILITY_COLUMNS)
+    stability = stability[stability['n_traffic_months'] >= min_months]
+    return stability.sort_values('website', kind='mergesort').reset_index(drop=True)
+
+
+def classify_quadrants(cv, slope_pct, median_cv=None):
+    """
+    Stable/Volatile (CV vs median) x Growing/Declining (slope > 0) labels.
+
+    Args:
+        cv: Array-like of CV values
+        slope_pct: Array-like of % change per period
+        median_cv: Split point (default: median of cv, ignoring NaN)
+
+    Returns:
+        Array of quadrant labels ('Unknown' where either input is NaN)
+    """
+    cv = np.asarray(cv, dtype=np.float64)
+    slope_pct = np.asarray(slope_pct, dtype=np.float64)
+    if median_cv is None:
+        median_cv = np.nanmedian(cv) if np.any(~np.isnan(cv)) else np.nan
+    stable = cv <= median_cv
+    growing = slope_pct > 0
+    labels = np.select(
+        [stable & growing, stable & ~growing, ~stable & growing],
+        QUADRANTS[:3],
+        default=QUADRANTS[3]
+    ).astype(object)
+    labels[np.isnan(cv) | np.isnan(slope_pct)] = 'Unknown'
+    return labels
+
+
+def stability_document(domains, values, min_months=MIN_MONTHS, generated_at=None):
+    """
+    Build the stability.json document the sync publishes.
+
+    Args:
+        domains: Row labels of values
+        values: Domain x month matrix (array-like, NaN where missing)
+        generated_at: ISO timestamp to record (default: now)
+
+    Returns:
+        Dict with the median CV split, quadrant counts and, per domain with
+        at least min_months months, the STABILITY_COLUMNS metrics and its
+        quadrant (None where a metric is NaN)
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(len(domains), -1)
+    metrics = stability_metrics(values, min_months)
+    cv = metrics['cv']
+    median_cv = np.nanmedian(cv) if np.any(~np.isnan(cv)) else np.nan
+    quadrants = classify_quadrants(cv, metrics['slope_pct_per_period'], median_cv)
+
+    def format_value(v):
+        return None if np.isnan(v) else round(float(v), 6)
+
+    sites = {}
+    for i in np.flatnonzero(metrics['n_traffic_months'] >= min_months):
+        site = {name: format_value(metrics[name][i]) for name in STABILITY_COLUMNS[1:-1]}
+        site['n_traffic_months'] = int(metrics['n_traffic_months'][i])
+        site['quadrant'] = quadrants[i]
+        sites[domains[i]] = site
+
+    counts = {}
+    for site in sites.values():
+        counts[site['quadrant']] = counts.get(site['quadrant'], 0) + 1
+    return {
+        'generated_at': generated_at or datetime.utcnow().isoformat() + 'Z',
+        'min_months': min_months,
+        'median_cv': format_value(median_cv),
+        'quadrants': counts,
+        'sites': sites
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Traffic stability and trend for every site')
+    parser.add_argument('--store', default=None, help='Matrix store root (default: matrix-store if present)')
+    parser.add_argument('--src', default='traffic-data.csv', help='Wide traffic CSV when no store is used')
+    parser.add_argument('--out', default='stability.csv')
+    parser.add_argument('--min-months', type=int, default=MIN_MONTHS)
+    args = parser.parse_args()
+
+    from analysis import store as matrix_store
+
+    store_root = args.store or matrix_store.DEFAULT_STORE_DIR
+    if matrix_store.has_store(store_root, 'traffic_monthly'):
+        store = matrix_store.open_store(store_root, 'traffic_monthly')
+        print(f"📂 Reading {store_root}/traffic_monthly ({store.shape[0]:,} domains)")
+        _, values = matrix_store.monthly_matrix(store, how='avg')
+        stability = site_stability(sites=store.domains, values=values, min_months=args.min_months)
+    else:
+        from analysis.loaders import load_traffic_long
+        print(f"📂 Reading {args.src}")
+        stability = site_stability(load_traffic_long(args.src), min_months=args.min_months)
+
+    stability['quadrant'] = classify_quadrants(stability['cv'], stability['slope_pct_per_period'])
+    stability.to_csv(args.out, index=False)
+    print(f"✅ Wrote {len(stability):,} sites to {os.path.abspath(args.out)}")
+    print(stability['quadrant'].value_counts().to_string())
+
+
+if __name__ == '__main__':
+    main()
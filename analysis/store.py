@@ -0,0 +1,235 @@
+"""
+Memory-mapped domain x date matrix store.
+
+The sync Lambda writes one folder per dataset under matrix/<metric>/ in S3:
+
+    values.f32    float32 matrix, one row per domain, one column per date
+    missing.bits  ceil(n_dates / 8) bytes per row, bit set = cell missing
+    domains.txt   row index (lowercase domains)
+    dates.txt     column index (ISO dates, ascending)
+    meta.json     shape and format version
+
+Readers open the matrix with numpy.memmap, so a domain's row or a date slice
+is a view rather than a parsed copy. When matrix-store/traffic_monthly exists
+(and no metrics lake), the analysis pipeline's load stage reads the top-N
+sites' traffic rows from it instead of parsing traffic-data.csv. Fetch a
+local copy with:
+
+    python -m analysis.store fetch --bucket traffic-dashboard-theta
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis.loaders import DATE_DTYPE
+
+DEFAULT_STORE_DIR = 'matrix-store'
+STORE_METRICS = ['traffic_monthly', 'traffic_average', 'dr', 'rd', 'revenue']
+STORE_FILES = ['values.f32', 'missing.bits', 'domains.txt', 'dates.txt', 'meta.json']
+FORMAT_VERSION = 1
+
+
+class MatrixStore:
+    """Read-only view over one matrix/<metric>/ folder."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported matrix store version {self.meta.get('version')} in {path}")
+
+        n_domains = self.meta['n_domains']
+        n_dates = self.meta['n_dates']
+        self.shape = (n_domains, n_dates)
+        self.values = np.memmap(os.path.join(path, 'values.f32'), dtype=self.meta['dtype'],
+                                mode='r', shape=self.shape)
+        self.missing_bits = np.memmap(os.path.join(path, 'missing.bits'), dtype=np.uint8,
+                                      mode='r', shape=(n_domains, self.meta['row_bytes']))
+
+        with open(os.path.join(path, 'domains.txt')) as f:
+            self.domains = f.read().split('\n') if n_domains else []
+        with open(os.path.join(path, 'dates.txt')) as f:
+            self.dates = np.array(f.read().split('\n') if n_dates else [], dtype='datetime64[D]')
+        self.domain_index = {domain: i for i, domain in enumerate(self.domains)}
+
+    def __contains__(self, domain):
+        return str(domain).lower() in self.domain_index
+
+    def row_index(self, domain):
+        return self.domain_index.get(str(domain).lower())
+
+    def row(self, domain):
+        """Zero-copy float32 view of one domain's row, or None if unknown."""
+        i = self.row_index(domain)
+        return None if i is None else self.values[i]
+
+    def date_slice(self, start=None, end=None):
+        """Column slice covering start..end inclusive (dates are ascending)."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start).date(), 'D'), 'left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end).date(), 'D'), 'right'))
+        return slice(lo, hi)
+
+    def missing(self, rows=slice(None), cols=slice(None)):
+        """Boolean missing mask for the given rows/columns."""
+        bits = self.missing_bits[rows]
+        mask = np.unpackbits(bits, axis=-1, count=self.shape[1], bitorder='little').astype(bool)
+        return mask[..., cols]
+
+    def masked(self, rows=slice(None), cols=slice(None), positive_only=False):
+        """
+        Values with missing cells as NaN (float64 copy of the selection).
+
+        positive_only also drops zero and negative cells, matching the
+        traffic > 0 filter used by the analysis scripts.
+        """
+        values = np.asarray(self.values[rows, cols], dtype=np.float64)
+        invalid = self.missing(rows, cols)
+        if positive_only:
+            invalid = invalid | (values <= 0)
+        return np.where(invalid, np.nan, values)
+
+    def series(self, domain, positive_only=False):
+        """(dates, values) for one domain with missing cells dropped."""
+        i = self.row_index(domain)
+        if i is None:
+            return self.dates[:0], np.empty(0)
+        values = self.masked(i, positive_only=positive_only)
+        keep = ~np.isnan(values)
+        return self.dates[keep], values[keep]
+
+
+def has_store(root=DEFAULT_STORE_DIR, metric='traffic_monthly'):
+    return os.path.exists(os.path.join(root, metric, 'meta.json'))
+
+
+def open_store(root=DEFAULT_STORE_DIR, metric='traffic_monthly'):
+    return MatrixStore(os.path.join(root, metric))
+
+
+def load_traffic_long(store, domains=None, positive_only=True):
+    """
+    Long-format snapshots for some domains, read from their memmap rows.
+
+    Only the selected rows are touched, so the analysis scripts' top-N sites
+    never parse the rest of the portfolio.
+
+    Args:
+        store: MatrixStore
+        domains: Domains to read (default: all); unknown ones are skipped
+        positive_only: Drop zero/negative cells as well as missing ones
+
+    Returns:
+        DataFrame (website, date, traffic) like loaders.load_traffic_long:
+        website-major in sheet (row) order, dates ascending
+    """
+    if domains is None:
+        rows = np.arange(store.shape[0])
+    else:
+        rows = np.array(sorted({store.row_index(d) for d in domains} - {None}), dtype=np.intp)
+    values = store.masked(rows, positive_only=positive_only)
+    r, c = np.nonzero(~np.isnan(values))
+    websites = np.array(store.domains, dtype=object)[rows]
+    return pd.DataFrame({
+        'website': pd.array(websites, dtype='str').take(r),
+        'date': pd.DatetimeIndex(store.dates[c]).astype(DATE_DTYPE),
+        'traffic': values[r, c],
+    })
+
+
+def count_present(store, positive_only=True, chunk_rows=4096):
+    """Number of non-missing (and, with positive_only, positive) cells, read in row chunks."""
+    total = 0
+    for start in range(0, store.shape[0], chunk_rows):
+        values = store.masked(slice(start, start + chunk_rows), positive_only=positive_only)
+        total += int(np.count_nonzero(~np.isnan(values)))
+    return total
+
+
+def monthly_matrix(store, how='avg', positive_only=True, chunk_rows=4096):
+    """
+    Reduce the whole portfolio to one column per calendar month.
+
+    Rows are read chunk_rows at a time (as in count_present), so only the
+    n_domains x n_months result is held for the whole portfolio.
+
+    Args:
+        store: MatrixStore
+        how: 'avg' (mean of present cells) or 'latest' (last present cell)
+        positive_only: Treat zero/negative cells as missing
+        chunk_rows: Rows read and reduced per step
+
+    Returns:
+        (months as datetime64[M] array, float64 matrix n_domains x n_months)
+    """
+    if how not in ('avg', 'latest'):
+        raise ValueError(f"Unknown reduction: {how}")
+    months = store.dates.astype('datetime64[M]')
+    unique_months, starts = np.unique(months, return_index=True)
+    result = np.full((store.shape[0], len(unique_months)), np.nan)
+    if len(unique_months) == 0:
+        return unique_months, result
+    for start in range(0, store.shape[0], chunk_rows):
+        values = store.masked(slice(start, start + chunk_rows), positive_only=positive_only)
+        result[start:start + len(values)] = _reduce_months(values, starts, how)
+    return unique_months, result
+
+
+def _reduce_months(values, starts, how):
+    """One row chunk of monthly_matrix: NaN-masked values -> one column per month."""
+    present = ~np.isnan(values)
+
+    if how == 'avg':
+        sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=1)
+        counts = np.add.reduceat(present, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    # Index of the last present column at or before each column, per row
+    idx = np.where(present, np.arange(values.shape[1]), -1)
+    last_seen = np.maximum.accumulate(idx, axis=1)
+    ends = np.append(starts[1:], values.shape[1]) - 1
+    picked = last_seen[:, ends]
+    in_month = picked >= starts
+    rows = np.arange(values.shape[0])[:, None]
+    return np.where(in_month, values[rows, np.maximum(picked, 0)], np.nan)
+
+
+def fetch_store(bucket, out_dir=DEFAULT_STORE_DIR, metrics=None, prefix='matrix/'):
+    """Download matrix/<metric>/ folders from S3 into out_dir/<metric>/."""
+    import boto3
+
+    s3_client = boto3.client('s3')
+    for metric in (metrics or STORE_METRICS):
+        metric_dir = os.path.join(out_dir, metric)
+        os.makedirs(metric_dir, exist_ok=True)
+        try:
+            # meta.json last, mirroring the upload order
+            for file_name in STORE_FILES:
+                s3_client.download_file(bucket, f"{prefix}{metric}/{file_name}",
+                                        os.path.join(metric_dir, file_name))
+            store = open_store(out_dir, metric)
+            print(f"   {metric}: {store.shape[0]:,} domains x {store.shape[1]:,} dates")
+        except Exception as e:
+            print(f"   Skipping {metric}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the local matrix store')
+    sub = parser.add_subparsers(dest='command', required=True)
+    fetch_cmd = sub.add_parser('fetch', help='Download the matrix store written by the sync')
+    fetch_cmd.add_argument('--bucket', default=os.environ.get('S3_BUCKET_NAME', 'traffic-dashboard-theta'))
+    fetch_cmd.add_argument('--out', default=DEFAULT_STORE_DIR)
+    fetch_cmd.add_argument('--metric', action='append', choices=STORE_METRICS)
+    args = parser.parse_args()
+
+    print(f"📥 Fetching s3://{args.bucket}/matrix/ -> {args.out}/")
+    fetch_store(args.bucket, args.out, args.metric)
+
+
+if __name__ == '__main__':
+    main()
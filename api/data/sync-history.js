@@ -0,0 +1,108 @@
+/**
+ * API endpoint to serve the per-run sync history from S3
+ * One day partition per request (sync-history/date=YYYY-MM-DD/*.jsonl), newest run first,
+ * with links to the neighbouring days for paging back through older runs
+ * Protected by Google OAuth + test bypass token
+ */
+
+import { S3Client, GetObjectCommand, ListObjectsV2Command } from '@aws-sdk/client-s3';
+import { isAuthenticated, sendUnauthorized } from '../lib/auth.js';
+
+const s3Client = new S3Client({
+  region: process.env.AWS_REGION || 'ap-southeast-2',
+  credentials: {
+    accessKeyId: process.env.AWS_ACCESS_KEY_ID,
+    secretAccessKey: process.env.AWS_SECRET_ACCESS_KEY,
+  },
+});
+
+const S3_BUCKET = process.env.S3_BUCKET_NAME || 'traffic-dashboard-theta';
+const S3_PREFIX = 'sync-history/';
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+
+export default async function handler(req, res) {
+  if (!isAuthenticated(req)) {
+    return sendUnauthorized(res);
+  }
+
+  const requested = req.query.date;
+  if (requested && !DATE_PATTERN.test(requested)) {
+    return res.status(400).json({ error: 'date must be YYYY-MM-DD' });
+  }
+
+  try {
+    // Day partitions, oldest first
+    const prefixes = await listAll({ Prefix: S3_PREFIX, Delimiter: '/' }, 'CommonPrefixes');
+    const dates = prefixes
+      .map(p => p.Prefix.slice(S3_PREFIX.length).replace(/^date=/, '').replace(/\/$/, ''))
+      .filter(d => DATE_PATTERN.test(d))
+      .sort();
+
+    if (dates.length === 0) {
+      return res.status(404).json({
+        error: 'Sync history not found',
+        message: 'No sync has written history yet.'
+      });
+    }
+
+    const date = requested || dates[dates.length - 1];
+    const index = dates.indexOf(date);
+    if (index === -1) {
+      return res.status(404).json({ error: `No sync history for ${date}` });
+    }
+
+    const objects = await listAll({ Prefix: `${S3_PREFIX}date=${date}/` }, 'Contents');
+    const bodies = await Promise.all(objects.map(async (object) => {
+      const response = await s3Client.send(new GetObjectCommand({ Bucket: S3_BUCKET, Key: object.Key }));
+      return streamToString(response.Body);
+    }));
+
+    const runs = [];
+    for (const body of bodies) {
+      for (const line of body.split('\n')) {
+        if (line.trim()) runs.push(JSON.parse(line));
+      }
+    }
+    runs.sort((a, b) => (a.timestamp < b.timestamp ? 1 : -1));
+
+    // Past days never change; today's partition grows every run
+    const isLatest = index === dates.length - 1;
+    res.setHeader('Content-Type', 'application/json');
+    res.setHeader('Cache-Control', isLatest ? 'public, max-age=60' : 'public, max-age=86400');
+
+    return res.status(200).json({
+      date,
+      runs,
+      older: index > 0 ? dates[index - 1] : null,
+      newer: isLatest ? null : dates[index + 1],
+    });
+  } catch (error) {
+    console.error('Error fetching sync history from S3:', error);
+    return res.status(500).json({ error: 'Failed to fetch sync history' });
+  }
+}
+
+// Every page of a ListObjectsV2 listing, collecting one result field
+async function listAll(params, field) {
+  const items = [];
+  let token;
+  do {
+    const response = await s3Client.send(new ListObjectsV2Command({
+      Bucket: S3_BUCKET,
+      ...params,
+      ContinuationToken: token,
+    }));
+    items.push(...(response[field] || []));
+    token = response.IsTruncated ? response.NextContinuationToken : undefined;
+  } while (token);
+  return items;
+}
+
+// Helper to convert stream to string
+async function streamToString(stream) {
+  const chunks = [];
+  for await (const chunk of stream) {
+    chunks.push(chunk);
+  }
+  return Buffer.concat(chunks).toString('utf-8');
+}
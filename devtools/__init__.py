@@ -0,0 +1,6 @@
+"""
+Local development and testing tools.
+
+Stand-ins for the hosted pieces of the pipeline (Sheets, S3, the Vercel API) so the
+dashboards, the sync and the analysis can be exercised offline.
+"""
@@ -0,0 +1,361 @@
+"""
+Benchmarks for the sync and analysis hot paths.
+
+Every case runs on synthetic portfolios (devtools/synthetic.py) at fixed
+sizes, so timings are comparable between commits and the size steps give a
+growth curve (the exponent is log(time ratio) / log(cell ratio) between the
+smallest and largest size: ~1 is linear, ~2 quadratic).
+
+Each result records the median and best wall time over --repeat runs and the
+tracemalloc peak of one extra run. Results are JSON; `compare` flags cases
+that got slower or bigger than a saved baseline beyond a threshold and exits
+non-zero, so an optimisation (or a regression) shows up as a number.
+
+Usage:
+    python -m devtools.bench run --save-baseline           # on the base commit
+    python -m devtools.bench run --size m --only merge     # after a change
+    python -m devtools.bench compare                       # latest vs baseline
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import numpy as np
+
+from devtools.fake_s3 import InMemoryS3
+from devtools.sync_harness import load_sync_module
+from devtools.synthetic import PortfolioSpec, generate_tabs, write_portfolio
+
+RESULTS_DIR = 'bench-results'
+DEFAULT_OUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+# size -> (domains, daily date columns); 'm' is about today's portfolio
+SIZES = {
+    'xs': (250, 120),
+    's': (1000, 280),
+    'm': (2300, 560),
+    'l': (5000, 1000),
+    'xl': (10000, 1500),
+}
+DEFAULT_SIZES = ('xs', 's', 'm')
+ARCHIVED_FRACTION = 0.1  # share of date columns only in the bucket (exercises the history merge)
+
+
+class Fixture:
+    """Synthetic inputs for one size, built lazily and shared by every case."""
+
+    def __init__(self, size, work_dir, seed=7):
+        self.size = size
+        self.domains, self.dates = SIZES[size]
+        self.cells = self.domains * self.dates
+        self.spec = PortfolioSpec(self.domains, self.dates, seed=seed)
+        self.archived = int(self.dates * ARCHIVED_FRACTION)
+        self.dir = os.path.join(work_dir, size)
+        self._cache = {}
+
+    def _get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def sync(self):
+        return load_sync_module()
+
+    @property
+    def bucket_dir(self):
+        def build():
+            write_portfolio(self.spec, self.dir, archived=self.archived)
+            return os.path.join(self.dir, 'bucket')
+        return self._get('bucket_dir', build)
+
+    @property
+    def tabs(self):
+        return self._get('tabs', lambda: generate_tabs(self.spec, archived=self.archived))
+
+    @property
+    def existing_traffic(self):
+        return self._get('existing_traffic', lambda: generate_tabs(self.spec, tabs=['Traffic Monthly'])['Traffic Monthly'])
+
+    @property
+    def merged_traffic(self):
+        return self._get('merged_traffic', lambda: quiet(self.sync.merge_wide_format_data,
+                                                         self.existing_traffic, self.tabs['Traffic Monthly']))
+
+    @property
+    def priority_domains(self):
+        return self._get('priority_domains', _pinned(self, lambda: self.sync.compute_priority_domains(self.tabs['Revenue'])))
+
+    @property
+    def frames(self):
+        from analysis.loaders import load_revenue_long, load_traffic_long
+
+        def build():
+            revenue = load_revenue_long(os.path.join(self.bucket_dir, 'revenue-history.csv'))
+            traffic = load_traffic_long(os.path.join(self.bucket_dir, 'traffic-data.csv'))
+            return revenue, traffic
+        return self._get('frames', build)
+
+
+def quiet(fn, *args, **kwargs):
+    """Call fn with its print output discarded (the sync logs every step)."""
+    with redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _pinned(fixture, fn):
+    """Run a sync function with the sync clock pinned to the fixture's 'now'."""
+    sync = fixture.sync
+
+    def call():
+        saved = sync.utcnow
+        sync.utcnow = lambda: fixture.spec.now
+        try:
+            return quiet(fn)
+        finally:
+            sync.utcnow = saved
+    return call
+
+
+def _loader(name, file_name):
+    def setup(fx):
+        from analysis import loaders
+        path = os.path.join(fx.bucket_dir, file_name)
+        return lambda: getattr(loaders, name)(path)
+    return setup
+
+
+def _combined_df(fx):
+    from analysis.align import align_traffic
+    revenue, traffic = fx.frames
+    return lambda: align_traffic(revenue, traffic)
+
+
+def _stream_tab(fx):
+    # The whole Traffic Monthly write: merge, CSV multipart upload, priority CSV, matrix store, forecast input
+    return _pinned(fx, lambda: fx.sync.stream_tab_to_s3(
+        InMemoryS3(), fx.sync.merge_wide_format_rows(fx.existing_traffic, fx.tabs['Traffic Monthly']),
+        'traffic-data.csv', matrix_name='traffic_monthly',
+        priority=('traffic-data-priority.csv', fx.priority_domains), monthly='mean'))
+
+
+def _extract_metadata(fx):
+    s3 = InMemoryS3(seed_dir=fx.bucket_dir)
+    return _pinned(fx, lambda: fx.sync.extract_csv_metadata(s3))
+
+
+# name -> setup(fixture) returning a zero-argument callable to time
+CASES = {
+    'sync.merge_wide_format_data': lambda fx: _pinned(fx, lambda: fx.sync.merge_wide_format_data(
+        fx.existing_traffic, fx.tabs['Traffic Monthly'])),
+    'sync.convert_to_csv': lambda fx: _pinned(fx, lambda: fx.sync.convert_to_csv(fx.merged_traffic)),
+    'sync.stream_tab_to_s3': _stream_tab,
+    'sync.compute_priority_domains': lambda fx: _pinned(fx, lambda: fx.sync.compute_priority_domains(fx.tabs['Revenue'])),
+    'sync.filter_csv_to_priority': lambda fx: _pinned(fx, lambda: fx.sync.filter_csv_to_priority(
+        fx.merged_traffic, fx.priority_domains)),
+    'sync.find_header_row': lambda fx: _pinned(fx, lambda: fx.sync.find_header_row(fx.tabs['Traffic Average'])),
+    'sync.extract_csv_metadata': _extract_metadata,
+    'sync.build_matrix_store': lambda fx: _pinned(fx, lambda: fx.sync.build_matrix_store(fx.merged_traffic)),
+    'sync.build_forecast': lambda fx: _pinned(fx, lambda: fx.sync.build_forecast(
+        {'traffic_monthly': fx.merged_traffic, 'revenue': fx.tabs['Revenue']})),
+    'analysis.load_traffic_long': _loader('load_traffic_long', 'traffic-data.csv'),
+    'analysis.load_revenue_long': _loader('load_revenue_long', 'revenue-history.csv'),
+    'analysis.load_dr_long': _loader('load_dr_long', 'DR History.csv'),
+    'analysis.combined_df': _combined_df,
+}
+
+
+def measure(fn, repeat=3):
+    """Median/best wall time over `repeat` runs, then the tracemalloc peak of one more."""
+    fn()  # warm-up: imports, caches, first-touch allocations
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'time_s': round(statistics.median(times), 6),
+        'min_s': round(min(times), 6),
+        'peak_mb': round(peak / 1e6, 3),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=DEFAULT_SIZES, only=None, repeat=3, seed=7, log=print):
+    """
+    Run every (matching) case at every size.
+
+    Args:
+        sizes: Keys of SIZES, smallest first
+        only: fnmatch patterns on case names ('merge' matches as '*merge*')
+        repeat: Timed runs per case
+
+    Returns:
+        Results document (see module docstring)
+    """
+    patterns = [p if any(c in p for c in '*?[') else f'*{p}*' for p in (only or [])]
+    names = [n for n in CASES if not patterns or any(fnmatch.fnmatch(n, p) for p in patterns)]
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-') as work_dir:
+        for size in sizes:
+            fixture = Fixture(size, work_dir, seed=seed)
+            log(f"\n📏 {size}: {fixture.domains:,} domains x {fixture.dates:,} dates")
+            for name in names:
+                fn = CASES[name](fixture)
+                stats = measure(fn, repeat=repeat)
+                results.append({'case': name, 'size': size, 'domains': fixture.domains,
+                                'dates': fixture.dates, 'cells': fixture.cells, 'repeat': repeat, **stats})
+                log(f"   {name:<34} {stats['time_s'] * 1000:>10.1f} ms  {stats['peak_mb']:>9.1f} MB")
+            del fixture
+
+    return {
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'git_rev': _git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)",
+        'results': results,
+    }
+
+
+def growth(results):
+    """Case -> time exponent between its smallest and largest measured size (None for one size)."""
+    by_case = {}
+    for r in results:
+        by_case.setdefault(r['case'], []).append(r)
+    exponents = {}
+    for case, rows in by_case.items():
+        rows = sorted(rows, key=lambda r: r['cells'])
+        lo, hi = rows[0], rows[-1]
+        if hi['cells'] > lo['cells'] and lo['time_s'] > 0:
+            exponents[case] = float(np.log(hi['time_s'] / lo['time_s']) / np.log(hi['cells'] / lo['cells']))
+        else:
+            exponents[case] = None
+    return exponents
+
+
+def compare(baseline, current, threshold=1.2, memory_threshold=1.2, min_seconds=0.005):
+    """
+    Pair up results by (case, size) and flag regressions.
+
+    A case regresses when its median time grows by more than `threshold`x
+    (ignoring cases under min_seconds in both runs, which are noise) or its
+    peak memory by more than `memory_threshold`x.
+
+    Returns:
+        List of row dicts with baseline/current numbers, ratios and a 'status'
+    """
+    base = {(r['case'], r['size']): r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        b = base.get((r['case'], r['size']))
+        if b is None:
+            rows.append({'case': r['case'], 'size': r['size'], 'status': 'new', 'current': r})
+            continue
+        time_ratio = r['time_s'] / b['time_s'] if b['time_s'] else float('inf')
+        mem_ratio = r['peak_mb'] / b['peak_mb'] if b['peak_mb'] else 1.0
+        noise = max(r['time_s'], b['time_s']) < min_seconds
+        if (time_ratio > threshold and not noise) or mem_ratio > memory_threshold:
+            status = 'REGRESSION'
+        elif time_ratio < 1 / threshold and not noise:
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append({'case': r['case'], 'size': r['size'], 'status': status, 'baseline': b, 'current': r,
+                     'time_ratio': time_ratio, 'mem_ratio': mem_ratio})
+    return rows
+
+
+def _write_json(path, document):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sync and analysis hot paths')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = sub.add_parser('run', help='Run the suite and write a results file')
+    run_cmd.add_argument('--size', action='append', choices=list(SIZES), help=f'Repeatable (default: {" ".join(DEFAULT_SIZES)})')
+    run_cmd.add_argument('--only', action='append', help='Case name pattern (repeatable)')
+    run_cmd.add_argument('--repeat', type=int, default=3)
+    run_cmd.add_argument('--seed', type=int, default=7)
+    run_cmd.add_argument('--out', default=DEFAULT_OUT)
+    run_cmd.add_argument('--save-baseline', action='store_true', help=f'Also write {DEFAULT_BASELINE}')
+
+    cmp_cmd = sub.add_parser('compare', help='Compare a results file with a baseline')
+    cmp_cmd.add_argument('current', nargs='?', default=DEFAULT_OUT)
+    cmp_cmd.add_argument('--baseline', default=DEFAULT_BASELINE)
+    cmp_cmd.add_argument('--threshold', type=float, default=1.2, help='Allowed time ratio')
+    cmp_cmd.add_argument('--memory-threshold', type=float, default=1.2, help='Allowed peak memory ratio')
+    cmp_cmd.add_argument('--min-seconds', type=float, default=0.005, help='Ignore timing changes below this')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        sizes = sorted(args.size or DEFAULT_SIZES, key=list(SIZES).index)
+        document = run_suite(sizes, only=args.only, repeat=args.repeat, seed=args.seed)
+        exponents = growth(document['results'])
+        if len(sizes) > 1:
+            print(f"\n📈 Growth ({sizes[0]} → {sizes[-1]}, time ~ cells^k)")
+            for case, k in exponents.items():
+                print(f"   {case:<34} k = {k:.2f}" if k is not None else f"   {case:<34} k = n/a")
+        document['growth'] = exponents
+        _write_json(args.out, document)
+        print(f"\n✓ Saved: {args.out}")
+        if args.save_baseline:
+            _write_json(DEFAULT_BASELINE, document)
+            print(f"✓ Saved: {DEFAULT_BASELINE}")
+        return
+
+    baseline, current = _read_json(args.baseline), _read_json(args.current)
+    rows = compare(baseline, current, args.threshold, args.memory_threshold, args.min_seconds)
+    print(f"Baseline {baseline.get('git_rev')} ({baseline['created_at']}) vs current {current.get('git_rev')} ({current['created_at']})\n")
+    print(f"   {'case':<34} {'size':<4} {'base ms':>10} {'now ms':>10} {'time':>7} {'mem':>7}")
+    for row in rows:
+        cur = row['current']
+        if row['status'] == 'new':
+            print(f"   {row['case']:<34} {row['size']:<4} {'-':>10} {cur['time_s'] * 1000:>10.1f} {'':>7} {'':>7}  new")
+            continue
+        flag = {'REGRESSION': '❌ REGRESSION', 'faster': '✅ faster', 'ok': ''}[row['status']]
+        print(f"   {row['case']:<34} {row['size']:<4} {row['baseline']['time_s'] * 1000:>10.1f} "
+              f"{cur['time_s'] * 1000:>10.1f} {row['time_ratio']:>6.2f}x {row['mem_ratio']:>6.2f}x  {flag}")
+    regressions = [r for r in rows if r['status'] == 'REGRESSION']
+    print(f"\n{len(regressions)} regression(s) in {len(rows)} result(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
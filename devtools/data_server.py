@@ -0,0 +1,477 @@
+"""
+Local stand-in for the Vercel /api/data/* endpoints.
+
+Serves the same routes as api/data/*.js from a local directory, an in-memory
+S3 snapshot or the real bucket, with the same auth rules (any auth_session
+cookie, or an X-Test-Token header matching E2E_TEST_TOKEN). Static files are
+served too, so it replaces `python3 -m http.server` for Playwright runs.
+
+On top of the Vercel handlers it adds:
+- ETag / If-None-Match (304 responses)
+- gzip Content-Encoding when the client accepts it
+- single byte-range requests (206)
+- CSV slicing: ?domains=a.com,b.com and ?since=YYYY-MM-DD&until=YYYY-MM-DD
+- a Server-Timing header with the time spent on each request
+
+Serving strategies (--strategy), for comparing throughput offline:
+- direct: read the object from the source on every request
+- cached: keep objects in memory, revalidate with head_object per request
+- precompressed: cached, plus a gzip copy built once per object version
+
+Usage:
+    python -m devtools.data_server --data-dir ./s3-snapshot
+    python -m devtools.data_server --snapshot ./s3-snapshot --strategy precompressed
+    python -m devtools.data_server --bucket traffic-dashboard-theta
+"""
+
+import io
+import os
+import re
+import csv
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import date
+from functools import partial
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from devtools.fake_s3 import InMemoryS3, LocalDirS3
+
+# route -> (S3 key, Cache-Control max-age seconds); mirrors api/data/*.js
+DATA_ROUTES = {
+    'traffic': ('traffic-data.csv', 300),
+    'traffic-priority': ('traffic-data-priority.csv', 300),
+    'average': ('internal-average-traffic.csv', 300),
+    'average-priority': ('internal-average-traffic-priority.csv', 300),
+    'dr': ('DR History.csv', 300),
+    'dr-priority': ('DR History-priority.csv', 300),
+    'rd': ('RD History.csv', 300),
+    'rd-priority': ('RD History-priority.csv', 300),
+    'revenue': ('revenue-history.csv', 300),
+    'agent-niche': ('site-agent-niche.csv', 3600),
+    'pyramid': ('series-pyramid.json', 300),
+    'forecast': ('forecast.json', 300),
+    'stability': ('stability.json', 300),
+    'sync-log': ('sync-log.json', 60),
+    'sync-status': ('sync-log.json', 60),
+}
+
+# /api/data/sync-history: per-run records in day partitions (api/data/sync-history.js)
+HISTORY_PREFIX = 'sync-history/'
+
+# Static page rewrites from vercel.json
+REWRITES = {
+    '/': '/index-apex.html',
+    '/log': '/log.html',
+}
+
+STRATEGIES = ('direct', 'cached', 'precompressed')
+MIN_GZIP_BYTES = 1024
+
+E2E_TEST_USER = {
+    'authenticated': True,
+    'email': 'e2e-test@example.com',
+    'name': 'E2E Test User',
+    'picture': None,
+}
+
+_DATE_HEADER_RE = re.compile(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(?:(\d{1,2})\s*-\s*)?(\d{4})$')
+_MONTHS = {m: i + 1 for i, m in enumerate(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                                            'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])}
+
+
+class Entry:
+    """One object version as served (body plus validators)."""
+
+    __slots__ = ('body', 'etag', 'content_type', 'gzipped')
+
+    def __init__(self, body, etag, content_type, gzipped=None):
+        self.body = body
+        self.etag = etag
+        self.content_type = content_type
+        self.gzipped = gzipped
+
+
+class DataSource:
+    """Reads objects from an S3-like client according to the serving strategy."""
+
+    def __init__(self, client, bucket=None, strategy='cached'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        self.client = client
+        self.bucket = bucket
+        self.strategy = strategy
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        body = response['Body'].read()
+        gzipped = gzip.compress(body, 6) if self.strategy == 'precompressed' and len(body) >= MIN_GZIP_BYTES else None
+        return Entry(body, response.get('ETag') or _content_etag(body), response.get('ContentType'), gzipped)
+
+    def fetch(self, key):
+        if self.strategy == 'direct':
+            return self._load(key)
+
+        etag = self.client.head_object(Bucket=self.bucket, Key=key).get('ETag')
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and etag and entry.etag == etag:
+            return entry
+
+        entry = self._load(key)
+        with self._lock:
+            self._cache[key] = entry
+        return entry
+
+
+def _list_keys(client, bucket, prefix):
+    """All keys under prefix, following ListObjectsV2 pagination."""
+    keys, token = [], None
+    while True:
+        kwargs = {'Bucket': bucket, 'Prefix': prefix}
+        if token:
+            kwargs['ContinuationToken'] = token
+        response = client.list_objects_v2(**kwargs)
+        keys.extend(item['Key'] for item in response.get('Contents', []))
+        if not response.get('IsTruncated'):
+            return keys
+        token = response.get('NextContinuationToken')
+
+
+def read_sync_history(client, bucket, day=None):
+    """
+    One day partition of the sync history, as api/data/sync-history.js returns it.
+
+    Args:
+        day: 'YYYY-MM-DD' (default: the latest day with runs)
+
+    Returns:
+        (HTTP status, payload dict, Cache-Control max-age)
+    """
+    partitions = {}
+    for key in _list_keys(client, bucket, HISTORY_PREFIX):
+        match = re.match(re.escape(HISTORY_PREFIX) + r'date=(\d{4}-\d{2}-\d{2})/', key)
+        if match:
+            partitions.setdefault(match.group(1), []).append(key)
+    dates = sorted(partitions)
+    if not dates:
+        return HTTPStatus.NOT_FOUND, {'error': 'Sync history not found'}, 0
+
+    day = day or dates[-1]
+    if day not in partitions:
+        return HTTPStatus.NOT_FOUND, {'error': f'No sync history for {day}'}, 0
+
+    runs = []
+    for key in partitions[day]:
+        body = client.get_object(Bucket=bucket, Key=key)['Body'].read().decode('utf-8')
+        runs.extend(json.loads(line) for line in body.splitlines() if line.strip())
+    runs.sort(key=lambda run: run.get('timestamp', ''), reverse=True)
+
+    index = dates.index(day)
+    latest = index == len(dates) - 1
+    return HTTPStatus.OK, {
+        'date': day,
+        'runs': runs,
+        'older': dates[index - 1] if index > 0 else None,
+        'newer': None if latest else dates[index + 1],
+    }, 60 if latest else 86400
+
+
+def _content_etag(body):
+    return '"' + hashlib.md5(body).hexdigest() + '"'
+
+
+def _derived_etag(etag, variant):
+    return 'W/"' + hashlib.sha1(f"{etag}|{variant}".encode('utf-8')).hexdigest()[:20] + '"'
+
+
+def _parse_header_date(header):
+    match = _DATE_HEADER_RE.match(str(header).strip())
+    if not match:
+        return None
+    month, day, year = match.groups()
+    try:
+        return date(int(year), _MONTHS[month], int(day) if day else 1)
+    except ValueError:
+        return None
+
+
+def slice_csv(body, domains=None, since=None, until=None):
+    """
+    Cut a wide CSV down to some domains and/or a date window.
+
+    Non-date columns are always kept; date columns ('Mon D - YYYY' or
+    'Mon YYYY') outside since..until are dropped. Rows are matched on the
+    Website column, case-insensitively.
+
+    Returns:
+        CSV bytes
+    """
+    reader = csv.reader(io.StringIO(body.decode('utf-8')))
+    try:
+        header = next(reader)
+    except StopIteration:
+        return body
+
+    keep_cols = list(range(len(header)))
+    if since or until:
+        keep_cols = []
+        for idx, cell in enumerate(header):
+            col_date = _parse_header_date(cell)
+            if col_date is None or ((not since or col_date >= since) and (not until or col_date <= until)):
+                keep_cols.append(idx)
+
+    website_col = next((i for i, cell in enumerate(header) if str(cell).strip().lower() == 'website'), None)
+    wanted = {d.strip().lower() for d in domains} if domains else None
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow([header[i] for i in keep_cols])
+    for row in reader:
+        if wanted is not None:
+            if website_col is None or website_col >= len(row) or row[website_col].strip().lower() not in wanted:
+                continue
+        writer.writerow([row[i] if i < len(row) else '' for i in keep_cols])
+    return out.getvalue().encode('utf-8')
+
+
+def _parse_range(value, length):
+    """Parse a single 'bytes=a-b' range; returns (start, end) inclusive, or None if unsatisfiable."""
+    match = re.match(r'^bytes=(\d*)-(\d*)$', value.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), length - 1) if end else length - 1
+    else:
+        start = max(length - int(end), 0)
+        end = length - 1
+    if start > end or start >= length:
+        return None
+    return start, end
+
+
+class DataServiceHandler(SimpleHTTPRequestHandler):
+    server_version = 'TrafficDashboardDataService/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- auth (api/lib/auth.js) ---
+
+    def _is_authenticated(self):
+        if self.server.token is None:
+            return True
+        if re.search(r'auth_session=([^;]+)', self.headers.get('Cookie', '')):
+            return True
+        test_token = self.headers.get('X-Test-Token')
+        return bool(test_token) and test_token == self.server.token
+
+    # --- responses ---
+
+    def _send(self, status, body=b'', headers=None, head_only=False):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Server-Timing', f"serve;dur={(time.perf_counter() - self._started) * 1000:.2f}")
+        self.end_headers()
+        if body and not head_only:
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload, head_only=False, extra=None):
+        headers = {'Content-Type': 'application/json'}
+        headers.update(extra or {})
+        self._send(status, json.dumps(payload).encode('utf-8'), headers, head_only)
+
+    # --- routing ---
+
+    def do_GET(self):
+        self._dispatch(head_only=False)
+
+    def do_HEAD(self):
+        self._dispatch(head_only=True)
+
+    def _dispatch(self, head_only):
+        self._started = time.perf_counter()
+        parts = urlsplit(self.path)
+        path = parts.path
+
+        if path.startswith('/api/data/'):
+            return self._serve_data(path[len('/api/data/'):].strip('/'), parse_qs(parts.query), head_only)
+        if path.startswith('/api/auth/'):
+            return self._serve_auth(path[len('/api/auth/'):].strip('/'), head_only)
+        if path.startswith('/api/'):
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'}, head_only)
+
+        if path in REWRITES:
+            self.path = REWRITES[path] + (('?' + parts.query) if parts.query else '')
+        if head_only:
+            return super().do_HEAD()
+        return super().do_GET()
+
+    def _serve_auth(self, action, head_only):
+        authenticated = self._is_authenticated()
+        if action == 'check':
+            return self._send_json(HTTPStatus.OK, {'authenticated': authenticated}, head_only)
+        if action == 'me':
+            return self._send_json(HTTPStatus.OK, E2E_TEST_USER if authenticated else {'authenticated': False}, head_only)
+        if action in ('login', 'logout', 'callback'):
+            return self._send(HTTPStatus.FOUND, headers={'Location': '/'}, head_only=head_only)
+        return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'}, head_only)
+
+    def _serve_data(self, route, query, head_only):
+        if not self._is_authenticated():
+            return self._send_json(HTTPStatus.UNAUTHORIZED, {'error': 'Unauthorized'}, head_only)
+        if route == 'sync-history':
+            return self._serve_sync_history(query, head_only)
+        if route not in DATA_ROUTES:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'}, head_only)
+
+        key, max_age = DATA_ROUTES[route]
+        source = self.server.source
+        try:
+            entry = source.fetch(key)
+        except Exception as e:
+            # GET raises NoSuchKey, HEAD (cached strategies) a bare 404 ClientError
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') in ('NoSuchKey', '404', 'NotFound'):
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Data not found'}, head_only)
+            print(f"Error fetching {key}: {e}")
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Failed to fetch data'}, head_only)
+
+        body, etag, gzipped = entry.body, entry.etag, entry.gzipped
+        content_type = 'application/json' if key.endswith('.json') else 'text/csv'
+
+        if route == 'sync-status':
+            log = json.loads(body)
+            body = json.dumps({k: log.get(k) for k in ('last_sync', 'status', 'duration_seconds')}).encode('utf-8')
+            etag, gzipped = _derived_etag(etag, route), None
+
+        domains = [d for v in query.get('domains', []) for d in v.split(',') if d.strip()]
+        since = query.get('since', [None])[0]
+        until = query.get('until', [None])[0]
+        if key.endswith('.csv') and (domains or since or until):
+            try:
+                since_date = date.fromisoformat(since) if since else None
+                until_date = date.fromisoformat(until) if until else None
+            except ValueError:
+                return self._send_json(HTTPStatus.BAD_REQUEST, {'error': 'since/until must be YYYY-MM-DD'}, head_only)
+            body = slice_csv(body, domains, since_date, until_date)
+            etag, gzipped = _derived_etag(etag, f"{sorted(domains)}|{since}|{until}"), None
+
+        headers = {
+            'Content-Type': content_type,
+            'Cache-Control': f'public, max-age={max_age}',
+            'ETag': etag,
+            'Vary': 'Accept-Encoding',
+            'Accept-Ranges': 'bytes',
+        }
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+            return self._send(HTTPStatus.NOT_MODIFIED, headers=headers, head_only=True)
+
+        range_header = self.headers.get('Range')
+        if range_header:
+            byte_range = _parse_range(range_header, len(body))
+            if byte_range is None:
+                headers['Content-Range'] = f'bytes */{len(body)}'
+                return self._send(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers, head_only=head_only)
+            start, end = byte_range
+            headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+            return self._send(HTTPStatus.PARTIAL_CONTENT, body[start:end + 1], headers, head_only)
+
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) >= MIN_GZIP_BYTES:
+            body = gzipped if gzipped is not None else gzip.compress(body, 6)
+            headers['Content-Encoding'] = 'gzip'
+
+        return self._send(HTTPStatus.OK, body, headers, head_only)
+
+
+    def _serve_sync_history(self, query, head_only):
+        day = query.get('date', [None])[0]
+        if day and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', day):
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': 'date must be YYYY-MM-DD'}, head_only)
+        source = self.server.source
+        try:
+            status, payload, max_age = read_sync_history(source.client, source.bucket, day)
+        except Exception as e:
+            print(f"Error reading sync history: {e}")
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Failed to fetch sync history'}, head_only)
+        extra = {'Cache-Control': f'public, max-age={max_age}'} if status == HTTPStatus.OK else None
+        return self._send_json(status, payload, head_only, extra)
+
+
+def make_server(source, host='127.0.0.1', port=3456, token=None, static_dir='.', verbose=False):
+    """
+    Build (but do not start) the HTTP server.
+
+    Args:
+        source: DataSource serving the /api/data/* objects
+        token: Required X-Test-Token value; None disables auth entirely
+        static_dir: Directory for the dashboards' static files
+
+    Returns:
+        ThreadingHTTPServer; call serve_forever() to run it
+    """
+    handler = partial(DataServiceHandler, directory=os.path.abspath(static_dir))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.source = source
+    server.token = token
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard data API locally')
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--data-dir', help='Directory laid out like the S3 bucket (read live)')
+    where.add_argument('--snapshot', help='Load this directory into an in-memory S3 at startup')
+    where.add_argument('--bucket', help='Read from this S3 bucket (needs boto3 and AWS credentials)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3456)
+    parser.add_argument('--static-dir', default='.', help='Directory with the dashboard HTML files')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='cached')
+    parser.add_argument('--token', default=os.environ.get('E2E_TEST_TOKEN', ''),
+                        help='X-Test-Token value to accept (default: $E2E_TEST_TOKEN)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    if args.bucket:
+        import boto3
+        client, description = boto3.client('s3'), f"s3://{args.bucket}"
+    elif args.snapshot:
+        client = InMemoryS3(args.snapshot)
+        description = f"in-memory snapshot of {args.snapshot} ({client.list_objects_v2(None)['KeyCount']} objects)"
+    else:
+        data_dir = args.data_dir or args.static_dir
+        client, description = LocalDirS3(data_dir), data_dir
+
+    token = args.token or None
+    if token is None:
+        print("⚠️  No E2E_TEST_TOKEN/--token set - API auth is disabled")
+
+    server = make_server(DataSource(client, args.bucket, args.strategy), args.host, args.port,
+                         token, args.static_dir, args.verbose)
+    print(f"Serving {args.static_dir} and /api/data/* from {description}")
+    print(f"Strategy: {args.strategy} - http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+"""
+S3 stand-ins with the subset of the boto3 client API this repo uses.
+
+- InMemoryS3: objects held in a dict (optionally seeded from a directory)
+- LocalDirS3: objects are files under a directory, keys are relative paths
+
+Both raise client.exceptions.NoSuchKey for missing keys, like boto3, so code
+written against a real client (e.g. open_existing_s3_csv in the sync) works
+unchanged. Multipart uploads are assembled with put_object on completion and,
+like S3, reject parts under 5 MiB other than the last.
+"""
+
+import io
+import os
+import uuid
+import hashlib
+import mimetypes
+import threading
+from datetime import datetime, timezone
+
+
+class ClientError(Exception):
+    """Mimics botocore.exceptions.ClientError closely enough for error-code checks."""
+
+    def __init__(self, code, message, operation):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation: {message}")
+        self.response = {'Error': {'Code': code, 'Message': message}}
+        self.operation_name = operation
+
+
+class NoSuchKey(ClientError):
+    def __init__(self, key, operation='GetObject'):
+        super().__init__('NoSuchKey', f'The specified key does not exist: {key}', operation)
+
+
+class _Exceptions:
+    NoSuchKey = NoSuchKey
+    ClientError = ClientError
+
+
+def _etag(body):
+    return '"' + hashlib.md5(body).hexdigest() + '"'
+
+
+def _guess_type(key):
+    content_type, _ = mimetypes.guess_type(key)
+    return content_type or 'application/octet-stream'
+
+
+def _to_bytes(body):
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    if hasattr(body, 'read'):
+        return body.read()
+    return bytes(body)
+
+
+MIN_PART_BYTES = 5 * 1024 * 1024
+
+
+class _MultipartUploads:
+    """
+    create/upload_part/complete/abort_multipart_upload on top of put_object
+    (subclasses set self._multipart = {} in __init__).
+    """
+
+    def _upload(self, upload_id, key, operation):
+        upload = self._multipart.get(upload_id)
+        if upload is None or upload['key'] != key:
+            raise ClientError('NoSuchUpload', 'The specified upload does not exist.', operation)
+        return upload
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, **kwargs):
+        upload_id = uuid.uuid4().hex
+        self._multipart[upload_id] = {'key': Key, 'content_type': ContentType, 'parts': {}}
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        body = _to_bytes(Body)
+        self._upload(UploadId, Key, 'UploadPart')['parts'][PartNumber] = body
+        return {'ETag': _etag(body)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        upload = self._upload(UploadId, Key, 'CompleteMultipartUpload')
+        parts = MultipartUpload['Parts']
+        numbers = [part['PartNumber'] for part in parts]
+        if numbers != sorted(set(numbers)):
+            raise ClientError('InvalidPartOrder', 'Parts must be listed in ascending order.',
+                              'CompleteMultipartUpload')
+        bodies = []
+        for part in parts:
+            body = upload['parts'].get(part['PartNumber'])
+            if body is None or _etag(body) != part['ETag']:
+                raise ClientError('InvalidPart', f"Part {part['PartNumber']} was not uploaded.",
+                                  'CompleteMultipartUpload')
+            bodies.append(body)
+        if any(len(body) < MIN_PART_BYTES for body in bodies[:-1]):
+            raise ClientError('EntityTooSmall', 'Your proposed upload is smaller than the minimum allowed size',
+                              'CompleteMultipartUpload')
+        del self._multipart[UploadId]
+        response = self.put_object(Bucket, Key, b''.join(bodies), ContentType=upload['content_type'])
+        return {'Bucket': Bucket, 'Key': Key, 'ETag': response['ETag']}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._upload(UploadId, Key, 'AbortMultipartUpload')
+        del self._multipart[UploadId]
+        return {}
+
+
+class InMemoryS3(_MultipartUploads):
+    """Thread-safe in-memory bucket store (bucket names are accepted but not separated)."""
+
+    exceptions = _Exceptions
+
+    def __init__(self, seed_dir=None):
+        self._objects = {}  # key -> dict(body, content_type, etag, last_modified)
+        self._multipart = {}  # upload id -> dict(key, content_type, parts)
+        self._lock = threading.Lock()
+        if seed_dir:
+            self.load_dir(seed_dir)
+
+    def load_dir(self, root):
+        """Seed objects from every file under root (keys are relative paths)."""
+        count = 0
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, root).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    self.put_object(Bucket=None, Key=key, Body=f.read(), ContentType=_guess_type(key))
+                count += 1
+        return count
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, **kwargs):
+        body = _to_bytes(Body)
+        etag = _etag(body)
+        with self._lock:
+            self._objects[Key] = {
+                'body': body,
+                'content_type': ContentType or _guess_type(Key),
+                'etag': etag,
+                'last_modified': datetime.now(timezone.utc),
+            }
+        return {'ETag': etag}
+
+    def _get(self, key, operation):
+        with self._lock:
+            obj = self._objects.get(key)
+        if obj is None:
+            if operation == 'HeadObject':
+                raise ClientError('404', 'Not Found', operation)
+            raise NoSuchKey(key, operation)
+        return obj
+
+    def get_object(self, Bucket, Key, **kwargs):
+        obj = self._get(Key, 'GetObject')
+        return {
+            'Body': io.BytesIO(obj['body']),
+            'ContentLength': len(obj['body']),
+            'ContentType': obj['content_type'],
+            'ETag': obj['etag'],
+            'LastModified': obj['last_modified'],
+        }
+
+    def head_object(self, Bucket, Key, **kwargs):
+        obj = self._get(Key, 'HeadObject')
+        return {
+            'ContentLength': len(obj['body']),
+            'ContentType': obj['content_type'],
+            'ETag': obj['etag'],
+            'LastModified': obj['last_modified'],
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        with self._lock:
+            self._objects.pop(Key, None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', **kwargs):
+        with self._lock:
+            keys = sorted(k for k in self._objects if k.startswith(Prefix))
+            contents = [{'Key': k, 'Size': len(self._objects[k]['body']),
+                         'ETag': self._objects[k]['etag'],
+                         'LastModified': self._objects[k]['last_modified']} for k in keys]
+        return {'Contents': contents, 'KeyCount': len(contents), 'IsTruncated': False}
+
+    def download_file(self, Bucket, Key, Filename, **kwargs):
+        obj = self._get(Key, 'GetObject')
+        with open(Filename, 'wb') as f:
+            f.write(obj['body'])
+
+    def dump_dir(self, root):
+        """Write every object to root/<key> (for inspecting a run)."""
+        with self._lock:
+            items = list(self._objects.items())
+        for key, obj in items:
+            path = os.path.join(root, *key.split('/'))
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(obj['body'])
+        return len(items)
+
+
+class LocalDirS3(_MultipartUploads):
+    """Bucket backed by a directory; reads always see the current files."""
+
+    exceptions = _Exceptions
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._multipart = {}  # upload id -> dict(key, content_type, parts)
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, *key.split('/')))
+        if not path.startswith(self.root + os.sep):
+            raise NoSuchKey(key)
+        return path
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, **kwargs):
+        body = _to_bytes(Body)
+        path = self._path(Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        return {'ETag': _etag(body)}
+
+    def _stat(self, key, operation):
+        path = self._path(key)
+        try:
+            return path, os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            if operation == 'HeadObject':
+                raise ClientError('404', 'Not Found', operation)
+            raise NoSuchKey(key, operation)
+
+    @staticmethod
+    def _file_etag(st):
+        # Cheap validator from size + mtime, shared by GET and HEAD like S3's ETag
+        return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+    def get_object(self, Bucket, Key, **kwargs):
+        path, st = self._stat(Key, 'GetObject')
+        with open(path, 'rb') as f:
+            body = f.read()
+        return {
+            'Body': io.BytesIO(body),
+            'ContentLength': len(body),
+            'ContentType': _guess_type(Key),
+            'ETag': self._file_etag(st),
+            'LastModified': datetime.fromtimestamp(st.st_mtime, timezone.utc),
+        }
+
+    def head_object(self, Bucket, Key, **kwargs):
+        _, st = self._stat(Key, 'HeadObject')
+        return {
+            'ContentLength': st.st_size,
+            'ContentType': _guess_type(Key),
+            'ETag': self._file_etag(st),
+            'LastModified': datetime.fromtimestamp(st.st_mtime, timezone.utc),
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        try:
+            os.remove(self._path(Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', **kwargs):
+        contents = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, '/')
+                if key.startswith(Prefix):
+                    st = os.stat(path)
+                    contents.append({'Key': key, 'Size': st.st_size,
+                                     'LastModified': datetime.fromtimestamp(st.st_mtime, timezone.utc)})
+        contents.sort(key=lambda c: c['Key'])
+        return {'Contents': contents, 'KeyCount': len(contents), 'IsTruncated': False}
+
+    def download_file(self, Bucket, Key, Filename, **kwargs):
+        response = self.get_object(Bucket, Key)
+        with open(Filename, 'wb') as f:
+            f.write(response['Body'].read())
@@ -0,0 +1,373 @@
+"""
+Offline harness for the sync Lambda (lambda/sync-dashboard.py).
+
+Runs lambda_handler end to end - revenue and priority domains, merge with
+the existing bucket, priority CSVs, pyramid, forecasts, matrix store and the
+sync log - against a fake Sheets service and an S3 stand-in from
+devtools/fake_s3.py. The clock is pinned, so the same tabs and starting
+bucket always produce the same objects.
+
+Fixture tabs are CSV files named after the sheet tab ("Revenue.csv",
+"Traffic Monthly.csv", ...), or the bucket's own exports ("traffic-data.csv",
+...) with --exports.
+
+fake_sheets_session() runs the Lambda's own SheetsSession (requests, gzip,
+the scheduler's retries) against the same fake service at the HTTP level.
+
+Usage:
+    python -m devtools.sync_harness --tabs ./fixtures --out ./s3-snapshot
+    python -m devtools.sync_harness --exports ./s3-snapshot --seed ./s3-snapshot --out ./s3-after
+    python -m devtools.sync_harness --tabs ./fixtures --seed ./s3-snapshot --profile stream,forecast --out ./s3-after
+    python -m devtools.data_server --data-dir ./s3-snapshot
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import gzip
+import json
+import time
+import argparse
+import importlib
+import importlib.util
+from contextlib import redirect_stdout
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from devtools.fake_s3 import InMemoryS3, LocalDirS3
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYNC_PATH = os.path.join(REPO_ROOT, 'lambda', 'sync-dashboard.py')
+DEFAULT_NOW = '2026-01-15T06:00:00'
+
+_sync_module = None
+
+
+class HttpError(Exception):
+    """Stands in for the Sheets API error response (unknown tab -> 400)."""
+
+    def __init__(self, status, reason):
+        super().__init__(f"<HttpError {status}: {reason}>")
+        self.status_code = status
+        self.reason = reason
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _Values:
+    def __init__(self, service):
+        self._service = service
+
+    def get(self, spreadsheetId, range, **kwargs):
+        return _Request(lambda: self._service._get(spreadsheetId, range))
+
+    def batchGet(self, spreadsheetId, ranges, **kwargs):
+        return _Request(lambda: {'valueRanges': [self._service._get(spreadsheetId, r) for r in ranges]})
+
+
+class _Spreadsheets:
+    def __init__(self, service):
+        self._service = service
+
+    def values(self):
+        return _Values(self._service)
+
+
+class FakeSheetsService:
+    """
+    The spreadsheets().values().get/batchGet(...).execute() subset of the Sheets API.
+
+    Like the real API, cells come back as strings, trailing empty cells and
+    rows are dropped, and A1 ranges ('Tab'!A:F, 'Tab'!1:10, 'Tab'!B2:D9) cut
+    out part of the tab.
+
+    Args:
+        tabs: Dict of tab name -> list of rows (tab names are unique across
+              the traffic/DR and revenue spreadsheets, so the id is not used)
+    """
+
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.reads = []  # (spreadsheet_id, tab) per call, for assertions
+
+    def spreadsheets(self):
+        return _Spreadsheets(self)
+
+    def _get(self, spreadsheet_id, range_name):
+        tab, _, a1 = range_name.partition('!')
+        tab = tab.strip("'")
+        self.reads.append((spreadsheet_id, tab))
+        if tab not in self.tabs:
+            raise HttpError(400, f"Unable to parse range: {range_name}")
+        rows, cols = _a1_bounds(a1)
+        if rows is None:
+            raise HttpError(400, f"Unable to parse range: {range_name}")
+
+        values = []
+        for row in self.tabs[tab][rows]:
+            cells = ['' if cell is None else str(cell) for cell in row[cols]]
+            while cells and cells[-1] == '':
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return {'range': range_name, 'majorDimension': 'ROWS', 'values': values}
+
+
+class FakeSheetsAdapter(HTTPAdapter):
+    """
+    requests transport answering Sheets API v4 values GETs from a FakeSheetsService.
+
+    Bodies are the API's JSON, gzipped when the request accepts it, so the
+    session decompresses them and raw.tell() counts wire bytes as it does
+    against the real API. Service errors come back as the API's JSON error
+    body with their status.
+
+    Args:
+        service: FakeSheetsService
+        fail: Statuses (e.g. 429, 503) to answer the next requests with before
+              serving any; they carry Retry-After: 0 so retries don't wait
+    """
+
+    _STATUS_NAMES = {400: 'INVALID_ARGUMENT', 404: 'NOT_FOUND', 429: 'RESOURCE_EXHAUSTED',
+                     500: 'INTERNAL', 503: 'UNAVAILABLE'}
+
+    def __init__(self, service, fail=()):
+        super().__init__()
+        self.service = service
+        self.fail = list(fail)
+        self.requests = []  # PreparedRequest per call, for assertions
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        headers = {'Content-Type': 'application/json; charset=UTF-8'}
+        if self.fail:
+            status = self.fail.pop(0)
+            payload = self._error(status, 'Injected failure')
+            headers['Retry-After'] = '0'
+        else:
+            status, payload = self._serve(request)
+
+        body = json.dumps(payload).encode('utf-8')
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, reason=HTTPStatus(status).phrase,
+                           preload_content=False, decode_content=True)
+        return self.build_response(request, raw)
+
+    def _serve(self, request):
+        url = urlsplit(request.url)
+        query = parse_qs(url.query)
+        match = re.fullmatch(r'/v4/spreadsheets/([^/]+)/values(?::batchGet|/(.+))', url.path)
+        if request.method != 'GET' or not match:
+            return 404, self._error(404, f"No route for {request.method} {url.path}")
+        spreadsheet_id, range_name = match.groups()
+        try:
+            if range_name is None:
+                return 200, {'spreadsheetId': spreadsheet_id,
+                             'valueRanges': [self.service._get(spreadsheet_id, r) for r in query.get('ranges', [])]}
+            return 200, self.service._get(spreadsheet_id, unquote(range_name))
+        except HttpError as e:
+            return e.status_code, self._error(e.status_code, e.reason)
+
+    def _error(self, status, message):
+        return {'error': {'code': status, 'message': message, 'status': self._STATUS_NAMES.get(status, 'UNKNOWN')}}
+
+
+def fake_sheets_session(tabs, fail=()):
+    """
+    The Lambda's SheetsSession with its HTTP transport swapped for a FakeSheetsAdapter.
+
+    Args:
+        tabs: Dict of tab name -> rows, or a FakeSheetsService
+        fail: See FakeSheetsAdapter
+
+    Returns:
+        (SheetsSession, FakeSheetsAdapter)
+    """
+    from google.auth.credentials import AnonymousCredentials
+
+    sync = load_sync_module()
+    service = tabs if isinstance(tabs, FakeSheetsService) else FakeSheetsService(tabs)
+    session = sync.SheetsSession(AnonymousCredentials())
+    adapter = FakeSheetsAdapter(service, fail)
+    session.session.mount(sync.SHEETS_API_URL, adapter)
+    return session, adapter
+
+
+def _column_index(letters):
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + ord(ch) - ord('A') + 1
+    return idx - 1
+
+
+def _a1_bounds(a1):
+    """(row slice, column slice) for an A1 range without the tab, (None, None) if invalid."""
+    if not a1:
+        return slice(None), slice(None)
+    match = re.fullmatch(r'([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?', a1.upper())
+    if not match:
+        return None, None
+    col1, row1, col2, row2 = match.groups()
+    if match.group(0).count(':') == 0:
+        col2, row2 = col1, row1
+    rows = slice(int(row1) - 1 if row1 else None, int(row2) if row2 else None)
+    cols = slice(_column_index(col1) if col1 else None, _column_index(col2) + 1 if col2 else None)
+    return rows, cols
+
+
+def read_csv_rows(path):
+    """Rows of a CSV file as lists of strings."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def load_tabs(directory):
+    """Fixture tabs from <tab name>.csv files."""
+    tabs = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.csv'):
+            tabs[name[:-4]] = read_csv_rows(os.path.join(directory, name))
+    return tabs
+
+
+def tabs_from_exports(directory):
+    """Fixture tabs from the bucket's CSV exports (traffic-data.csv, ...)."""
+    sync = load_sync_module()
+    tab_files = {
+        sync.TRAFFIC_MONTHLY_TAB: sync.S3_FILES['traffic_monthly'],
+        sync.TRAFFIC_AVERAGE_TAB: sync.S3_FILES['traffic_average'],
+        sync.DR_TAB: sync.S3_FILES['dr'],
+        sync.RD_TAB: sync.S3_FILES['rd'],
+        sync.REVENUE_TAB: sync.S3_FILES['revenue'],
+    }
+    tabs = {}
+    for tab, file_name in tab_files.items():
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            tabs[tab] = read_csv_rows(path)
+    return tabs
+
+
+def load_sync_module():
+    """
+    Import lambda/sync-dashboard.py (the hyphen rules out a plain import).
+
+    The forecast and stability engines are made importable as `forecast` and
+    `stability`, the names deploy.sh gives them in the Lambda package.
+    """
+    global _sync_module
+    if _sync_module is None:
+        for name in ('forecast', 'stability'):
+            if name not in sys.modules:
+                sys.modules[name] = importlib.import_module(f'analysis.{name}')
+        spec = importlib.util.spec_from_file_location('sync_dashboard', SYNC_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _sync_module = module
+    return _sync_module
+
+
+def run_sync(tabs, s3=None, now=DEFAULT_NOW, event=None, quiet=False):
+    """
+    Run one full sync offline.
+
+    Args:
+        tabs: Dict of tab name -> rows, or a Sheets service (FakeSheetsService,
+              or the SheetsSession from fake_sheets_session)
+        s3: S3 stand-in holding the bucket before the sync (default: empty InMemoryS3)
+        now: Pinned UTC time (ISO string or datetime), or None for the real
+             clock (and real stage timings and memory peaks)
+        event: Lambda event (default: {})
+        quiet: Swallow the sync's log output
+
+    Returns:
+        (response body dict with 'statusCode' added, s3 client, log text or None)
+    """
+    sync = load_sync_module()
+    service = FakeSheetsService(tabs) if isinstance(tabs, dict) else tabs
+    s3 = s3 if s3 is not None else InMemoryS3()
+    if isinstance(now, str):
+        now = datetime.fromisoformat(now)
+
+    saved = sync.utcnow, sync.perf_counter, sync.max_rss_mb, sync.TRACE_MEMORY, sync.SLACK_WEBHOOK_URL
+    if now is not None:
+        # Stage spans keep their counts and bytes but read zero time and no
+        # memory, so pinned runs stay byte-identical
+        sync.utcnow = lambda: now
+        sync.perf_counter = lambda: 0.0
+        sync.max_rss_mb = lambda: None
+        sync.TRACE_MEMORY = False
+    sync.SLACK_WEBHOOK_URL = ''  # never notify from offline runs
+    log = io.StringIO() if quiet else None
+    try:
+        if log is not None:
+            with redirect_stdout(log):
+                response = sync.lambda_handler(event or {}, None, sheets_service=service, s3_client=s3)
+        else:
+            response = sync.lambda_handler(event or {}, None, sheets_service=service, s3_client=s3)
+    finally:
+        sync.utcnow, sync.perf_counter, sync.max_rss_mb, sync.TRACE_MEMORY, sync.SLACK_WEBHOOK_URL = saved
+
+    body = json.loads(response['body'])
+    body['statusCode'] = response['statusCode']
+    return body, s3, (log.getvalue() if log is not None else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the sync Lambda offline against fixture tabs')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tabs', help='Directory of <tab name>.csv fixture files')
+    source.add_argument('--exports', help='Directory with the bucket CSV exports to use as the sheet tabs')
+    parser.add_argument('--seed', help='Directory laid out like the bucket to start from (existing history)')
+    parser.add_argument('--out', help='Write the resulting bucket here (default: keep in memory)')
+    parser.add_argument('--in-place', action='store_true', help='Sync straight into --out as a local-directory bucket')
+    parser.add_argument('--now', default=DEFAULT_NOW, help="Pinned UTC time, or 'real' for the system clock")
+    parser.add_argument('--quiet', action='store_true', help="Hide the sync's own log")
+    parser.add_argument('--profile', nargs='?', const='handler', metavar='STAGES',
+                        help='cProfile the whole run, or comma-separated stages (e.g. stream,forecast); '
+                             'written to profiles/ in the bucket')
+    args = parser.parse_args()
+
+    tabs = load_tabs(args.tabs) if args.tabs else tabs_from_exports(args.exports)
+    print(f"📄 Tabs: {', '.join(f'{name} ({len(rows)} rows)' for name, rows in tabs.items())}")
+
+    if args.in_place:
+        if not args.out:
+            parser.error('--in-place needs --out')
+        s3 = LocalDirS3(args.out)
+    else:
+        s3 = InMemoryS3(seed_dir=args.seed)
+
+    started = time.perf_counter()
+    event = {'profile': args.profile} if args.profile else None
+    body, s3, _ = run_sync(tabs, s3=s3, now=None if args.now == 'real' else args.now, event=event,
+                           quiet=args.quiet)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n🏁 {body['message']} (status {body['statusCode']}) in {elapsed:.1f}s")
+    for error in body.get('errors', []):
+        print(f"   ❌ {error}")
+    for key in body.get('profiles', []):
+        print(f"   🔬 {key}")
+    if args.out and not args.in_place:
+        count = s3.dump_dir(args.out)
+        print(f"   💾 {count} objects written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
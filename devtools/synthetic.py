@@ -0,0 +1,387 @@
+"""
+Synthetic portfolio generator for scale testing.
+
+Produces the five sheet tabs in the shape the sync and the loaders see in
+production, at any size:
+
+- Traffic Monthly / DR / RD: 'Last update ...' banner in A1, Website in
+  column B, four more metadata columns, one 'Mon D - YYYY' column per date
+  and (traffic) a second '_1'-suffixed block with the Ahrefs series
+- Traffic Average: banner and metadata rows above the Website header row
+- Revenue: 'Mon YYYY' columns with '$1,234.56', '-' and 'x' cells, future
+  months pre-created, Total/Count columns and an 'Unmatched Payments' row
+
+Every domain follows a smooth traffic model (level, growth, seasonality,
+portfolio-wide core-update shocks) with daily noise and gaps; revenue is an
+RPM on the same model, so traffic and revenue correlate like the real data.
+Rows are generated in numpy chunks and streamed to disk, so 10k domains x
+1,500 dates never holds the whole sheet in memory.
+
+With --archived N the oldest N date columns are dropped from the sheet tabs
+but kept in the bucket snapshot, like columns archived out of Sheets that
+survive in S3 through the sync's history merge.
+
+The analysis scripts only look at the sites in their TOP_250_SITES list;
+--top-sites run_analysis.py gives the highest-revenue synthetic domains those
+names (in list order), so the bucket exports can be analysed too.
+
+Usage:
+    python -m devtools.synthetic --domains 10000 --dates 1500 --archived 200 --top-sites run_analysis.py --out ./synth
+    python -m devtools.sync_harness --tabs ./synth/tabs --seed ./synth/bucket --out ./synth/after
+    (cd synth/bucket && python ../../run_analysis.py)   # loaders read the bucket exports
+"""
+
+import os
+import ast
+import csv
+import time
+import argparse
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from devtools.sync_harness import DEFAULT_NOW
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Tab -> bucket file, as in the sync's S3_FILES
+TAB_FILES = {
+    'Traffic Monthly': 'traffic-data.csv',
+    'Traffic Average': 'internal-average-traffic.csv',
+    'DR': 'DR History.csv',
+    'RD': 'RD History.csv',
+    'Revenue': 'revenue-history.csv',
+}
+HISTORY_TABS = ('Traffic Monthly', 'Traffic Average', 'DR')  # merged with S3 history by the sync
+DAILY_TABS = ('Traffic Monthly', 'Traffic Average', 'DR', 'RD')
+
+CHUNK_ROWS = 500
+MISSING_RATE = 0.08          # blank traffic cells
+SPARSE_EVERY = 7             # DR/RD are only checked weekly
+CORE_UPDATES = 4             # portfolio-wide ranking shocks over the date range
+AHREFS_BIAS = (0.3, 1.2)     # Ahrefs estimate as a fraction of internal traffic
+
+_WORDS = ('better', 'this', 'world', 'mom', 'found', 'tech', 'home', 'decor', 'advice', 'famous',
+          'parent', 'ing', 'lync', 'conf', 'rip', 'roar', 'health', 'daily', 'gadget', 'guide',
+          'travel', 'money', 'pet', 'garden', 'game', 'news', 'hub', 'zone', 'life', 'style',
+          'smart', 'fit', 'chef', 'auto', 'crypto', 'fashion', 'review', 'insider', 'times', 'buzz')
+_TLDS = ('.com', '.com', '.com', '.net', '.org', '.co', '.io', '.co.uk')
+_NICHES = ('General', 'Health', 'Business', 'Tech', 'Gaming', 'Mom Blog', 'Finance', 'Home', 'Travel', 'Pets')
+_AGENTS = ('Mark', 'Bought - Mohit', 'Purchased Domain', 'Expired - DR Boosting', 'Expired - Vaibhav',
+           'Bought - 1Authority', '1Authority', 'Bought - Auction', '')
+
+
+def _month_start(d):
+    return date(d.year, d.month, 1)
+
+
+def _add_months(d, n):
+    month = d.month - 1 + n
+    return date(d.year + month // 12, month % 12 + 1, 1)
+
+
+def daily_header(d):
+    return f"{MONTH_NAMES[d.month - 1]} {d.day} - {d.year}"
+
+
+def monthly_header(d):
+    return f"{MONTH_NAMES[d.month - 1]} {d.year}"
+
+
+def format_currency(value):
+    return f"${value:,.2f}"
+
+
+def load_top_sites(script_path):
+    """TOP_250_SITES of an analysis script, read without running it."""
+    with open(script_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=script_path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'TOP_250_SITES' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"No TOP_250_SITES list in {script_path}")
+
+
+class PortfolioSpec:
+    """
+    Shape and per-domain model parameters of one synthetic portfolio.
+
+    Args:
+        n_domains: Rows per tab
+        n_dates: Daily date columns per block (ending the day before `now`)
+        now: Sheet 'today' (ISO string or datetime; defaults to the harness clock)
+        revenue_months_before: Revenue history months before the first traffic date
+        future_months: Empty revenue month columns after the current month
+        step_days: Days between date columns
+        seed: RNG seed; the same arguments always give the same tabs
+        site_names: Names for the highest expected-revenue domains, best first
+            (e.g. load_top_sites('run_analysis.py')); the rest keep generated names
+    """
+
+    def __init__(self, n_domains=2300, n_dates=560, now=DEFAULT_NOW, revenue_months_before=24,
+                 future_months=11, step_days=1, seed=7, site_names=None):
+        self.now = datetime.fromisoformat(now) if isinstance(now, str) else now
+        self.n_domains = n_domains
+        self.seed = seed
+        last = self.now.date() - timedelta(days=1)
+        self.dates = [last - timedelta(days=step_days * i) for i in range(n_dates)][::-1]
+        first_month = _add_months(_month_start(self.dates[0]), -revenue_months_before)
+        current = _month_start(self.now.date())
+        self.months = []
+        month = first_month
+        while month <= _add_months(current, future_months):
+            self.months.append(month)
+            month = _add_months(month, 1)
+        self.current_month = current
+
+        rng = np.random.default_rng(seed)
+        self.domains = self._domain_names(rng, n_domains)
+        self.base = rng.normal(7.5, 1.6, n_domains)             # log traffic level
+        self.growth = rng.normal(0.05, 0.35, n_domains)         # log change per year
+        self.season_amp = rng.uniform(0.0, 0.35, n_domains)
+        self.season_phase = rng.uniform(0, 2 * np.pi, n_domains)
+        self.rpm = np.exp(rng.normal(np.log(25), 0.8, n_domains))  # $ per 1k visits
+        self.dr0 = rng.uniform(5, 70, n_domains)
+        self.rd0 = np.exp(rng.normal(5.5, 1.2, n_domains))
+        self.ahrefs_bias = rng.uniform(*AHREFS_BIAS, n_domains)
+
+        # Lifecycle: some domains go live after the first date, some die before the end
+        span = (self.dates[-1] - self.months[0]).days
+        self.live = np.where(rng.random(n_domains) < 0.4, rng.uniform(0, span, n_domains), 0.0)
+        self.dead = np.where(rng.random(n_domains) < 0.1, rng.uniform(span * 0.5, span, n_domains), np.inf)
+
+        self.update_days = np.sort(rng.uniform(0, span, CORE_UPDATES))
+        self.update_effect = rng.normal(0, 0.35, (n_domains, CORE_UPDATES))
+        self.niches = [', '.join(rng.choice(_NICHES, rng.integers(1, 4), replace=False)) for _ in range(n_domains)]
+        self.agents = [_AGENTS[i] for i in rng.integers(0, len(_AGENTS), n_domains)]
+        self.prices = [format_currency(p) for p in np.round(np.exp(rng.normal(7.5, 1.0, n_domains)), -2)]
+        if site_names:
+            self._rename_top(site_names)
+
+    def _rename_top(self, site_names):
+        """Give the domains with the highest traffic level x RPM the given names, in order."""
+        ranked = np.argsort(-(self.base + np.log(self.rpm)), kind='stable')
+        taken = {name.lower() for name in site_names}
+        for i, row in enumerate(ranked):
+            if i < len(site_names):
+                self.domains[row] = site_names[i]
+            elif self.domains[row].lower() in taken:
+                self.domains[row] = f"synthetic{row}{_TLDS[0]}"
+
+    @staticmethod
+    def _domain_names(rng, n):
+        names = []
+        seen = set()
+        while len(names) < n:
+            words = rng.choice(_WORDS, rng.integers(2, 4))
+            name = ''.join(words) + _TLDS[rng.integers(0, len(_TLDS))]
+            if name in seen:
+                name = f"{''.join(words)}{len(names)}{_TLDS[0]}"
+            seen.add(name)
+            names.append(name)
+        return names
+
+    def day_offsets(self, days):
+        """Days since the first revenue month for a list of dates."""
+        origin = self.months[0]
+        return np.array([(d - origin).days for d in days], dtype=float)
+
+    def log_level(self, rows, t_days):
+        """Smooth log traffic for domains `rows` at day offsets `t_days` -> (len(rows), len(t_days))."""
+        years = t_days[None, :] / 365.25
+        level = (self.base[rows, None] + self.growth[rows, None] * years
+                 + self.season_amp[rows, None] * np.sin(2 * np.pi * years + self.season_phase[rows, None]))
+        for k, day in enumerate(self.update_days):
+            level += self.update_effect[rows, k, None] * (t_days[None, :] >= day)
+        return level
+
+    def alive(self, rows, t_days):
+        return (t_days[None, :] >= self.live[rows, None]) & (t_days[None, :] < self.dead[rows, None])
+
+    def banner(self):
+        stamp = f"{self.now.month}/{self.now.day}/{self.now.year} {self.now.strftime('%I:%M:%S %p').lstrip('0')} AEDT"
+        return f"Last update {stamp}"
+
+
+def _chunks(n):
+    for lo in range(0, n, CHUNK_ROWS):
+        yield np.arange(lo, min(lo + CHUNK_ROWS, n))
+
+
+def _cells(values, present, thousands=True):
+    """Integer matrix -> list of string rows, '' where not present."""
+    out = []
+    for vals, mask in zip(values.tolist(), present.tolist()):
+        if thousands:
+            out.append([f"{v:,}" if m else '' for v, m in zip(vals, mask)])
+        else:
+            out.append([str(v) if m else '' for v, m in zip(vals, mask)])
+    return out
+
+
+def _daily_rows(spec, tab, dates):
+    """Data rows of one daily tab for the given date columns."""
+    t_days = spec.day_offsets(dates)
+    sparse = np.arange(len(dates)) % SPARSE_EVERY == (len(dates) - 1) % SPARSE_EVERY
+    for rows in _chunks(spec.n_domains):
+        rng = np.random.default_rng([spec.seed, DAILY_TABS.index(tab), int(rows[0])])
+        alive = spec.alive(rows, t_days)
+        if tab in ('Traffic Monthly', 'Traffic Average'):
+            log_level = spec.log_level(rows, t_days)
+            if tab == 'Traffic Monthly':
+                noisy = log_level + rng.normal(0, 0.15, log_level.shape)
+                present = alive & (rng.random(log_level.shape) >= MISSING_RATE)
+            else:
+                noisy = log_level + rng.normal(0, 0.04, log_level.shape)  # already averaged
+                present = alive
+            values = np.maximum(np.expm1(noisy), 0).round().astype(np.int64)
+            blocks = [_cells(values, present)]
+            if tab == 'Traffic Monthly':
+                ahrefs = (values * spec.ahrefs_bias[rows, None] * rng.lognormal(0, 0.2, values.shape)).round().astype(np.int64)
+                blocks.append(_cells(ahrefs, present & (rng.random(values.shape) >= 0.3)))
+        elif tab == 'DR':
+            years = t_days[None, :] / 365.25
+            values = np.clip(spec.dr0[rows, None] + 3 * years + rng.normal(0, 1, (len(rows), len(dates))), 0, 100).round().astype(np.int64)
+            blocks = [_cells(values, alive & sparse[None, :], thousands=False)]
+        else:
+            years = t_days[None, :] / 365.25
+            values = (spec.rd0[rows, None] * np.exp(0.25 * years) * rng.lognormal(0, 0.03, (len(rows), len(dates)))).round().astype(np.int64)
+            blocks = [_cells(values, alive & sparse[None, :])]
+
+        for i, row in enumerate(rows):
+            lead = [spec.agents[row], spec.domains[row], spec.niches[row], 'Live', '', '']
+            yield lead + [cell for block in blocks for cell in block[i]]
+
+
+def _revenue_rows(spec):
+    """Data rows of the Revenue tab (months, then Total and Count)."""
+    starts = [(m - spec.months[0]).days for m in spec.months]
+    mids = spec.day_offsets([m + timedelta(days=14) for m in spec.months])
+    days_in = np.array([(_add_months(m, 1) - m).days for m in spec.months], dtype=float)
+    elapsed = np.array([min(max((spec.now.date() - m).days + 1, 0), d) for m, d in zip(spec.months, days_in)])
+    for rows in _chunks(spec.n_domains):
+        rng = np.random.default_rng([spec.seed, len(DAILY_TABS), int(rows[0])])
+        monthly_visits = np.expm1(spec.log_level(rows, mids)) * days_in[None, :]
+        revenue = monthly_visits / 1000 * spec.rpm[rows, None] * rng.lognormal(0, 0.35, monthly_visits.shape)
+        revenue *= (elapsed / days_in)[None, :]                      # partial current month, 0 for future
+        revenue *= spec.alive(rows, np.array(starts, dtype=float))   # no revenue before live / after sale
+        revenue *= rng.random(revenue.shape) >= 0.05                 # months without a payout
+        revenue = np.round(revenue, 2)
+        marker = rng.random(revenue.shape)
+
+        for i, row in enumerate(rows):
+            cells = []
+            for value, r in zip(revenue[i].tolist(), marker[i].tolist()):
+                if value > 0:
+                    cells.append(format_currency(value))
+                else:
+                    cells.append('x' if r < 0.002 else '-')
+            live_day = spec.live[row]
+            live = 'Jan 2022 or earlier' if live_day == 0 else monthly_header(spec.months[0] + timedelta(days=int(live_day)))
+            yield ([spec.agents[row], spec.prices[row], live, spec.domains[row], spec.niches[row]] + cells
+                   + [format_currency(revenue[i].sum()), str(int((revenue[i] > 0).sum()))])
+
+    unmatched = np.round(np.abs(np.random.default_rng(spec.seed).normal(300, 200, len(spec.months))), 2)
+    unmatched[np.array([m > spec.current_month for m in spec.months])] = 0
+    yield (['', '', '', 'Unmatched Payments', ''] + [format_currency(v) if v > 0 else '-' for v in unmatched]
+           + [format_currency(unmatched.sum()), ''])
+
+
+def iter_tab(spec, tab, archived=0):
+    """
+    Rows of one tab as the Sheets API returns them (header row first).
+
+    Args:
+        spec: PortfolioSpec
+        tab: One of TAB_FILES
+        archived: Oldest date columns to leave out (already moved out of the sheet)
+    """
+    if tab == 'Revenue':
+        yield ([f"{spec.now.month}/{spec.now.day}/{spec.now.year % 100}", 'Purchase Price', 'Live Date', 'Website', 'Niche']
+               + [monthly_header(m) for m in spec.months] + ['Total', 'Count'])
+        yield from _revenue_rows(spec)
+        return
+
+    dates = spec.dates[archived:]
+    headers = [daily_header(d) for d in dates]
+    if tab == 'Traffic Monthly':
+        headers += [h + '_1' for h in headers]
+    lead = ['Website', 'Niche', 'Status', 'Live Date', 'Notes']
+    if tab == 'Traffic Average':
+        yield [spec.banner()]
+        yield ['Rolling 30 day average of internal traffic']
+        yield []
+        yield ['Agent'] + lead + headers
+    else:
+        yield [spec.banner()] + lead + headers
+    yield from _daily_rows(spec, tab, dates)
+
+
+def generate_tabs(spec, archived=0, tabs=None):
+    """All (or the given) tabs in memory, for FakeSheetsService - keep small specs."""
+    return {tab: list(iter_tab(spec, tab, archived)) for tab in (tabs or TAB_FILES)}
+
+
+def write_csv(path, rows):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_portfolio(spec, out_dir, archived=0, tabs=None):
+    """
+    Stream the portfolio to disk.
+
+    Writes out_dir/tabs/<tab>.csv (the sheet today, for the sync harness) and
+    out_dir/bucket/<file> (the bucket before this sync: full history for the
+    merged tabs, metadata rows above the Traffic Average header stripped, as
+    the sync leaves them; also what the analysis loaders read).
+
+    Returns:
+        Dict of written path -> (rows, bytes, seconds)
+    """
+    written = {}
+    for tab in tabs or TAB_FILES:
+        targets = [(os.path.join(out_dir, 'tabs', f"{tab}.csv"), archived, False)]
+        targets.append((os.path.join(out_dir, 'bucket', TAB_FILES[tab]), 0 if tab in HISTORY_TABS else archived,
+                        tab == 'Traffic Average'))
+        for path, drop, strip_meta in targets:
+            started = time.perf_counter()
+            rows = iter_tab(spec, tab, drop)
+            if strip_meta:
+                rows = (row for i, row in enumerate(rows) if i >= 3)
+            count = write_csv(path, rows)
+            written[path] = (count, os.path.getsize(path), time.perf_counter() - started)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic portfolio at any scale')
+    parser.add_argument('--domains', type=int, default=2300)
+    parser.add_argument('--dates', type=int, default=560, help='Daily date columns per block')
+    parser.add_argument('--archived', type=int, default=0, help='Oldest date columns kept only in the bucket')
+    parser.add_argument('--tab', action='append', choices=list(TAB_FILES), help='Only these tabs (repeatable)')
+    parser.add_argument('--now', default=DEFAULT_NOW, help='Sheet "today" (defaults to the harness clock)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--top-sites', metavar='SCRIPT',
+                        help="Name the highest-revenue domains after SCRIPT's TOP_250_SITES (e.g. run_analysis.py)")
+    parser.add_argument('--out', default='synthetic-portfolio')
+    args = parser.parse_args()
+
+    site_names = load_top_sites(args.top_sites) if args.top_sites else None
+    spec = PortfolioSpec(args.domains, args.dates, now=args.now, seed=args.seed, site_names=site_names)
+    print(f"🧪 {args.domains:,} domains x {args.dates:,} dates "
+          f"({spec.dates[0]} to {spec.dates[-1]}), {len(spec.months)} revenue months")
+    written = write_portfolio(spec, args.out, archived=args.archived, tabs=args.tab)
+    for path, (rows, size, seconds) in written.items():
+        print(f"   ✓ {path}: {rows:,} rows, {size / 1e6:.1f} MB ({seconds:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
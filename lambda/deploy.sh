@@ -14,8 +14,11 @@ REGION="ap-southeast-2"
 ROLE_NAME="dashboard-sync-lambda-role"
 RUNTIME="python3.11"
 HANDLER="sync-dashboard.lambda_handler"
-TIMEOUT=120
-MEMORY=256
+# Every sync also builds the series pyramid, the matrix store and the numpy
+# forecasts; Lambda CPU scales with memory, so 256MB ran out of time on larger
+# portfolios. Right-size from max_rss_mb / memory_limit_mb in the sync log.
+TIMEOUT=300
+MEMORY=1024
 
 echo "=== Dashboard Sync Lambda Deployment ==="
 
@@ -32,12 +35,17 @@ echo "Creating deployment package..."
 rm -rf package
 mkdir -p package
 
-# Install dependencies
+# Install dependencies as Linux wheels for the Lambda runtime, whatever this
+# machine is (numpy is compiled; a macOS wheel would fail to import on Lambda)
 echo "Installing dependencies..."
-pip install -r requirements.txt -t package/ --quiet
+pip install -r requirements.txt -t package/ --quiet \
+    --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.11
 
-# Copy Lambda function
+# Copy Lambda function (and the numpy forecast and stability engines it imports).
+# They live in the analysis tree, so run this from a full checkout.
 cp sync-dashboard.py package/
+cp ../analysis/forecast.py package/forecast.py
+cp ../analysis/stability.py package/stability.py
 
 # Create zip file
 echo "Creating zip file..."
@@ -70,6 +78,14 @@ else
         --zip-file fileb://deployment.zip \
         --region $REGION
     
+    # Keep the timeout and memory in step with this script
+    aws lambda wait function-updated --function-name $FUNCTION_NAME --region $REGION
+    aws lambda update-function-configuration \
+        --function-name $FUNCTION_NAME \
+        --timeout $TIMEOUT \
+        --memory-size $MEMORY \
+        --region $REGION > /dev/null
+    
     echo "Function updated successfully!"
 fi
 
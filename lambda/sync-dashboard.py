@@ -13,15 +13,30 @@ Sheets synced:
 """
 
 import os
+import csv
 import json
 import io
+import codecs
+import hashlib
+import itertools
+import time
 import base64
+import random
+import resource
+import threading
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from urllib.parse import quote
 
 import boto3
 import requests
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from requests.adapters import HTTPAdapter
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from google.auth.transport.requests import AuthorizedSession
 
 # Configuration from environment variables
 GOOGLE_SERVICE_ACCOUNT_KEY = os.environ.get('GOOGLE_SERVICE_ACCOUNT_KEY', '')
@@ -33,6 +48,24 @@ SLACK_WEBHOOK_URL = os.environ.get('SLACK_WEBHOOK_URL', '')
 TRAFFIC_DR_SHEET_ID = '1Vcyl9hrxdKUfKufHdM9csZjEQcS0rt3tLRyNR1f4uR8'
 REVENUE_SHEET_ID = '1a4XNaxHJ7U7pJhfraGRDr9qEVsTGdCAUgx_QLJoLQXA'
 
+# Sheets API v4 over one pooled keep-alive session (see SheetsSession).
+# SHEETS_VALUE_RENDER=UNFORMATTED_VALUE returns numbers as JSON numbers instead of
+# display strings like "$1,234.56" (dates stay formatted strings either way); it
+# changes the CSV text (1234.56 rather than $1,234.56), so it is opt-in.
+SHEETS_API_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+SHEETS_VALUE_RENDER = os.environ.get('SHEETS_VALUE_RENDER', 'FORMATTED_VALUE')
+SHEETS_TIMEOUT = (10, 90)  # connect, read seconds
+
+# Column-window reads for history-preserving tabs (see read_sheet_window): re-read
+# the non-date columns plus the last SHEETS_WINDOW_DATES dates and fill older
+# columns from the S3 copy; a full read still happens every FULL_READ_HOURS to
+# pick up edits to old cells. Per-tab watermarks live in S3_STATE_FILE.
+S3_STATE_FILE = 'sync-state.json'
+SHEETS_WINDOW_DATES = 14
+FULL_READ_HOURS = 24
+HEADER_SCAN_ROWS = 10  # rows read to find the header (Traffic Average has metadata rows)
+UNREAD_CELL = object()  # a cell the window skipped: the S3 copy's value stands
+
 # Tab names
 TRAFFIC_MONTHLY_TAB = 'Traffic Monthly'
 TRAFFIC_AVERAGE_TAB = 'Traffic Average'
@@ -57,6 +90,600 @@ S3_PRIORITY_FILES = {
     'rd': 'RD History-priority.csv'
 }
 
+# Downsampled per-domain series for long-range charts (priority domains only).
+# The daily level is the priority CSVs themselves; this file holds the coarser levels.
+S3_PYRAMID_FILE = 'series-pyramid.json'
+PYRAMID_LEVELS = ('weekly', 'monthly')
+
+# Per-domain monthly forecasts (all domains, traffic monthly + revenue), built by the
+# numpy engine in analysis/forecast.py which deploy.sh ships as forecast.py
+S3_FORECAST_FILE = 'forecast.json'
+FORECAST_HORIZON = 6
+
+# Per-domain traffic stability (CV, trend, quadrant) over the forecast's monthly
+# traffic matrix, built by analysis/stability.py which deploy.sh ships as stability.py
+S3_STABILITY_FILE = 'stability.json'
+
+# Binary domain x date matrices for the analysis tooling, one folder per S3_FILES key:
+# matrix/<key>/values.f32, missing.bits, domains.txt, dates.txt, meta.json
+S3_MATRIX_PREFIX = 'matrix/'
+MATRIX_FORMAT_VERSION = 1
+
+# Per-stage instrumentation (see span()): kept in the sync-log.json history and
+# printed as CloudWatch Embedded Metric Format lines. Every span records the
+# process RSS high-water mark; tracemalloc peaks per stage are opt-in
+# (SYNC_TRACE_MEMORY=1 or event {"trace_memory": true}) because tracing slows
+# the pure-Python merge down roughly tenfold.
+TRACE_MEMORY = os.environ.get('SYNC_TRACE_MEMORY', '0') == '1'
+METRICS_NAMESPACE = 'TrafficDashboard/Sync'
+perf_counter = time.perf_counter  # the offline harness pins it, like utcnow
+
+# Append-only run history: one JSONL object per run, partitioned by UTC day
+# (sync-history/date=YYYY-MM-DD/HH-MM-SSZ-<request id>.jsonl). Runs never read it
+# back; sync-log.json keeps a rolling summary of the last SUMMARY_HISTORY_RUNS
+# runs (without stage spans) for sync-status and the top of log.html, built from
+# the previous summary plus this run. Overlapping runs can drop each other from
+# the summary, never from the partitions (/api/data/sync-history reads those).
+S3_HISTORY_PREFIX = 'sync-history/'
+SUMMARY_HISTORY_RUNS = 20
+
+# Opt-in cProfile capture, uploaded under profiles/ as .pstats plus collapsed
+# stacks for flame graphs. SYNC_PROFILE=1 (or event {"profile": true}) profiles
+# the whole run; stage names (SYNC_PROFILE=stream,forecast or event
+# {"profile": ["stream", "forecast"]}) profile just those spans. Off, cProfile
+# is never imported.
+SYNC_PROFILE = os.environ.get('SYNC_PROFILE', '')
+S3_PROFILE_PREFIX = 'profiles/'
+
+# Shared request scheduler (see RequestScheduler): a token bucket per API sized
+# to its quota, retries with jittered exponential backoff on throttling and 5xx
+# (the SDK-level retries are off so attempts are counted once), and hedged Sheets
+# reads - once a read has been out SHEETS_HEDGE_SECONDS an identical second one
+# goes out and whichever answers first wins (0 turns hedging off). The Sheets
+# default is the per-user read quota of the service account.
+SHEETS_READS_PER_MINUTE = int(os.environ.get('SHEETS_READS_PER_MINUTE', '60'))
+S3_REQUESTS_PER_SECOND = int(os.environ.get('S3_REQUESTS_PER_SECOND', '100'))
+SHEETS_HEDGE_SECONDS = float(os.environ.get('SHEETS_HEDGE_SECONDS', '20'))
+REQUEST_MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_CODES = ('SlowDown', 'Throttling', 'ThrottlingException', 'RequestLimitExceeded',
+                  'TooManyRequestsException', 'RATE_LIMIT_EXCEEDED')
+
+# Streamed tab uploads (see stream_tab_to_s3): history-preserving tabs are merged
+# one domain row at a time against the S3 copy as it downloads (read in
+# HISTORY_READ_BYTES chunks; the copy is written in domain order), and each row
+# is serialized once into the CSV upload, the priority CSV and the matrix store,
+# so no merged table, S3 copy, CSV string or encoded body of a whole file is
+# held. CSVs go up as S3 multipart uploads in UPLOAD_PART_BYTES parts (5 MiB is
+# the S3 minimum for all but the last part).
+HISTORY_READ_BYTES = 1024 * 1024
+UPLOAD_PART_BYTES = 5 * 1024 * 1024
+
+_timings = None  # StageTimings of the sync in progress
+_scheduler = None  # RequestScheduler of the sync in progress
+
+
+def utcnow():
+    """Current UTC time (the offline harness in devtools/sync_harness.py pins it)."""
+    return datetime.utcnow()
+
+
+class StageTimings:
+    """
+    Wall time, memory and data volume per stage of one sync run.
+
+    Spans with the same stage and tab add up into one record (all uploads of a
+    tab, say). Spans nest: an outer span's time and peak include the spans
+    inside it, and inner spans inherit its tab. Memory is the process RSS
+    high-water mark when the span ends (the stage where it jumps is the one to
+    look at) and, with trace_memory, the tracemalloc peak during the span.
+    """
+
+    def __init__(self, trace_memory=False, profiler=None, profile_stages=()):
+        self.trace_memory = trace_memory
+        self.profiler = profiler  # cProfile.Profile switched on inside profile_stages
+        self.profile_stages = set(profile_stages)
+        self.records = {}  # (stage, tab) -> record, in first-seen order
+        self._stack = []
+        self._profiling = 0  # open spans of a profiled stage
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def span(self, stage, tab=None, **counts):
+        if tab is None and self._stack:
+            tab = self._stack[-1]['tab']
+        frame = {'tab': tab, 'peak': 0, 'counts': dict(counts)}
+        if self.trace_memory:
+            # reset_peak() is global, so bank the outer span's peak first
+            if self._stack:
+                outer = self._stack[-1]
+                outer['peak'] = max(outer['peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        profiled = stage in self.profile_stages
+        if profiled:
+            self._profiling += 1
+            if self._profiling == 1:
+                self.profiler.enable()
+        started = perf_counter()
+        try:
+            yield frame['counts']
+        finally:
+            elapsed = perf_counter() - started
+            if profiled:
+                self._profiling -= 1
+                if self._profiling == 0:
+                    self.profiler.disable()
+            self._stack.pop()
+            if self.trace_memory:
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+            self._add(stage, tab, elapsed, frame['peak'], max_rss_mb(), frame['counts'])
+
+    def _add(self, stage, tab, elapsed, peak, rss, counts):
+        record = self.records.get((stage, tab))
+        if record is None:
+            record = {'stage': stage, 'tab': tab, 'calls': 0, 'seconds': 0.0, 'peak': 0, 'rss': None,
+                      'rows': 0, 'columns': 0, 'bytes_in': 0, 'bytes_out': 0}
+            self.records[(stage, tab)] = record
+        record['calls'] += 1
+        record['seconds'] += elapsed
+        record['peak'] = max(record['peak'], peak)
+        if rss is not None:
+            record['rss'] = max(record['rss'] or 0, rss)
+        for key in ('rows', 'columns'):
+            record[key] = max(record[key], counts.get(key) or 0)
+        for key in ('bytes_in', 'bytes_out'):
+            record[key] += counts.get(key) or 0
+
+    def summary(self):
+        """
+        Compact per-stage records for the sync log.
+
+        Returns:
+            List of {'stage', 'tab'?, 'calls', 'seconds', 'rss_mb'?, 'peak_mb'?,
+            'rows'?, 'columns'?, 'bytes_in'?, 'bytes_out'?} (zero counts left out)
+        """
+        stages = []
+        for record in self.records.values():
+            entry = {'stage': record['stage']}
+            if record['tab']:
+                entry['tab'] = record['tab']
+            entry['calls'] = record['calls']
+            entry['seconds'] = round(record['seconds'], 3)
+            if record['rss'] is not None:
+                entry['rss_mb'] = record['rss']
+            if self.trace_memory:
+                entry['peak_mb'] = round(record['peak'] / 1048576, 1)
+            for key in ('rows', 'columns', 'bytes_in', 'bytes_out'):
+                if record[key]:
+                    entry[key] = record[key]
+            stages.append(entry)
+        return stages
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def span(stage, tab=None, **counts):
+    """
+    Time a stage of the running sync.
+
+        with span('priority_domains', tab=REVENUE_TAB) as counts:
+            ...
+            counts['rows'] = len(priority_domains)
+
+    counts takes rows, columns, bytes_in and bytes_out. Outside a sync (or
+    in the analysis tooling importing these helpers) this records nothing.
+    """
+    if _timings is None:
+        return nullcontext(dict(counts))
+    return _timings.span(stage, tab, **counts)
+
+
+def profile_request(event):
+    """
+    What to profile this run, from event['profile'] or SYNC_PROFILE.
+
+    Returns:
+        None (off), 'handler' (the whole run) or a set of stage names
+    """
+    value = event.get('profile', SYNC_PROFILE)
+    if value is False or value in (None, '', '0', 'false'):
+        return None
+    if value is True or value in ('1', 'true', 'handler'):
+        return 'handler'
+    if isinstance(value, str):
+        value = value.split(',')
+    return {name.strip() for name in value if name.strip()} or None
+
+
+def collapsed_stacks(stats, min_us=100):
+    """
+    Collapsed-stack text ("outer;inner;leaf <microseconds>" per line) from
+    cProfile stats, for flamegraph.pl, speedscope or inferno.
+
+    cProfile keeps caller -> callee edges rather than whole stacks, so each
+    function's time is split across its callers in proportion to the time
+    spent under each of them. Stacks under min_us are dropped.
+    """
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    def label(func):
+        file_name, line, name = func
+        if file_name == '~':  # built-ins: "<method 'append' of 'list' objects>"
+            return name.replace(';', ',')
+        return f"{name} ({os.path.basename(file_name)}:{line})".replace(';', ',')
+
+    totals = {}
+
+    def walk(func, seconds, stack, on_stack):
+        _, _, own, cumulative, _ = stats[func]
+        share = seconds / cumulative if cumulative else 0
+        stack = stack + [label(func)]
+        own_us = int(own * share * 1e6)
+        if own_us >= min_us:
+            key = ';'.join(stack)
+            totals[key] = totals.get(key, 0) + own_us
+        on_stack.add(func)
+        for child, child_seconds in children.get(func, ()):
+            if child not in on_stack and child_seconds * share * 1e6 >= min_us:
+                walk(child, child_seconds * share, stack, on_stack)
+        on_stack.discard(func)
+
+    for func, (_, _, _, cumulative, callers) in stats.items():
+        if not any(caller in stats for caller in callers):
+            walk(func, cumulative, [], set())
+
+    return '\n'.join(f"{stack} {us}" for stack, us in sorted(totals.items())) + '\n'
+
+
+def upload_profile(s3_client, profiler, name):
+    """
+    Upload profiles/<name>.pstats (load with pstats.Stats) and
+    profiles/<name>.collapsed.txt.
+
+    Returns:
+        List of uploaded keys (empty if nothing was profiled)
+    """
+    import marshal
+
+    profiler.create_stats()
+    if not profiler.stats:
+        print(f"Profile {name}: no calls recorded, nothing uploaded")
+        return []
+
+    keys = [f"{S3_PROFILE_PREFIX}{name}.pstats", f"{S3_PROFILE_PREFIX}{name}.collapsed.txt"]
+    upload_to_s3(s3_client, keys[0], marshal.dumps(profiler.stats),
+                 content_type='application/octet-stream')
+    upload_to_s3(s3_client, keys[1], collapsed_stacks(profiler.stats), content_type='text/plain')
+    return keys
+
+
+def max_rss_mb():
+    """Process memory high-water mark in MB (what the Lambda memory setting caps; pinned to None offline)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def print_stage_metrics(stages, timestamp):
+    """
+    Print one CloudWatch Embedded Metric Format line per stage record, which
+    CloudWatch Logs turns into metrics under METRICS_NAMESPACE (by Stage, and
+    by Stage and Tab) without any metric filters.
+    """
+    units = {'seconds': ('Seconds', 'Seconds'), 'rss_mb': ('MaxRSS', 'Megabytes'),
+             'peak_mb': ('PeakMemory', 'Megabytes'),
+             'bytes_in': ('BytesIn', 'Bytes'), 'bytes_out': ('BytesOut', 'Bytes'),
+             'rows': ('Rows', 'Count')}
+    for entry in stages:
+        line = {'Stage': entry['stage']}
+        metrics = []
+        for key, (name, unit) in units.items():
+            if key in entry:
+                line[name] = entry[key]
+                metrics.append({'Name': name, 'Unit': unit})
+        dimensions = [['Stage']]
+        if entry.get('tab'):
+            line['Tab'] = entry['tab']
+            dimensions = [['Stage', 'Tab']]
+        line['_aws'] = {
+            'Timestamp': timestamp,
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': dimensions,
+                'Metrics': metrics
+            }]
+        }
+        print(json.dumps(line, separators=(',', ':')))
+
+
+class TokenBucket:
+    """
+    rate tokens per second up to burst; take() blocks until one is free.
+
+    Sized as (quota / 60, quota) a bucket never goes over a per-minute quota
+    however the calls bunch up.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, sleep=time.sleep):
+        """Take a token, sleeping until one is free. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            sleep(delay)
+            waited += delay
+
+    def try_take(self):
+        """Take a token if one is free right now."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def classify_error(error):
+    """
+    Whether a failed request is worth retrying.
+
+    Understands requests errors (the Sheets session) and botocore errors (S3);
+    anything else - a missing key, bad credentials, a bug - is not retried.
+
+    Returns:
+        (retryable, throttled, retry_after seconds or None)
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout,
+                          requests.exceptions.ChunkedEncodingError,
+                          BotoConnectionError, HTTPClientError)):
+        return True, False, None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        retry_after = error.response.headers.get('Retry-After', '')
+        retry_after = float(retry_after) if retry_after.isdigit() else None
+        return status in RETRY_STATUSES, status == 429, retry_after
+    if isinstance(error, ClientError):
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        throttled = status == 429 or error.response.get('Error', {}).get('Code') in THROTTLE_CODES
+        return throttled or status in RETRY_STATUSES, throttled, None
+    return False, False, None
+
+
+class RequestScheduler:
+    """
+    Every Sheets and S3 request of a sync run goes through call().
+
+    Each API has a token bucket sized to its quota, so however many reads are
+    in flight the run stays under it instead of finding out from 429s. Failed
+    attempts that classify_error() calls transient are retried up to
+    max_retries times after a full-jitter exponential backoff (uniform between
+    0 and base * 2**attempt, capped, or the server's Retry-After), which keeps
+    concurrent retries from arriving in lockstep. Hedged calls get a second,
+    identical attempt once the first has been out hedge_after seconds - only
+    for idempotent reads, and only if the bucket has a token to spare.
+
+    Args:
+        limits: {api: (tokens per second, burst)}
+        hedge_after: {api: seconds} for the APIs whose reads may be hedged
+        sleep: time.sleep (the offline harness can pass a no-op)
+    """
+
+    def __init__(self, limits, hedge_after=None, max_retries=REQUEST_MAX_RETRIES,
+                 base_delay=BACKOFF_BASE_SECONDS, max_delay=BACKOFF_MAX_SECONDS, sleep=time.sleep):
+        self.buckets = {api: TokenBucket(rate, burst) for api, (rate, burst) in limits.items()}
+        self.hedge_after = {api: seconds for api, seconds in (hedge_after or {}).items() if seconds}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.stats = {api: {'requests': 0, 'attempts': 0, 'retries': 0, 'throttled': 0, 'failed': 0,
+                            'hedged': 0, 'hedge_wins': 0, 'wait_seconds': 0.0, 'backoff_seconds': 0.0}
+                      for api in limits}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _count(self, api, key, amount=1):
+        with self._lock:
+            self.stats[api][key] += amount
+
+    def call(self, api, fn, hedge=False):
+        """
+        Run fn() (one request) under api's bucket, retrying transient failures.
+
+        Returns:
+            fn()'s result; the last error is raised once retries run out
+        """
+        self._count(api, 'requests')
+        for attempt in range(self.max_retries + 1):
+            self._count(api, 'wait_seconds', self.buckets[api].take(self.sleep))
+            self._count(api, 'attempts')
+            try:
+                if hedge and api in self.hedge_after:
+                    return self._hedged(api, fn)
+                return fn()
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                if throttled:
+                    self._count(api, 'throttled')
+                if not retryable:
+                    raise  # the caller's business (NoSuchKey, auth, bad range)
+                if attempt == self.max_retries:
+                    self._count(api, 'failed')
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                if retry_after is not None:
+                    delay = min(self.max_delay, retry_after)
+                print(f"  {api} request failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                self._count(api, 'retries')
+                self._count(api, 'backoff_seconds', delay)
+                self.sleep(delay)
+
+    def _hedged(self, api, fn):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='hedge')
+        first = self._executor.submit(fn)
+        pending = {first}
+        done, _ = wait(pending, timeout=self.hedge_after[api])
+        if not done and self.buckets[api].try_take():
+            self._count(api, 'hedged')
+            self._count(api, 'attempts')
+            pending.add(self._executor.submit(fn))
+        # First success wins; a slower duplicate finishes in the background and is dropped
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._count(api, 'hedge_wins')
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def summary(self):
+        """Per-API counters for the sync log, seconds rounded and idle APIs left out."""
+        summary = {}
+        for api, stats in self.stats.items():
+            if stats['requests']:
+                summary[api] = {key: round(value, 3) if isinstance(value, float) else value
+                                for key, value in stats.items()}
+        return summary
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def scheduled(api, fn, hedge=False):
+    """
+    Run one request through the running sync's RequestScheduler (directly
+    outside a sync, e.g. in the analysis tooling).
+    """
+    if _scheduler is None:
+        return fn()
+    return _scheduler.call(api, fn, hedge=hedge)
+
+
+class ScheduledS3:
+    """
+    An S3 client whose API calls all go through scheduled('s3', ...).
+
+    Attributes that are not methods (client.exceptions) pass straight through.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or isinstance(attr, type):
+            return attr
+
+        def call(*args, **kwargs):
+            return scheduled('s3', lambda: attr(*args, **kwargs))
+        return call
+
+
+class _SheetsRequest:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _SheetsValues:
+    def __init__(self, session):
+        self._session = session
+
+    def get(self, spreadsheetId, range, **params):
+        return _SheetsRequest(lambda: self._session.get_values(spreadsheetId, range, **params))
+
+    def batchGet(self, spreadsheetId, ranges, **params):
+        return _SheetsRequest(lambda: self._session.get_values(spreadsheetId, None, ranges=ranges, **params))
+
+
+class _Spreadsheets:
+    def __init__(self, session):
+        self._session = session
+
+    def values(self):
+        return _SheetsValues(self._session)
+
+
+class SheetsSession:
+    """
+    The spreadsheets().values().get/batchGet(...).execute() subset of the
+    discovery-built Sheets client, over one requests session instead of httplib2.
+
+    The session keeps connections alive across tab reads (both spreadsheets live
+    on sheets.googleapis.com), asks for gzip - wide values responses shrink ~10x -
+    and refreshes the service account token itself. Each GET goes through the
+    running sync's RequestScheduler (quota, retries, hedging).
+
+    Args:
+        credentials: google.auth credentials with the spreadsheets.readonly scope
+    """
+
+    def __init__(self, credentials):
+        self.session = AuthorizedSession(credentials)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers['Accept-Encoding'] = 'gzip'
+
+    def spreadsheets(self):
+        return _Spreadsheets(self)
+
+    def get_values(self, spreadsheet_id, range_name, **params):
+        """
+        GET spreadsheets/{id}/values/{range}, or values:batchGet when range_name
+        is None (pass ranges=[...]); raises requests.HTTPError on API errors.
+        """
+        if range_name is None:
+            url = f"{SHEETS_API_URL}/{spreadsheet_id}/values:batchGet"
+        else:
+            url = f"{SHEETS_API_URL}/{spreadsheet_id}/values/{quote(range_name, safe='')}"
+        def fetch():
+            response = self.session.get(url, params=params, timeout=SHEETS_TIMEOUT)
+            response.raise_for_status()
+            # raw.tell() counts the (gzipped) bytes off the wire, len(content) the inflated ones
+            return response.content, getattr(response.raw, 'tell', lambda: 0)()
+
+        with span('sheets_fetch') as counts:
+            content, wire_bytes = scheduled('sheets', fetch, hedge=True)
+            counts['bytes_in'] = wire_bytes or len(content)
+        with span('sheets_parse'):
+            return json.loads(content)
+
 
 def get_google_sheets_service():
     """Initialize Google Sheets API service."""
@@ -70,28 +697,37 @@ def get_google_sheets_service():
             scopes=['https://www.googleapis.com/auth/spreadsheets.readonly']
         )
         
-        service = build('sheets', 'v4', credentials=credentials)
-        return service
+        return SheetsSession(credentials)
     except Exception as e:
         print(f"Error initializing Google Sheets service: {e}")
         raise
 
 
 def get_s3_client():
-    """Initialize S3 client."""
-    return boto3.client('s3')
+    """Initialize S3 client (retries are left to the RequestScheduler)."""
+    return boto3.client('s3', config=Config(retries={'mode': 'standard', 'max_attempts': 1}))
+
 
+def read_sheet_data(service, spreadsheet_id, tab_name, value_render=None):
+    """
+    Read all data from a Google Sheets tab.
 
-def read_sheet_data(service, spreadsheet_id, tab_name):
-    """Read all data from a Google Sheets tab."""
+    Args:
+        value_render: Sheets valueRenderOption (default: SHEETS_VALUE_RENDER)
+    """
     try:
-        # Get all data from the sheet
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=f"'{tab_name}'"
-        ).execute()
-        
-        values = result.get('values', [])
+        with span('sheets_read', tab=tab_name) as counts:
+            # Get all data from the sheet
+            result = service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{tab_name}'",
+                valueRenderOption=value_render or SHEETS_VALUE_RENDER,
+                dateTimeRenderOption='FORMATTED_STRING'
+            ).execute()
+            
+            values = result.get('values', [])
+            counts['rows'] = len(values)
+            counts['columns'] = max((len(row) for row in values), default=0)
         print(f"Read {len(values)} rows from {tab_name}")
         return values
     except Exception as e:
@@ -99,35 +735,148 @@ def read_sheet_data(service, spreadsheet_id, tab_name):
         raise
 
 
+def column_letter(idx):
+    """A1 column letters for a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ''
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+def column_date(col_name):
+    """
+    Date of a wide-format date column, ignoring a '_N' series suffix.
+
+    Returns:
+        (year, month, day) for 'Mon D - YYYY' / 'Mon YYYY' (day 1), else None
+    """
+    import re
+
+    months = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+              'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+    col = re.sub(r'_\d+$', '', str(col_name).strip()) if col_name else ''
+    match = re.match(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d+)\s*-\s*(\d{4})$', col, re.IGNORECASE)
+    if match:
+        return (int(match.group(3)), months[match.group(1).lower()], int(match.group(2)))
+    match = re.match(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})$', col, re.IGNORECASE)
+    if match:
+        return (int(match.group(2)), months[match.group(1).lower()], 1)
+    return None
+
+
+def read_sheet_window(service, spreadsheet_id, tab_name, stored_header, tab_state,
+                      find_date_header=False):
+    """
+    Read only the recent columns of a history-preserving tab.
+
+    Reads the top rows for the live header, then in one batchGet every non-date
+    column plus the columns of the last SHEETS_WINDOW_DATES dates and of any date
+    the S3 copy does not have yet (both series blocks of Traffic Monthly). The
+    older date columns of the data rows are UNREAD_CELL, which
+    merge_wide_format_rows() fills from the S3 copy as it streams past, so the
+    merged result looks like a full read's.
+
+    Args:
+        stored_header: Header row of the tab's S3 copy (None when the copy has
+                       no data rows)
+        tab_state: This tab's entry in sync-state.json (None before the first full read)
+
+    Returns:
+        2D array like read_sheet_data(), or None when a full read is needed (no
+        state, full read due, no S3 copy, or no saving)
+    """
+    last_full = (tab_state or {}).get('last_full_read')
+    if not stored_header or not last_full:
+        return None
+    if (utcnow() - datetime.fromisoformat(last_full.rstrip('Z'))).total_seconds() > FULL_READ_HOURS * 3600:
+        print(f"{tab_name}: full read due (last {last_full})")
+        return None
+
+    with span('sheets_read', tab=tab_name) as counts:
+        values_api = service.spreadsheets().values()
+        options = {'valueRenderOption': SHEETS_VALUE_RENDER, 'dateTimeRenderOption': 'FORMATTED_STRING'}
+        top = values_api.get(spreadsheetId=spreadsheet_id, range=f"'{tab_name}'!1:{HEADER_SCAN_ROWS}",
+                             **options).execute().get('values', [])
+        header_idx = find_header_row(top) if find_date_header else 0
+        if header_idx >= len(top):
+            return None
+        header = top[header_idx]
+
+        # Columns to read: non-date ones, the recent dates, and dates S3 lacks
+        stored = {str(col).strip().lower() for col in stored_header}
+        dates = {idx: column_date(col) for idx, col in enumerate(header)}
+        recent = set(sorted({d for d in dates.values() if d})[-SHEETS_WINDOW_DATES:])
+        needed = [idx for idx, col in enumerate(header)
+                  if dates[idx] is None or dates[idx] in recent or str(col).strip().lower() not in stored]
+        if len(needed) > len(header) // 2:
+            return None
+
+        # Contiguous runs of columns -> A1 ranges
+        runs = []
+        for idx in needed:
+            if runs and runs[-1][1] == idx - 1:
+                runs[-1][1] = idx
+            else:
+                runs.append([idx, idx])
+        ranges = [f"'{tab_name}'!{column_letter(a)}:{column_letter(b)}" for a, b in runs]
+        value_ranges = values_api.batchGet(spreadsheetId=spreadsheet_id, ranges=ranges,
+                                           **options).execute().get('valueRanges', [])
+        counts['rows'] = max((len(vr.get('values', [])) for vr in value_ranges), default=0)
+        counts['columns'] = len(needed)
+
+    # Lay the windows back out at their sheet positions; the skipped columns of
+    # the data rows come from the S3 copy during the merge
+    read_cols = set(needed)
+    unread = [UNREAD_CELL if idx not in read_cols else '' for idx in range(len(header))]
+    rows = [list(unread) if row_idx > header_idx else [''] * len(header)
+            for row_idx in range(counts['rows'])]
+    for (start, end), value_range in zip(runs, value_ranges):
+        for row_idx, row in enumerate(value_range.get('values', [])):
+            rows[row_idx][start:start + len(row[:end - start + 1])] = row[:end - start + 1]
+
+    rows[header_idx] = list(header)
+
+    # Trailing empty cells, as the API would have trimmed them
+    for row in rows:
+        while row and row[-1] == '':
+            row.pop()
+    print(f"Read {len(rows)} rows x {len(needed)}/{len(header)} columns from {tab_name} (column window)")
+    return rows
+
+
+def csv_line(row):
+    """One CSV line (no newline) for a row, quoting cells with commas, newlines or quotes."""
+    escaped_cells = []
+    for cell in row:
+        cell_str = str(cell) if cell is not None else ''
+        # If cell contains comma, newline, or quote, wrap in quotes
+        if ',' in cell_str or '\n' in cell_str or '"' in cell_str:
+            cell_str = '"' + cell_str.replace('"', '""') + '"'
+        escaped_cells.append(cell_str)
+    return ','.join(escaped_cells)
+
+
 def convert_to_csv(data):
     """Convert 2D array to CSV string."""
     if not data:
         return ""
     
-    lines = []
-    for row in data:
-        # Escape commas and quotes in cells
-        escaped_cells = []
-        for cell in row:
-            cell_str = str(cell) if cell is not None else ''
-            # If cell contains comma, newline, or quote, wrap in quotes
-            if ',' in cell_str or '\n' in cell_str or '"' in cell_str:
-                cell_str = '"' + cell_str.replace('"', '""') + '"'
-            escaped_cells.append(cell_str)
-        lines.append(','.join(escaped_cells))
-    
-    return '\n'.join(lines)
+    return '\n'.join(csv_line(row) for row in data)
 
 
-def upload_to_s3(s3_client, file_name, content):
+def upload_to_s3(s3_client, file_name, content, content_type='text/csv'):
     """Upload content to S3 bucket."""
     try:
-        s3_client.put_object(
-            Bucket=S3_BUCKET_NAME,
-            Key=file_name,
-            Body=content.encode('utf-8'),
-            ContentType='text/csv'
-        )
+        body = content if isinstance(content, bytes) else content.encode('utf-8')
+        with span('upload', bytes_out=len(body)):
+            s3_client.put_object(
+                Bucket=S3_BUCKET_NAME,
+                Key=file_name,
+                Body=body,
+                ContentType=content_type
+            )
         print(f"Uploaded {file_name} to S3 ({len(content)} bytes)")
         return True
     except Exception as e:
@@ -135,8 +884,97 @@ def upload_to_s3(s3_client, file_name, content):
         raise
 
 
+class S3UploadStream:
+    """
+    Write a CSV object to S3 one row at a time.
+
+    Rows are serialized into a buffer that goes up as a multipart upload part
+    each time it reaches part_bytes, so only one part is ever held; an object
+    smaller than one part is sent with a single put_object instead. The bytes
+    are exactly convert_to_csv(rows).encode('utf-8').
+
+        with S3UploadStream(s3_client, 'traffic-data.csv') as upload:
+            for row in rows:
+                upload.write_row(row)
+
+    Leaving the block on an exception aborts the upload, so a failed sync never
+    leaves a half-written object (S3 keeps the previous version).
+    """
+
+    def __init__(self, s3_client, file_name, content_type='text/csv', part_bytes=None):
+        self.s3_client = s3_client
+        self.file_name = file_name
+        self.content_type = content_type
+        self.part_bytes = part_bytes or UPLOAD_PART_BYTES
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+        self.rows = 0
+        self.bytes_out = 0
+
+    def write_row(self, row):
+        self.write_line(csv_line(row).encode('utf-8'))
+
+    def write_line(self, line):
+        """Write one already-serialized row (csv_line(row).encode('utf-8'))."""
+        if self.rows:
+            self.buffer += b'\n'
+        self.buffer += line
+        self.rows += 1
+        if len(self.buffer) >= self.part_bytes:
+            self._send_part()
+
+    def _send_part(self):
+        if self.upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=S3_BUCKET_NAME, Key=self.file_name, ContentType=self.content_type)
+            self.upload_id = response['UploadId']
+        number = len(self.parts) + 1
+        with span('upload', bytes_out=len(self.buffer)):
+            response = self.s3_client.upload_part(
+                Bucket=S3_BUCKET_NAME, Key=self.file_name, UploadId=self.upload_id,
+                PartNumber=number, Body=self.buffer)
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+        self.bytes_out += len(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self):
+        if self.upload_id is None:
+            self.bytes_out = len(self.buffer)
+            upload_to_s3(self.s3_client, self.file_name, bytes(self.buffer), content_type=self.content_type)
+            self.buffer = bytearray()
+            return
+        if self.buffer:
+            self._send_part()
+        self.s3_client.complete_multipart_upload(
+            Bucket=S3_BUCKET_NAME, Key=self.file_name, UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts})
+        print(f"Uploaded {self.file_name} to S3 ({self.bytes_out} bytes in {len(self.parts)} parts)")
+
+    def abort(self):
+        if self.upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=S3_BUCKET_NAME, Key=self.file_name, UploadId=self.upload_id)
+            except Exception as e:
+                print(f"Warning: could not abort the {self.file_name} upload: {e}")
+            self.upload_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
 def parse_currency(value):
-    """Parse currency string like '$1,234.56' to float."""
+    """Parse currency string like '$1,234.56' (or an unformatted number) to float."""
+    if isinstance(value, (int, float)):
+        return float(value)
     if not value or value == '-' or value == 'x' or str(value).strip() == '':
         return 0.0
     try:
@@ -162,7 +1000,6 @@ def compute_priority_domains(revenue_data):
         Set of priority domain names (lowercase)
     """
     import re
-    from datetime import datetime
     
     if not revenue_data or len(revenue_data) < 2:
         print("No revenue data for priority computation")
@@ -186,7 +1023,7 @@ def compute_priority_domains(revenue_data):
                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     month_to_num = {name: idx + 1 for idx, name in enumerate(month_names)}
     
-    now = datetime.utcnow()
+    now = utcnow()
     current_year = now.year
     current_month = now.month
     
@@ -284,62 +1121,595 @@ def compute_priority_domains(revenue_data):
     return priority_set
 
 
-def filter_csv_to_priority(csv_data, priority_domains, website_col_name='Website'):
+def filter_csv_to_priority(csv_data, priority_domains, website_col_name='Website'):
+    """
+    Filter CSV data to only include rows for priority domains.
+    
+    Args:
+        csv_data: 2D array with header row
+        priority_domains: Set of domain names (lowercase)
+        website_col_name: Name of the column containing domain names
+    
+    Returns:
+        Filtered 2D array with header and priority domain rows only
+    """
+    if not csv_data or len(csv_data) < 2:
+        return csv_data
+    
+    header = csv_data[0]
+    
+    # Find Website column
+    website_col = None
+    for idx, cell in enumerate(header):
+        if cell and str(cell).strip().lower() == website_col_name.lower():
+            website_col = idx
+            break
+    
+    if website_col is None:
+        print(f"Could not find {website_col_name} column, returning full data")
+        return csv_data
+    
+    # Filter rows
+    filtered = [header]
+    for row in csv_data[1:]:
+        if len(row) <= website_col:
+            continue
+        domain = str(row[website_col]).strip().lower() if row[website_col] else ''
+        if domain in priority_domains:
+            filtered.append(row)
+    
+    print(f"Filtered CSV: {len(csv_data)} rows -> {len(filtered)} rows (priority only)")
+    return filtered
+
+
+def find_date_columns(header, include_monthly=False):
+    """
+    Locate the Website column and the date columns of a wide-format header.
+
+    Only 'Mon D - YYYY' headers without a '_N' suffix are used (plus 'Mon YYYY'
+    and 'Current' when include_monthly is set), and the first column for each
+    date wins - the same rule the dashboard uses.
+
+    Returns:
+        (website_col, [(col_idx, date), ...]) with website_col None if not found
+    """
+    import re
+    from datetime import date
+
+    month_to_num = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+                    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+    date_pattern = re.compile(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d+)\s*-\s*(\d{4})$')
+    month_pattern = re.compile(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})$')
+
+    website_col = None
+    current_col = None
+    date_cols = []  # (col_idx, date)
+    seen_dates = set()
+    for idx, cell in enumerate(header):
+        cell_str = str(cell).strip() if cell else ''
+        if website_col is None and cell_str.lower() == 'website':
+            website_col = idx
+            continue
+        col_date = None
+        match = date_pattern.match(cell_str)
+        if match:
+            month, day, year = match.groups()
+            try:
+                col_date = date(int(year), month_to_num[month.lower()], int(day))
+            except ValueError:
+                continue
+        elif include_monthly:
+            match = month_pattern.match(cell_str)
+            if match:
+                month, year = match.groups()
+                col_date = date(int(year), month_to_num[month.lower()], 1)
+            elif cell_str.lower() == 'current':
+                current_col = idx
+        if col_date is None or col_date in seen_dates:
+            continue
+        seen_dates.add(col_date)
+        date_cols.append((idx, col_date))
+
+    # "Current" is the in-progress month unless the sheet already has that column
+    if current_col is not None:
+        now = utcnow()
+        current_date = date(now.year, now.month, 1)
+        if current_date not in seen_dates:
+            date_cols.append((current_col, current_date))
+
+    date_cols.sort(key=lambda c: c[1])
+    return website_col, date_cols
+
+
+def extract_daily_series(csv_data):
+    """
+    Extract per-domain daily series from a wide-format CSV.
+
+    Mirrors the dashboard's parsing (see find_date_columns), and empty or
+    zero cells are treated as missing.
+
+    Returns:
+        Dict of domain (lowercase) -> list of (date, value) sorted by date
+    """
+    if not csv_data or len(csv_data) < 2:
+        return {}
+
+    website_col, date_cols = find_date_columns(csv_data[0])
+
+    if website_col is None:
+        print("Could not find Website column, skipping series extraction")
+        return {}
+
+    series = {}
+    for row in csv_data[1:]:
+        if len(row) <= website_col:
+            continue
+        domain = str(row[website_col]).strip().lower() if row[website_col] else ''
+        if not domain or domain == 'website':
+            continue
+        points = []
+        for col_idx, col_date in date_cols:
+            if col_idx >= len(row):
+                continue
+            cell = str(row[col_idx]).replace(',', '').strip()
+            if not cell or cell == '-':
+                continue
+            try:
+                value = float(cell)
+            except ValueError:
+                continue
+            if value > 0:
+                points.append((col_date, value))
+        if points:
+            series[domain] = points
+
+    return series
+
+
+def downsample_min_max(points, level):
+    """
+    Downsample a sorted daily series into weekly or monthly buckets.
+
+    Each bucket keeps its minimum and maximum points (in date order) so
+    peaks and troughs survive at every resolution.
+
+    Args:
+        points: List of (date, value) sorted by date
+        level: 'weekly' (Monday-start weeks) or 'monthly'
+
+    Returns:
+        List of (date, value) with at most two points per bucket
+    """
+    from datetime import timedelta
+
+    def bucket_key(d):
+        if level == 'weekly':
+            return d - timedelta(days=d.weekday())
+        return (d.year, d.month)
+
+    result = []
+    bucket = []
+    current_key = None
+
+    def flush():
+        if not bucket:
+            return
+        lo = min(bucket, key=lambda p: p[1])
+        hi = max(bucket, key=lambda p: p[1])
+        if lo is hi:
+            result.append(lo)
+        else:
+            result.extend(sorted((lo, hi), key=lambda p: p[0]))
+
+    for point in points:
+        key = bucket_key(point[0])
+        if key != current_key:
+            flush()
+            bucket = []
+            current_key = key
+        bucket.append(point)
+    flush()
+
+    return result
+
+
+def build_series_pyramid(datasets):
+    """
+    Build the multi-resolution series document for the dashboard chart.
+
+    Args:
+        datasets: Dict of dataset key (e.g. 'traffic_monthly') -> 2D array
+                  with header row (typically the priority-filtered data)
+
+    Returns:
+        Dict with per-dataset, per-domain 'weekly' and 'monthly' levels, each
+        as {'dates': ['Jun 2 2025', ...], 'values': [...]} in dashboard date format
+    """
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+    def format_date(d):
+        return f"{month_names[d.month - 1]} {d.day} {d.year}"
+
+    def format_value(v):
+        return int(v) if v == int(v) else round(v, 2)
+
+    series = {}
+    for key, csv_data in datasets.items():
+        domain_series = extract_daily_series(csv_data)
+        levels_by_domain = {}
+        for domain, points in domain_series.items():
+            levels = {}
+            for level in PYRAMID_LEVELS:
+                sampled = downsample_min_max(points, level)
+                levels[level] = {
+                    'dates': [format_date(d) for d, _ in sampled],
+                    'values': [format_value(v) for _, v in sampled]
+                }
+            levels_by_domain[domain] = levels
+        series[key] = levels_by_domain
+        print(f"Series pyramid: {key} -> {len(levels_by_domain)} domains")
+
+    return {
+        'generated_at': utcnow().isoformat() + 'Z',
+        'levels': ['daily'] + list(PYRAMID_LEVELS),
+        'series': series
+    }
+
+
+def extract_monthly_matrix(csv_data, how='mean', complete_months_only=False):
+    """
+    Aggregate a wide-format CSV into a domain x month matrix for forecasting.
+
+    Traffic-style data (how='mean') averages the positive snapshots in each
+    month and leaves months without one as None. Revenue-style data
+    (how='sum') adds the month columns up, with blank cells counting as 0.
+
+    Args:
+        csv_data: 2D array with header row
+        how: 'mean' or 'sum'
+        complete_months_only: Also drop the in-progress calendar month
+
+    Returns:
+        (domains, months, rows) with months a sorted list of month-start dates
+        and rows one list of floats/None per domain (first row wins)
+    """
+    if not csv_data or len(csv_data) < 2:
+        return [], [], []
+
+    builder = MonthlyMatrixBuilder(csv_data[0], how=how, complete_months_only=complete_months_only)
+    for row in csv_data[1:]:
+        builder.add(row)
+    return builder.result()
+
+
+class MonthlyMatrixBuilder:
+    """
+    extract_monthly_matrix() a row at a time: add() each row after the
+    header, then result(). The sync feeds it from the tab's row stream.
+    """
+
+    def __init__(self, header, how='mean', complete_months_only=False):
+        from datetime import date
+
+        self.how = how
+        self.website_col, self.date_cols = find_date_columns(header, include_monthly=True)
+        now = utcnow()
+        current = date(now.year, now.month, 1)
+        self.month_of = [date(d.year, d.month, 1) for _, d in self.date_cols]
+        # Future month columns (pre-created in the sheet) are not history
+        self.months = sorted(set(m for m in self.month_of
+                                 if m < current or (m == current and not complete_months_only)))
+        self.month_idx = {m: i for i, m in enumerate(self.months)}
+        self.domains = []
+        self.rows = []
+        self.seen = set()
+
+    def add(self, row):
+        website_col = self.website_col
+        if website_col is None or not self.date_cols or len(row) <= website_col:
+            return
+        domain = str(row[website_col]).strip().lower() if row[website_col] else ''
+        if not domain or domain == 'website' or domain == 'unmatched payments' or domain in self.seen:
+            return
+        self.seen.add(domain)
+
+        how = self.how
+        totals = [0.0] * len(self.months)
+        counts = [0] * len(self.months)
+        for (col_idx, _), month in zip(self.date_cols, self.month_of):
+            i = self.month_idx.get(month)
+            if i is None:
+                continue
+            if how == 'sum':
+                totals[i] += parse_currency(row[col_idx]) if col_idx < len(row) else 0.0
+                counts[i] = 1
+                continue
+            if col_idx >= len(row):
+                continue
+            cell = str(row[col_idx]).replace(',', '').strip()
+            try:
+                value = float(cell)
+            except ValueError:
+                continue
+            if value > 0:
+                totals[i] += value
+                counts[i] += 1
+
+        self.domains.append(domain)
+        self.rows.append([t if how == 'sum' else (t / c if c else None) for t, c in zip(totals, counts)])
+
+    def result(self):
+        if self.website_col is None or not self.date_cols:
+            return [], [], []
+        return self.domains, self.months, self.rows
+
+
+def monthly_matrices(datasets, monthly=None):
     """
-    Filter CSV data to only include rows for priority domains.
-    
+    Domain x month matrices for the forecast and stability engines.
+
     Args:
-        csv_data: 2D array with header row
-        priority_domains: Set of domain names (lowercase)
-        website_col_name: Name of the column containing domain names
-    
+        datasets: Dict of dataset key -> 2D array with header row (full,
+                  not priority-filtered); 'revenue' is summed per month,
+                  everything else averaged
+        monthly: Dict of dataset key -> (domains, months, rows) already
+                 aggregated by a MonthlyMatrixBuilder (streamed tabs)
+
     Returns:
-        Filtered 2D array with header and priority domain rows only
+        Dict of dataset key -> (domains, months, values) with NaN for missing
+    """
+    aggregated = {}
+    for key, csv_data in datasets.items():
+        how = 'sum' if key == 'revenue' else 'mean'
+        aggregated[key] = extract_monthly_matrix(csv_data, how=how, complete_months_only=(how == 'sum'))
+    aggregated.update(monthly or {})
+
+    matrices = {}
+    for key, (domains, months, rows) in aggregated.items():
+        values = [[float('nan') if v is None else v for v in row] for row in rows]
+        matrices[key] = (domains, months, values)
+    return matrices
+
+
+def build_forecast(matrices):
+    """
+    Fit and build forecast.json.
+
+    Args:
+        matrices: Output of monthly_matrices()
+
+    Returns:
+        Forecast document (see analysis/forecast.py)
+    """
+    from forecast import forecast_document
+
+    return forecast_document(matrices, horizon=FORECAST_HORIZON,
+                             generated_at=utcnow().isoformat() + 'Z')
+
+
+def build_stability(matrices):
+    """
+    Build stability.json from the monthly traffic matrix.
+
+    Args:
+        matrices: Output of monthly_matrices() with a 'traffic_monthly' entry
+
+    Returns:
+        Stability document (see analysis/stability.py)
+    """
+    from stability import stability_document
+
+    domains, _, values = matrices['traffic_monthly']
+    return stability_document(domains, values, generated_at=utcnow().isoformat() + 'Z')
+
+
+def build_matrix_store(csv_data):
+    """
+    Build the binary domain x date matrix files for one wide-format CSV.
+
+    Layout (little-endian, row-major, one row per domain):
+    - values.f32: float32 matrix, 0.0 where missing
+    - missing.bits: ceil(n_dates / 8) bytes per row, bit j (LSB first) set when
+      the cell is missing; padding bits are set
+    - domains.txt / dates.txt: row and column indexes (ISO dates), one per line
+    - meta.json: shape and format info, uploaded last
+
+    The first row wins when a domain appears more than once.
+
+    Returns:
+        Dict of file name -> bytes, or None if there is nothing to store
     """
     if not csv_data or len(csv_data) < 2:
-        return csv_data
-    
-    header = csv_data[0]
-    
-    # Find Website column
-    website_col = None
-    for idx, cell in enumerate(header):
-        if cell and str(cell).strip().lower() == website_col_name.lower():
-            website_col = idx
-            break
-    
-    if website_col is None:
-        print(f"Could not find {website_col_name} column, returning full data")
-        return csv_data
-    
-    # Filter rows
-    filtered = [header]
+        return None
+
+    builder = MatrixStoreBuilder(csv_data[0])
     for row in csv_data[1:]:
-        if len(row) <= website_col:
-            continue
+        builder.add(row)
+    return builder.files()
+
+
+class MatrixStoreBuilder:
+    """
+    build_matrix_store() a row at a time: add() each row after the header,
+    then files(). Rows are packed into float32/bit arrays as they arrive, so
+    only the packed matrix is held, not the rows.
+    """
+
+    def __init__(self, header):
+        from array import array
+
+        self.website_col, self.date_cols = find_date_columns(header, include_monthly=True)
+        self.n_dates = len(self.date_cols)
+        self.row_bytes = (self.n_dates + 7) // 8
+        self.domains = []
+        self.seen = set()
+        self.values = array('f')
+        self.missing = bytearray()
+        self.data_rows = 0
+
+    def add(self, row):
+        self.data_rows += 1
+        website_col = self.website_col
+        if website_col is None or not self.date_cols or len(row) <= website_col:
+            return
         domain = str(row[website_col]).strip().lower() if row[website_col] else ''
-        if domain in priority_domains:
-            filtered.append(row)
-    
-    print(f"Filtered CSV: {len(csv_data)} rows -> {len(filtered)} rows (priority only)")
-    return filtered
+        if not domain or domain == 'website' or domain in self.seen:
+            return
+        self.seen.add(domain)
+        self.domains.append(domain)
+
+        values = [0.0] * self.n_dates
+        missing = bytearray(b'\xff' * self.row_bytes)
+        row_len = len(row)
+        for j, (col_idx, _) in enumerate(self.date_cols):
+            if col_idx >= row_len:
+                continue
+            cell = str(row[col_idx]).replace('$', '').replace(',', '').strip()
+            if not cell or cell == '-' or cell == 'x':
+                continue
+            try:
+                value = float(cell)
+            except ValueError:
+                continue
+            values[j] = value
+            missing[j >> 3] &= ~(1 << (j & 7)) & 0xFF
+        self.values.extend(values)
+        self.missing += missing
+
+    def files(self):
+        """
+        Returns:
+            Dict of file name -> bytes, or None if there is nothing to store
+        """
+        import sys
+
+        if not self.data_rows or self.website_col is None or not self.date_cols:
+            return None
+
+        values = self.values
+        if sys.byteorder == 'big':
+            values = values[:]
+            values.byteswap()
+
+        meta = {
+            'version': MATRIX_FORMAT_VERSION,
+            'generated_at': utcnow().isoformat() + 'Z',
+            'n_domains': len(self.domains),
+            'n_dates': self.n_dates,
+            'dtype': '<f4',
+            'row_bytes': self.row_bytes,
+            'bitorder': 'little'
+        }
+
+        return {
+            'values.f32': values.tobytes(),
+            'missing.bits': bytes(self.missing),
+            'domains.txt': '\n'.join(self.domains).encode('utf-8'),
+            'dates.txt': '\n'.join(d.isoformat() for _, d in self.date_cols).encode('utf-8'),
+            'meta.json': json.dumps(meta).encode('utf-8')
+        }
+
+
+def upload_matrix_store(s3_client, matrix_name, files):
+    """
+    Upload matrix/<matrix_name>/ for one dataset, from build_matrix_store()
+    or a MatrixStoreBuilder fed from the tab's row stream.
+
+    meta.json goes last so readers never see a new header over old data files.
+
+    Returns:
+        True if uploaded, False if there was nothing to store
+    """
+    if not files:
+        print(f"Matrix store {matrix_name}: no date columns, skipped")
+        return False
+
+    for file_name in ('values.f32', 'missing.bits', 'domains.txt', 'dates.txt', 'meta.json'):
+        content_type = 'application/json' if file_name.endswith('.json') else (
+            'text/plain' if file_name.endswith('.txt') else 'application/octet-stream')
+        upload_to_s3(s3_client, f"{S3_MATRIX_PREFIX}{matrix_name}/{file_name}",
+                     files[file_name], content_type=content_type)
+    return True
+
+
+class HistoryOrderError(ValueError):
+    """The streamed S3 copy is not in domain order (written before the merge sorted it)."""
+
+
+class WindowMissError(LookupError):
+    """A column-window row belongs to a domain the S3 copy does not have."""
+
+    def __init__(self, domain):
+        super().__init__(domain)
+        self.domain = domain
+
+
+def iter_s3_lines(body, chunk_bytes=None):
+    """
+    Lines of a UTF-8 S3 body as it downloads, split on '\\n' only and keeping
+    it (as io.StringIO would), so csv.reader sees quoted newlines intact.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    tail = ''
+    while True:
+        with span('history_download') as counts:
+            chunk = body.read(chunk_bytes or HISTORY_READ_BYTES)
+            counts['bytes_in'] = len(chunk)
+        text = tail + decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            if text:
+                yield text
+            return
+        lines = text.split('\n')
+        tail = lines.pop()
+        for line in lines:
+            yield line + '\n'
+
+
+class S3CsvRows:
+    """
+    The rows of a CSV in S3, parsed as the body downloads.
+
+    The header and the first data row are read on open; iterating yields every
+    row, header first, holding one download chunk at a time. It can be
+    iterated once.
+    """
+
+    def __init__(self, body, file_name):
+        self.body = body
+        self.file_name = file_name
+        self._reader = csv.reader(iter_s3_lines(body))
+        self.header = next(self._reader, None)
+        self._first = next(self._reader, None)
+        self.has_rows = self._first is not None
+
+    def __iter__(self):
+        try:
+            if self.header is None:
+                return
+            yield self.header
+            if self._first is None:
+                return
+            yield self._first
+            self._first = None
+            yield from self._reader
+        finally:
+            self.body.close()
 
 
-def read_existing_s3_csv(s3_client, file_name):
+def open_existing_s3_csv(s3_client, file_name):
     """
-    Read existing CSV from S3 and parse into 2D array.
-    Returns None if file doesn't exist.
+    Open the S3 copy of a tab for a streaming merge (see S3CsvRows).
+
+    Returns:
+        S3CsvRows, or None if the file doesn't exist or can't be opened
     """
     try:
         response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=file_name)
-        content = response['Body'].read().decode('utf-8')
-        
-        # Parse CSV content into 2D array
-        import csv
-        reader = csv.reader(io.StringIO(content))
-        data = list(reader)
-        print(f"Read existing {file_name} from S3 ({len(data)} rows)")
-        return data
+        rows = S3CsvRows(response['Body'], file_name)
+        print(f"Streaming existing {file_name} from S3")
+        return rows
     except s3_client.exceptions.NoSuchKey:
         print(f"No existing {file_name} in S3 (first sync)")
         return None
@@ -350,25 +1720,53 @@ def read_existing_s3_csv(s3_client, file_name):
 
 def merge_wide_format_data(existing_data, new_data):
     """
-    Merge two wide-format CSVs (dates as columns).
+    Merge two wide-format CSVs (dates as columns) into one 2D array.
+    
+    The sync streams merge_wide_format_rows() instead of building this list.
+    """
+    return list(merge_wide_format_rows(existing_data, new_data))
+
+
+def merge_wide_format_rows(existing_data, new_data):
+    """
+    Merge two wide-format CSVs (dates as columns), yielding the merged header
+    and then one row per domain in sorted domain order.
     
     - Combines all columns from both sources
     - For overlapping date columns, prefers new_data values
     - For domains in both, merges their data
     - Preserves historical columns that are only in existing_data
+    - UNREAD_CELL cells of new_data (column-window reads) take the
+      existing_data value of their column
+    
+    existing_data can be a 2D array or an iterator of rows (S3CsvRows) in
+    domain order, as this merge writes them. An iterator is merge-joined
+    against the sorted new_data domains one row at a time, so nothing holds
+    the S3 copy; a 2D array is sorted first.
+    
+    Raises:
+        HistoryOrderError: An existing_data iterator is out of domain order
+        WindowMissError: A row with UNREAD_CELL cells has no existing row
     
     Assumes:
     - First row is header
     - Column containing 'Website' is the domain identifier
     - Date columns follow pattern like 'Mon D - YYYY' or 'Mon YYYY'
     """
-    if not existing_data or len(existing_data) < 2:
+    existing_iter = iter(existing_data or ())
+    existing_header = next(existing_iter, None)
+    first_existing = next(existing_iter, None)
+    if existing_header is None or first_existing is None:
         print("No existing data to merge, using new data only")
-        return new_data
+        yield from new_data
+        return
     
     if not new_data or len(new_data) < 2:
         print("No new data to merge, keeping existing data")
-        return existing_data
+        yield existing_header
+        yield first_existing
+        yield from existing_iter
+        return
     
     # Find Website column index in each dataset
     def find_website_col(header):
@@ -377,7 +1775,6 @@ def merge_wide_format_data(existing_data, new_data):
                 return idx
         return 1  # Default to column 1 if not found
     
-    existing_header = existing_data[0]
     new_header = new_data[0]
     
     existing_website_col = find_website_col(existing_header)
@@ -473,65 +1870,99 @@ def merge_wide_format_data(existing_data, new_data):
     merged_col_index = {normalize_date(col) if is_date_column(col) else str(col).strip().lower(): idx 
                         for idx, col in enumerate(merged_header)}
     
-    # Build domain data from existing (historical base)
-    domain_data = {}  # domain -> {col_idx: value}
+    # Source -> merged column moves, worked out once from the headers. Existing
+    # rows only contribute date columns (non-date columns come from new_data);
+    # moves run in column order, so when columns share a key the last one wins.
+    def column_key(col_name):
+        return normalize_date(col_name) if is_date_column(col_name) else str(col_name).strip().lower()
+    
+    existing_moves = []
+    existing_by_dst = {}  # merged column -> existing column, for UNREAD_CELL
+    for idx, col_name in enumerate(existing_header):
+        col_key = column_key(col_name)
+        if col_key in merged_col_index:
+            existing_by_dst[merged_col_index[col_key]] = idx
+            if is_date_column(col_name):
+                existing_moves.append((idx, merged_col_index[col_key]))
+    
+    new_moves = []
+    for idx, col_name in enumerate(new_header):
+        col_key = column_key(col_name)
+        if col_key in merged_col_index:
+            new_moves.append((idx, merged_col_index[col_key]))
+    
+    def row_domain(row, website_col):
+        if len(row) <= website_col:
+            return ''
+        domain = str(row[website_col]).strip().lower() if row[website_col] else ''
+        return '' if domain == 'website' else domain
     
-    for row in existing_data[1:]:
-        if len(row) <= existing_website_col:
-            continue
-        domain = str(row[existing_website_col]).strip().lower() if row[existing_website_col] else ''
-        if not domain or domain == 'website':
-            continue
-        
-        domain_data[domain] = {}
-        for idx, val in enumerate(row):
-            if idx < len(existing_header):
-                col_name = existing_header[idx]
-                if is_date_column(col_name):
-                    norm_col = normalize_date(col_name)
-                    if norm_col in merged_col_index:
-                        domain_data[domain][merged_col_index[norm_col]] = val
-                elif str(col_name).strip().lower() in merged_col_index:
-                    # Non-date column
-                    pass  # Will be overwritten by new_data
-    
-    # Overlay new data (takes precedence for overlapping dates and non-date columns)
+    # Every new row of a domain is overlaid in order on its existing row
+    new_rows = {}
     for row in new_data[1:]:
-        if len(row) <= new_website_col:
-            continue
-        domain = str(row[new_website_col]).strip().lower() if row[new_website_col] else ''
-        if not domain or domain == 'website':
+        domain = row_domain(row, new_website_col)
+        if domain:
+            new_rows.setdefault(domain, []).append(row)
+    new_domains = sorted(new_rows)
+    
+    width = len(merged_header)
+    
+    def merged_row(domain, existing_row):
+        merged = [''] * width
+        if existing_row is not None:
+            existing_len = len(existing_row)
+            for src, dst in existing_moves:
+                if src < existing_len:
+                    merged[dst] = existing_row[src]
+        for row in new_rows.get(domain, ()):
+            row_len = len(row)
+            for src, dst in new_moves:
+                if src < row_len:
+                    value = row[src]
+                    if value is UNREAD_CELL:
+                        if existing_row is None:
+                            raise WindowMissError(domain)
+                        stored_idx = existing_by_dst.get(dst)
+                        value = existing_row[stored_idx] if stored_idx is not None and stored_idx < existing_len else ''
+                    merged[dst] = value
+        return merged
+    
+    if isinstance(existing_data, list):
+        existing_iter = iter(sorted([first_existing, *existing_iter],
+                                    key=lambda row: row_domain(row, existing_website_col)))
+    else:
+        existing_iter = itertools.chain([first_existing], existing_iter)
+    
+    yield merged_header
+    
+    # Merge-join: the existing rows arrive in domain order and the last row of
+    # a repeated domain is its historical base; new-only domains are emitted
+    # as the existing stream passes them
+    count = 1
+    next_new = 0
+    pending_domain, pending_row = None, None
+    for row in itertools.chain(existing_iter, [None]):
+        domain = row_domain(row, existing_website_col) if row is not None else None
+        if row is not None and not domain:
             continue
-        
-        if domain not in domain_data:
-            domain_data[domain] = {}
-        
-        for idx, val in enumerate(row):
-            if idx < len(new_header):
-                col_name = new_header[idx]
-                if is_date_column(col_name):
-                    norm_col = normalize_date(col_name)
-                    if norm_col in merged_col_index:
-                        domain_data[domain][merged_col_index[norm_col]] = val
-                else:
-                    # Non-date columns from new data (structure columns)
-                    col_key = str(col_name).strip().lower()
-                    if col_key in merged_col_index:
-                        domain_data[domain][merged_col_index[col_key]] = val
-    
-    # Build merged rows
-    merged_data = [merged_header]
-    
-    # Sort domains for consistent output
-    for domain in sorted(domain_data.keys()):
-        row = [''] * len(merged_header)
-        for col_idx, val in domain_data[domain].items():
-            if col_idx < len(row):
-                row[col_idx] = val
-        merged_data.append(row)
-    
-    print(f"Merged data: {len(merged_data)} rows (including header)")
-    return merged_data
+        if pending_domain is not None and domain != pending_domain:
+            if domain is not None and domain < pending_domain:
+                raise HistoryOrderError(f"{domain} after {pending_domain}")
+            while next_new < len(new_domains) and new_domains[next_new] < pending_domain:
+                count += 1
+                yield merged_row(new_domains[next_new], None)
+                next_new += 1
+            if next_new < len(new_domains) and new_domains[next_new] == pending_domain:
+                next_new += 1
+            count += 1
+            yield merged_row(pending_domain, pending_row)
+        pending_domain, pending_row = domain, row
+    
+    for domain in new_domains[next_new:]:
+        count += 1
+        yield merged_row(domain, None)
+    
+    print(f"Merged data: {count} rows (including header)")
 
 
 def read_sync_log(s3_client):
@@ -564,6 +1995,45 @@ def write_sync_log(s3_client, log_data):
         return False
 
 
+def history_key(start_time, run_id=None):
+    """S3 key of one run's history record (sortable within its day partition)."""
+    key = f"{S3_HISTORY_PREFIX}date={start_time.strftime('%Y-%m-%d')}/{start_time.strftime('%H-%M-%S')}Z"
+    if run_id:
+        key += f"-{run_id[:8]}"
+    return key + '.jsonl'
+
+
+def write_history_record(s3_client, entry, key):
+    """Write one run's full history entry (stage spans included) as a JSONL object."""
+    try:
+        upload_to_s3(s3_client, key, json.dumps(entry, separators=(',', ':')) + '\n',
+                     content_type='application/x-ndjson')
+        return True
+    except Exception as e:
+        print(f"Error writing history record {key}: {e}")
+        return False
+
+
+def rolling_summary(entry, previous=None):
+    """
+    The sync-log.json history: this run's entry (without stage spans) and the
+    previous summary's runs, newest first, at most SUMMARY_HISTORY_RUNS.
+
+    Args:
+        entry: This run's history entry
+        previous: The history list in the last sync-log.json, if any
+
+    Returns:
+        List of history entries
+    """
+    current = {k: v for k, v in entry.items() if k != 'stages'}
+    runs = {run.get('timestamp'): run for run in (previous or [])}
+    runs[current['timestamp']] = current
+    # A run that overlapped this one may have finished first, so order by timestamp
+    history = sorted(runs.values(), key=lambda run: run.get('timestamp') or '', reverse=True)
+    return history[:SUMMARY_HISTORY_RUNS]
+
+
 def get_s3_file_size(s3_client, file_name):
     """Get the size of a file in S3."""
     try:
@@ -573,22 +2043,57 @@ def get_s3_file_size(s3_client, file_name):
         return 0
 
 
-def extract_csv_metadata(s3_client):
+def describe_csv(header, row_count, content_hash):
     """
-    Extract metadata from CSVs including:
-    - 'Last update' timestamp from header (when Google Sheets was updated)
-    - Row count
-    - Column count
+    Sync-log metadata of a CSV from its header row:
+    - 'Last update' timestamp from the first cell (when Google Sheets was updated)
+    - Row count (excluding the header) and column count
     - Newest date column
-    - Content hash (MD5) for change detection
+    - Content hash (MD5 of the file bytes) for change detection
     
-    Returns dict: {file_name: {sheet_updated, rows, columns, newest_date_col, content_hash}}
+    Returns dict: {sheet_updated, rows, columns, newest_date_col, content_hash}
     """
     import re
+    
+    header = [str(cell) if cell is not None else '' for cell in header]
+    
+    # Extract "Last update" timestamp from first cell
+    sheet_updated = None
+    first_cell = header[0] if header else ''
+    match = re.search(r'Last update\s+(\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M\s+\w+)', first_cell)
+    if match:
+        sheet_updated = match.group(1)
+    
+    # Find newest date column
+    date_cols = []
+    for col in header:
+        if any(m in col for m in ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']):
+            date_cols.append(col)
+    newest_date_col = date_cols[-1] if date_cols else None
+    
+    return {
+        'sheet_updated': sheet_updated,
+        'rows': row_count,
+        'columns': len(header),
+        'newest_date_col': newest_date_col,
+        'content_hash': content_hash
+    }
+
+
+def extract_csv_metadata(s3_client, written=None):
+    """
+    Metadata (see describe_csv) of the synced CSVs.
+    
+    Files this run wrote take their metadata from the upload stream (written);
+    only the others (a tab whose sync failed) are downloaded from S3.
+    
+    Returns dict: {file_name: {sheet_updated, rows, columns, newest_date_col, content_hash}}
+    """
     import csv
     import hashlib
     
     metadata = {}
+    written = written or {}
     
     files_to_check = [
         ('revenue-history.csv', 'Revenue'),
@@ -600,49 +2105,27 @@ def extract_csv_metadata(s3_client):
     
     for file_name, label in files_to_check:
         try:
-            response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=file_name)
-            content = response['Body'].read().decode('utf-8')
-            
-            # Compute content hash for change detection
-            content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-            
-            # Parse CSV
-            reader = csv.reader(io.StringIO(content))
-            rows = list(reader)
-            
-            if not rows:
-                metadata[file_name] = None
-                continue
-            
-            header = rows[0]
-            row_count = len(rows) - 1  # Exclude header
-            col_count = len(header)
-            
-            # Extract "Last update" timestamp from first cell
-            sheet_updated = None
-            first_cell = header[0] if header else ''
-            match = re.search(r'Last update\s+(\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}:\d{2}\s+[AP]M\s+\w+)', first_cell)
-            if match:
-                sheet_updated = match.group(1)
-            
-            # Find newest date column
-            date_cols = []
-            for col in header:
-                if any(m in col for m in ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']):
-                    date_cols.append(col)
-            newest_date_col = date_cols[-1] if date_cols else None
-            
-            metadata[file_name] = {
-                'sheet_updated': sheet_updated,
-                'rows': row_count,
-                'columns': col_count,
-                'newest_date_col': newest_date_col,
-                'content_hash': content_hash
-            }
+            if file_name in written:
+                metadata[file_name] = written[file_name]
+            else:
+                response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=file_name)
+                content = response['Body'].read().decode('utf-8')
+                
+                # Compute content hash for change detection
+                content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+                
+                # Parse CSV
+                rows = list(csv.reader(io.StringIO(content)))
+                if not rows:
+                    metadata[file_name] = None
+                    continue
+                metadata[file_name] = describe_csv(rows[0], len(rows) - 1, content_hash)
             
-            print(f"  {label}: {row_count} rows, {col_count} cols, hash: {content_hash[:8]}...")
-            if sheet_updated:
-                print(f"    Sheet updated: {sheet_updated}")
+            file_info = metadata[file_name]
+            print(f"  {label}: {file_info['rows']} rows, {file_info['columns']} cols, "
+                  f"hash: {file_info['content_hash'][:8]}...")
+            if file_info['sheet_updated']:
+                print(f"    Sheet updated: {file_info['sheet_updated']}")
                 
         except Exception as e:
             print(f"  Error reading {file_name}: {e}")
@@ -676,7 +2159,7 @@ def send_slack_notification(message, is_error=False):
                         "type": "context",
                         "elements": [{
                             "type": "mrkdwn",
-                            "text": f"_Timestamp: {datetime.utcnow().isoformat()}Z_"
+                            "text": f"_Timestamp: {utcnow().isoformat()}Z_"
                         }]
                     }
                 ]
@@ -722,7 +2205,8 @@ def find_header_row(data):
 
 
 def sync_sheet_to_s3(service, s3_client, spreadsheet_id, tab_name, s3_file_name, 
-                     find_date_header=False, preserve_history=False, return_data=False):
+                     find_date_header=False, preserve_history=False, return_data=False,
+                     column_state=None, file_metadata=None):
     """
     Sync a single sheet tab to S3.
     
@@ -730,82 +2214,339 @@ def sync_sheet_to_s3(service, s3_client, spreadsheet_id, tab_name, s3_file_name,
         preserve_history: If True, merge with existing S3 data to preserve 
                          historical columns that may have been archived from Sheets.
         return_data: If True, return the merged data (for priority domain computation)
+        column_state: With preserve_history, the sync-state.json 'tabs' dict; the tab
+                      is then read as a column window when possible and its
+                      watermark updated
+        file_metadata: Dict to record the written CSV's describe_csv() in, by file name
     
     Returns:
         If return_data is False: True on success, False on failure
         If return_data is True: (success: bool, data: list) tuple
     """
-    print(f"\n--- Syncing {tab_name} -> {s3_file_name} ---")
-    
-    # Read data from Google Sheets
-    new_data = read_sheet_data(service, spreadsheet_id, tab_name)
-    
-    if not new_data:
-        print(f"Warning: No data found in {tab_name}")
+    outputs = sync_tab(service, s3_client, spreadsheet_id, tab_name, s3_file_name,
+                       find_date_header=find_date_header, preserve_history=preserve_history,
+                       column_state=column_state, collect=return_data, file_metadata=file_metadata)
+    if outputs is None:
         return (False, None) if return_data else False
+    if return_data:
+        return (True, outputs['data'])
+    return True
+
+
+def sync_tab(service, s3_client, spreadsheet_id, tab_name, s3_file_name, find_date_header=False,
+             preserve_history=False, column_state=None, priority=None, monthly=None, collect=False,
+             file_metadata=None):
+    """
+    Read a tab, merge it with the S3 copy and stream it back out (see
+    stream_tab_to_s3); sync_sheet_to_s3 and sync_sheet_to_s3_with_priority
+    are the entry points.
     
-    # Find header row by looking for date columns (for sheets with metadata rows at top)
-    if find_date_header:
-        header_row_idx = find_header_row(new_data)
-        if header_row_idx > 0:
-            print(f"Skipping first {header_row_idx} rows (metadata)")
-            new_data = new_data[header_row_idx:]
-    
-    # If preserving history, merge with existing S3 data
-    if preserve_history:
-        existing_data = read_existing_s3_csv(s3_client, s3_file_name)
-        if existing_data:
-            merged_data = merge_wide_format_data(existing_data, new_data)
-        else:
-            merged_data = new_data
-    else:
-        merged_data = new_data
+    Returns:
+        stream_tab_to_s3's outputs, or None if the tab had no data
+    """
+    with span('tab', tab=tab_name):
+        print(f"\n--- Syncing {tab_name} -> {s3_file_name} ---")
+        
+        # The S3 copy first: its header decides the column window, and its rows
+        # stream into the merge
+        existing = open_existing_s3_csv(s3_client, s3_file_name) if preserve_history else None
+        
+        def without_metadata_rows(data):
+            # Find header row by looking for date columns (for sheets with metadata rows at top)
+            if data and find_date_header:
+                header_row_idx = find_header_row(data)
+                if header_row_idx > 0:
+                    print(f"Skipping first {header_row_idx} rows (metadata)")
+                    return data[header_row_idx:]
+            return data
+        
+        # Read data from Google Sheets
+        new_data = None
+        if column_state is not None:
+            stored_header = existing.header if existing is not None and existing.has_rows else None
+            new_data = read_sheet_window(service, spreadsheet_id, tab_name, stored_header,
+                                         column_state.get(tab_name), find_date_header=find_date_header)
+        full_read = new_data is None
+        if full_read:
+            new_data = read_sheet_data(service, spreadsheet_id, tab_name)
+        
+        if not new_data:
+            print(f"Warning: No data found in {tab_name}")
+            return None
+        new_data = without_metadata_rows(new_data)
+        
+        matrix_name = next((key for key, name in S3_FILES.items() if name == s3_file_name), None)
+        
+        def write(existing):
+            # If preserving history, merge with the S3 copy row by row
+            merged = preserve_history and existing is not None
+            rows = merge_wide_format_rows(existing, new_data) if merged else new_data
+            outputs = stream_tab_to_s3(s3_client, rows, s3_file_name, matrix_name=matrix_name,
+                                       priority=priority, monthly=monthly, collect=collect and merged)
+            if collect and not merged:
+                outputs['data'] = new_data
+            return outputs
+        
+        def write_merged(existing):
+            try:
+                return write(existing)
+            except HistoryOrderError as e:
+                # A copy from before the merge sorted its output: merge it in memory once
+                print(f"{s3_file_name} is not in domain order ({e}), merging it in memory")
+                existing = open_existing_s3_csv(s3_client, s3_file_name)
+                return write(list(existing) if existing is not None else None)
+        
+        try:
+            outputs = write_merged(existing)
+        except WindowMissError as e:
+            print(f"{tab_name}: {e.domain} not in the S3 copy yet, falling back to a full read")
+            full_read = True
+            new_data = without_metadata_rows(read_sheet_data(service, spreadsheet_id, tab_name))
+            if not new_data:
+                print(f"Warning: No data found in {tab_name}")
+                return None
+            outputs = write_merged(open_existing_s3_csv(s3_client, s3_file_name))
+        
+        if column_state is not None:
+            column_state[tab_name] = column_watermark(outputs['header'], column_state.get(tab_name), full_read)
+        if file_metadata is not None:
+            file_metadata[s3_file_name] = outputs['metadata']
+        
+        return outputs
+
+
+def stream_tab_to_s3(s3_client, rows, s3_file_name, matrix_name=None, priority=None, monthly=None,
+                     collect=False):
+    """
+    Upload a tab in one pass over its rows, serializing each row once.
+    
+    The same rows feed the priority CSV, the binary matrix store and the
+    forecast's monthly matrix, so with merge_wide_format_rows() as the source
+    nothing holds the merged table: memory beyond the two inputs is one row,
+    one upload part and the packed outputs.
     
-    csv_content = convert_to_csv(merged_data)
+    Args:
+        rows: Iterable of rows, header first
+        matrix_name: S3_FILES key to write matrix/<matrix_name>/ for
+        priority: (s3_priority_file_name, priority_domains) to also write the
+                  priority CSV (rows whose Website is in priority_domains)
+        monthly: 'mean' or 'sum' to also aggregate a MonthlyMatrixBuilder
+        collect: Also keep the rows as a list
     
-    # Upload to S3
-    upload_to_s3(s3_client, s3_file_name, csv_content)
+    Returns:
+        Dict with 'header', 'metadata' (describe_csv() of the CSV written) and,
+        as requested, 'data' (2D array), 'priority_data' (2D array) and
+        'monthly' ((domains, months, rows))
+    """
+    rows = iter(rows)
+    header = next(rows)
+    outputs = {'header': header}
+    
+    # Derived outputs are non-fatal: one that fails is dropped with a warning
+    # and the CSV (the source of truth) still goes up
+    builders = {}
+    if matrix_name:
+        builders['matrix store'] = MatrixStoreBuilder(header)
+    if monthly:
+        builders['monthly matrix'] = MonthlyMatrixBuilder(header, how=monthly,
+                                                          complete_months_only=(monthly == 'sum'))
+    
+    priority_col = None
+    if priority:
+        priority_file_name, priority_domains = priority
+        priority_col = next((idx for idx, cell in enumerate(header)
+                             if cell and str(cell).strip().lower() == 'website'), None)
+        if priority_col is None:
+            print("Could not find Website column, priority CSV gets every row")
+        priority_data = [header]
+        priority_lines = []
+    data = [header] if collect else None
+    
+    content_hash = hashlib.md5()
+    with span('stream') as counts, S3UploadStream(s3_client, s3_file_name) as upload:
+        line = csv_line(header).encode('utf-8')
+        upload.write_line(line)
+        content_hash.update(line)
+        if priority:
+            priority_lines.append(line)
+        count = 1
+        for row in rows:
+            count += 1
+            line = csv_line(row).encode('utf-8')
+            upload.write_line(line)
+            content_hash.update(b'\n')
+            content_hash.update(line)
+            if data is not None:
+                data.append(row)
+            if priority:
+                if priority_col is None:
+                    keep = True
+                elif len(row) <= priority_col:
+                    keep = False
+                else:
+                    domain = str(row[priority_col]).strip().lower() if row[priority_col] else ''
+                    keep = domain in priority_domains
+                if keep:
+                    priority_data.append(row)
+                    priority_lines.append(line)
+            for name, builder in list(builders.items()):
+                try:
+                    builder.add(row)
+                except Exception as e:
+                    print(f"Warning: {name} for {s3_file_name} dropped: {e}")
+                    del builders[name]
+        counts['rows'] = count
+        counts['columns'] = len(header)
+    
+    outputs['metadata'] = describe_csv(header, count - 1, content_hash.hexdigest())
+    if data is not None:
+        outputs['data'] = data
+    
+    if priority:
+        print(f"\n--- Generating priority CSV: {priority_file_name} ---")
+        print(f"Filtered CSV: {count} rows -> {len(priority_data)} rows (priority only)")
+        with span('priority_csv'):
+            upload_to_s3(s3_client, priority_file_name, b'\n'.join(priority_lines))
+        outputs['priority_data'] = priority_data
+    
+    if 'monthly matrix' in builders:
+        outputs['monthly'] = builders['monthly matrix'].result()
+    
+    # Binary matrix for the analysis tooling (non-fatal: the CSV is the source of truth)
+    if 'matrix store' in builders:
+        try:
+            with span('matrix_store'):
+                upload_matrix_store(s3_client, matrix_name, builders['matrix store'].files())
+        except Exception as e:
+            print(f"Warning: matrix store for {matrix_name} not written: {e}")
     
-    if return_data:
-        return (True, merged_data)
-    return True
+    return outputs
+
+
+def column_watermark(header, previous, full_read):
+    """
+    sync-state.json entry for a tab after a sync.
+
+    Returns:
+        {'newest_date_column', 'date_columns', 'last_full_read'}
+    """
+    dated = [(column_date(col), col) for col in header if column_date(col)]
+    newest = max(dated)[1] if dated else None
+    last_full = utcnow().isoformat() + 'Z' if full_read else (previous or {}).get('last_full_read')
+    return {'newest_date_column': newest, 'date_columns': len(dated), 'last_full_read': last_full}
+
+
+def read_sync_state(s3_client):
+    """Per-tab column watermarks from sync-state.json ({} on first run or error)."""
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=S3_STATE_FILE)
+        return json.loads(response['Body'].read().decode('utf-8')).get('tabs', {})
+    except Exception as e:
+        print(f"No usable {S3_STATE_FILE} ({e}), full reads this run")
+        return {}
 
 
 def sync_sheet_to_s3_with_priority(service, s3_client, spreadsheet_id, tab_name, 
                                     s3_file_name, s3_priority_file_name, priority_domains,
-                                    find_date_header=False, preserve_history=False):
+                                    find_date_header=False, preserve_history=False,
+                                    return_data=False, return_monthly=False, column_state=None,
+                                    file_metadata=None):
     """
-    Sync a sheet to S3 and also generate a priority-filtered version.
+    Sync a sheet to S3 and also generate a priority-filtered version from
+    the same row stream.
     
     Args:
         priority_domains: Set of domain names to include in priority CSV
+        return_data: If True, return the priority-filtered data (for the series pyramid)
+        return_monthly: With return_data, also return the monthly matrix of the
+                        full data (for forecasts, see MonthlyMatrixBuilder)
+        column_state, file_metadata: As for sync_sheet_to_s3
     
     Returns:
-        True on success, False on failure
+        If return_data is False: True on success, False on failure
+        If return_data is True: (success: bool, priority_data: list) tuple, or
+        (success, priority_data, (domains, months, rows)) with return_monthly
     """
-    # First sync the full data
-    success, merged_data = sync_sheet_to_s3(
-        service, s3_client, spreadsheet_id, tab_name, s3_file_name,
-        find_date_header=find_date_header, preserve_history=preserve_history,
-        return_data=True
-    )
-    
-    if not success or not merged_data:
+    outputs = sync_tab(service, s3_client, spreadsheet_id, tab_name, s3_file_name,
+                       find_date_header=find_date_header, preserve_history=preserve_history,
+                       column_state=column_state, priority=(s3_priority_file_name, priority_domains),
+                       monthly='mean' if return_monthly else None, file_metadata=file_metadata)
+    
+    if outputs is None:
+        if return_data:
+            return (False, None, None) if return_monthly else (False, None)
         return False
     
-    # Generate and upload priority CSV
-    print(f"\n--- Generating priority CSV: {s3_priority_file_name} ---")
-    priority_data = filter_csv_to_priority(merged_data, priority_domains)
-    priority_csv_content = convert_to_csv(priority_data)
-    upload_to_s3(s3_client, s3_priority_file_name, priority_csv_content)
-    
+    if return_data:
+        if return_monthly:
+            return (True, outputs['priority_data'], outputs.get('monthly'))
+        return (True, outputs['priority_data'])
     return True
 
 
-def lambda_handler(event, context):
-    """Main Lambda handler function."""
+def lambda_handler(event, context, sheets_service=None, s3_client=None):
+    """
+    Main Lambda handler function.
+
+    Args:
+        event: Lambda event; {"trace_memory": true} adds tracemalloc peaks to the
+               stage spans, {"profile": true | [stage, ...]} uploads a cProfile capture
+        sheets_service: Sheets API client to read from (default: service account from env)
+        s3_client: boto3-style S3 client to write to (default: boto3.client('s3'));
+                   devtools/sync_harness.py passes fakes to run the sync offline
+    """
+    global _timings, _scheduler
+    event = event or {}
+    profile = profile_request(event)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        print(f"Profiling: {'whole run' if profile == 'handler' else ', '.join(sorted(profile))}")
+
+    _timings = StageTimings(trace_memory=event.get('trace_memory', TRACE_MEMORY),
+                            profiler=profiler,
+                            profile_stages=() if profile in (None, 'handler') else profile)
+    _scheduler = RequestScheduler(
+        {'sheets': (SHEETS_READS_PER_MINUTE / 60, SHEETS_READS_PER_MINUTE),
+         's3': (S3_REQUESTS_PER_SECOND, S3_REQUESTS_PER_SECOND)},
+        hedge_after={'sheets': SHEETS_HEDGE_SECONDS})
+    started = utcnow()
+    try:
+        if profile == 'handler':
+            profiler.enable()
+        try:
+            response = sync_all(context, sheets_service, s3_client, _timings, _scheduler)
+        finally:
+            if profile == 'handler':
+                profiler.disable()
+    finally:
+        _timings.close()
+        _timings = None
+        _scheduler.close()
+        _scheduler = None
+
+    if profiler is not None:
+        scope = 'handler' if profile == 'handler' else '+'.join(sorted(profile))
+        name = f"{started.strftime('%Y-%m-%dT%H-%M-%SZ')}-{scope}"
+        try:
+            keys = upload_profile(s3_client or get_s3_client(), profiler, name)
+        except Exception as e:
+            print(f"Warning: profile {name} not uploaded: {e}")
+            keys = []
+        body = json.loads(response['body'])
+        body['profiles'] = keys
+        response['body'] = json.dumps(body)
+    return response
+
+
+def sync_all(context, sheets_service, s3_client, timings, scheduler):
+    """
+    Run every sync step, recording stage spans into timings and sending every
+    request through scheduler (see lambda_handler).
+    """
     print("Starting dashboard sync...")
-    start_time = datetime.utcnow()
+    start_time = utcnow()
     
     results = {
         'traffic_monthly': False,
@@ -817,14 +2558,24 @@ def lambda_handler(event, context):
     }
     errors = []
     priority_domains = set()
+    pyramid_sources = {}  # dataset key -> priority-filtered data for the series pyramid
+    forecast_sources = {}  # dataset key -> full data for the forecasts
+    forecast_monthly = {}  # dataset key -> monthly matrix aggregated from the row stream
     
     # Track file statistics for sync log
     file_stats = {}
     
     try:
         # Initialize services
-        sheets_service = get_google_sheets_service()
-        s3_client = get_s3_client()
+        if sheets_service is None:
+            sheets_service = get_google_sheets_service()
+        if s3_client is None:
+            s3_client = get_s3_client()
+        s3_client = ScheduledS3(s3_client)
+        
+        # Column watermarks for the history-preserving tabs (column-window reads)
+        column_state = read_sync_state(s3_client)
+        file_metadata = {}  # CSV file name -> describe_csv() of what this run wrote
         
         # STEP 1: Sync Revenue FIRST to compute priority domains
         print("\n=== STEP 1: Sync Revenue and Compute Priority Domains ===")
@@ -834,13 +2585,17 @@ def lambda_handler(event, context):
                 sheets_service, s3_client,
                 REVENUE_SHEET_ID, REVENUE_TAB,
                 S3_FILES['revenue'],
-                return_data=True
+                return_data=True,
+                file_metadata=file_metadata
             )
             results['revenue'] = success
+            forecast_sources['revenue'] = revenue_data
             
             if success and revenue_data:
                 # Compute priority domains from revenue data
-                priority_domains = compute_priority_domains(revenue_data)
+                with span('priority_domains', tab=REVENUE_TAB) as counts:
+                    priority_domains = compute_priority_domains(revenue_data)
+                    counts['rows'] = len(priority_domains)
                 print(f"✅ Computed {len(priority_domains)} priority domains")
             else:
                 print("⚠️ Could not compute priority domains - revenue sync failed")
@@ -853,21 +2608,29 @@ def lambda_handler(event, context):
         # Sync Traffic Monthly (preserve historical data) + priority CSV
         try:
             if priority_domains:
-                results['traffic_monthly'] = sync_sheet_to_s3_with_priority(
+                (results['traffic_monthly'], pyramid_sources['traffic_monthly'],
+                 forecast_monthly['traffic_monthly']) = sync_sheet_to_s3_with_priority(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, TRAFFIC_MONTHLY_TAB,
                     S3_FILES['traffic_monthly'],
                     S3_PRIORITY_FILES['traffic_monthly'],
                     priority_domains,
-                    preserve_history=True
+                    preserve_history=True,
+                    return_data=True,
+                    return_monthly=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
             else:
                 # Fallback: sync without priority if we couldn't compute domains
-                results['traffic_monthly'] = sync_sheet_to_s3(
+                results['traffic_monthly'], forecast_sources['traffic_monthly'] = sync_sheet_to_s3(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, TRAFFIC_MONTHLY_TAB,
                     S3_FILES['traffic_monthly'],
-                    preserve_history=True
+                    preserve_history=True,
+                    return_data=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
         except Exception as e:
             errors.append(f"Traffic Monthly: {str(e)}")
@@ -875,14 +2638,17 @@ def lambda_handler(event, context):
         # Sync Traffic Average (find header row, preserve historical data) + priority CSV
         try:
             if priority_domains:
-                results['traffic_average'] = sync_sheet_to_s3_with_priority(
+                results['traffic_average'], pyramid_sources['traffic_average'] = sync_sheet_to_s3_with_priority(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, TRAFFIC_AVERAGE_TAB,
                     S3_FILES['traffic_average'],
                     S3_PRIORITY_FILES['traffic_average'],
                     priority_domains,
                     find_date_header=True,
-                    preserve_history=True
+                    preserve_history=True,
+                    return_data=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
             else:
                 results['traffic_average'] = sync_sheet_to_s3(
@@ -890,7 +2656,9 @@ def lambda_handler(event, context):
                     TRAFFIC_DR_SHEET_ID, TRAFFIC_AVERAGE_TAB,
                     S3_FILES['traffic_average'],
                     find_date_header=True,
-                    preserve_history=True
+                    preserve_history=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
         except Exception as e:
             errors.append(f"Traffic Average: {str(e)}")
@@ -898,20 +2666,25 @@ def lambda_handler(event, context):
         # Sync DR (preserve historical data) + priority CSV
         try:
             if priority_domains:
-                results['dr'] = sync_sheet_to_s3_with_priority(
+                results['dr'], pyramid_sources['dr'] = sync_sheet_to_s3_with_priority(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, DR_TAB,
                     S3_FILES['dr'],
                     S3_PRIORITY_FILES['dr'],
                     priority_domains,
-                    preserve_history=True
+                    preserve_history=True,
+                    return_data=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
             else:
                 results['dr'] = sync_sheet_to_s3(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, DR_TAB,
                     S3_FILES['dr'],
-                    preserve_history=True
+                    preserve_history=True,
+                    column_state=column_state,
+                    file_metadata=file_metadata
                 )
         except Exception as e:
             errors.append(f"DR: {str(e)}")
@@ -919,43 +2692,99 @@ def lambda_handler(event, context):
         # Sync RD (no archived data, fresh sync each time) + priority CSV
         try:
             if priority_domains:
-                results['rd'] = sync_sheet_to_s3_with_priority(
+                results['rd'], pyramid_sources['rd'] = sync_sheet_to_s3_with_priority(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, RD_TAB,
                     S3_FILES['rd'],
                     S3_PRIORITY_FILES['rd'],
                     priority_domains,
-                    preserve_history=False
+                    preserve_history=False,
+                    return_data=True,
+                    file_metadata=file_metadata
                 )
             else:
                 results['rd'] = sync_sheet_to_s3(
                     sheets_service, s3_client,
                     TRAFFIC_DR_SHEET_ID, RD_TAB,
                     S3_FILES['rd'],
-                    preserve_history=False
+                    preserve_history=False,
+                    file_metadata=file_metadata
                 )
         except Exception as e:
             errors.append(f"RD: {str(e)}")
         
+        # Save the column watermarks for the next run's window reads
+        try:
+            upload_to_s3(s3_client, S3_STATE_FILE,
+                         json.dumps({'updated': utcnow().isoformat() + 'Z', 'tabs': column_state}, indent=2),
+                         content_type='application/json')
+        except Exception as e:
+            print(f"Warning: {S3_STATE_FILE} not written, next run reads full tabs: {e}")
+        
         # Mark priority CSVs as successful if we generated them
         results['priority_csvs'] = len(priority_domains) > 0
         
+        # Build downsampled weekly/monthly series for the dashboard chart
+        pyramid_sources = {k: v for k, v in pyramid_sources.items() if v}
+        if pyramid_sources:
+            print("\n=== STEP 2b: Building Series Pyramid ===")
+            try:
+                with span('pyramid'):
+                    pyramid = build_series_pyramid(pyramid_sources)
+                    upload_to_s3(s3_client, S3_PYRAMID_FILE,
+                                 json.dumps(pyramid, separators=(',', ':')),
+                                 content_type='application/json')
+            except Exception as e:
+                errors.append(f"Series pyramid: {str(e)}")
+        
+        # Forecast every domain's monthly traffic and revenue for the chart overlay
+        forecast_sources = {k: v for k, v in forecast_sources.items() if v}
+        forecast_monthly = {k: v for k, v in forecast_monthly.items() if v and v[0]}
+        matrices = {}
+        if forecast_sources or forecast_monthly:
+            print("\n=== STEP 2c: Building Forecasts ===")
+            try:
+                with span('forecast'):
+                    matrices = monthly_matrices(forecast_sources, forecast_monthly)
+                    forecast = build_forecast(matrices)
+                    upload_to_s3(s3_client, S3_FORECAST_FILE,
+                                 json.dumps(forecast, separators=(',', ':')),
+                                 content_type='application/json')
+            except Exception as e:
+                errors.append(f"Forecast: {str(e)}")
+        
+        # Stability and trend of every domain's monthly traffic, from the same matrix
+        if matrices.get('traffic_monthly', ([],))[0]:
+            print("\n=== STEP 2d: Traffic Stability ===")
+            try:
+                with span('stability'):
+                    stability = build_stability(matrices)
+                    upload_to_s3(s3_client, S3_STABILITY_FILE,
+                                 json.dumps(stability, separators=(',', ':')),
+                                 content_type='application/json')
+                print(f"Stability: {len(stability['sites'])} domains {stability['quadrants']}")
+            except Exception as e:
+                errors.append(f"Stability: {str(e)}")
+        
         # Calculate duration
-        duration = (datetime.utcnow() - start_time).total_seconds()
+        duration = (utcnow() - start_time).total_seconds()
         
         # Gather file statistics for sync log
         print("\n=== STEP 3: Gathering File Statistics ===")
-        all_files = list(S3_FILES.values()) + list(S3_PRIORITY_FILES.values())
-        for file_name in all_files:
-            size = get_s3_file_size(s3_client, file_name)
-            file_stats[file_name] = {
-                'status': 'success' if size > 0 else 'missing',
-                'size_bytes': size
-            }
+        all_files = (list(S3_FILES.values()) + list(S3_PRIORITY_FILES.values())
+                     + [S3_PYRAMID_FILE, S3_FORECAST_FILE, S3_STABILITY_FILE])
+        with span('file_stats'):
+            for file_name in all_files:
+                size = get_s3_file_size(s3_client, file_name)
+                file_stats[file_name] = {
+                    'status': 'success' if size > 0 else 'missing',
+                    'size_bytes': size
+                }
         
         # Extract CSV metadata (rows, columns, timestamps)
         print("\n=== STEP 4: Extracting CSV Metadata ===")
-        csv_metadata = extract_csv_metadata(s3_client)
+        with span('csv_metadata'):
+            csv_metadata = extract_csv_metadata(s3_client, written=file_metadata)
         
         # Prepare summary
         success_count = sum(1 for v in results.values() if v)
@@ -963,7 +2792,8 @@ def lambda_handler(event, context):
         
         # Write sync log
         print("\n=== STEP 5: Writing Sync Log ===")
-        existing_log = read_sync_log(s3_client)
+        with span('sync_log_read'):
+            existing_log = read_sync_log(s3_client)
         
         # Detect data changes by comparing with previous metadata
         # Also track last_content_change timestamp for each CSV
@@ -1015,11 +2845,6 @@ def lambda_handler(event, context):
                     if row_diff != 0 or col_diff != 0:
                         print(f"  DATA CHANGE: {file_name} - {row_diff:+d} rows, {col_diff:+d} cols")
         
-        # Build history (keep last 20 entries)
-        history = []
-        if existing_log and 'history' in existing_log:
-            history = existing_log['history'][:19]  # Keep last 19 to make room for new entry
-        
         # Add current run to history (including data changes if any)
         history_entry = {
             'timestamp': start_time.isoformat() + 'Z',
@@ -1030,7 +2855,29 @@ def lambda_handler(event, context):
         }
         if data_changes:
             history_entry['changes'] = data_changes
-        history.insert(0, history_entry)
+        
+        # Per-stage spans, plus the process memory high-water mark against the
+        # configured limit, for right-sizing the function
+        stages = timings.summary()
+        history_entry['stages'] = stages
+        rss = max_rss_mb()
+        if rss is not None:
+            history_entry['max_rss_mb'] = rss
+        if context is not None and hasattr(context, 'memory_limit_in_mb'):
+            history_entry['memory_limit_mb'] = int(context.memory_limit_in_mb)
+        print_stage_metrics(stages, int((start_time - datetime(1970, 1, 1)).total_seconds() * 1000))
+        
+        # Request scheduler counters: retries, 429s, token waits and hedges per API
+        history_entry['requests'] = scheduler.summary()
+        for api, stats in history_entry['requests'].items():
+            print(f"{api}: {stats['requests']} requests, {stats['retries']} retries, "
+                  f"{stats['throttled']} throttled, {stats['hedged']} hedged "
+                  f"({stats['hedge_wins']} won), {stats['wait_seconds']}s waiting for quota")
+        
+        # Full entry to this run's own object; the summary keeps it without spans
+        write_history_record(s3_client, history_entry,
+                             history_key(start_time, getattr(context, 'aws_request_id', None)))
+        history = rolling_summary(history_entry, existing_log.get('history') if existing_log else None)
         
         # Build sync log
         sync_log = {
@@ -75,9 +75,10 @@ export default defineConfig({
     // },
   ],
 
-  // Run local dev server before starting the tests (skip for production testing)
+  // Run local data service before starting the tests (skip for production testing)
+  // Serves static files plus /api/data/* from E2E_DATA_DIR (a copy of the S3 bucket)
   webServer: isProduction ? undefined : {
-    command: 'python3 -m http.server 3456',
+    command: `python3 -m devtools.data_server --port 3456 --data-dir "${process.env.E2E_DATA_DIR || '.'}"`,
     url: 'http://localhost:3456',
     reuseExistingServer: true,
     timeout: 10000,
@@ -5,11 +5,13 @@ Runs the full analysis and outputs results.
 """
 
 import pandas as pd
-import numpy as np
-from scipy.stats import pearsonr, spearmanr
 import warnings
 warnings.filterwarnings('ignore')
 
+from analysis.pipeline import Pipeline, SEGMENTS, METHOD_LABELS
+from analysis.bootstrap import DEFAULT_RESAMPLES
+from analysis.lagsweep import DEFAULT_MAX_LAG
+
 print("="*70)
 print("TRAFFIC-REVENUE STATISTICAL ANALYSIS")
 print("="*70)
@@ -77,122 +79,17 @@ TOP_250_SITES = [
 
 TOP_250_LOWER = [s.lower() for s in TOP_250_SITES]
 
-# Helper functions
-def parse_revenue(val):
-    if pd.isna(val) or val in ['-', 'x', '', ' ']:
-        return np.nan
-    try:
-        if isinstance(val, str):
-            val = val.strip().replace('$', '').replace(',', '')
-            if val in ['-', 'x', '', ' ']:
-                return np.nan
-        return float(val)
-    except (ValueError, TypeError):
-        return np.nan
-
-def parse_traffic_date(date_str):
-    try:
-        clean = str(date_str).replace(' - ', ' ')
-        return pd.to_datetime(clean, format='%b %d %Y')
-    except:
-        return None
-
-def get_month_end(month_date):
-    return month_date + pd.offsets.MonthEnd(0)
-
-def get_same_month_latest(traffic_df, website, month_date):
-    month_start = month_date.replace(day=1)
-    month_end = get_month_end(month_date)
-    mask = (traffic_df['website'] == website) & (traffic_df['date'] >= month_start) & (traffic_df['date'] <= month_end)
-    subset = traffic_df[mask]
-    if len(subset) == 0:
-        return np.nan
-    return subset.loc[subset['date'].idxmax(), 'traffic']
-
-def get_same_month_avg(traffic_df, website, month_date):
-    month_start = month_date.replace(day=1)
-    month_end = get_month_end(month_date)
-    mask = (traffic_df['website'] == website) & (traffic_df['date'] >= month_start) & (traffic_df['date'] <= month_end)
-    subset = traffic_df[mask]
-    if len(subset) == 0:
-        return np.nan
-    return subset['traffic'].mean()
-
-def get_lagged_traffic(traffic_df, website, month_date, lag_days):
-    month_end = get_month_end(month_date)
-    target_date = month_end - pd.Timedelta(days=lag_days)
-    website_traffic = traffic_df[traffic_df['website'] == website]
-    if len(website_traffic) == 0:
-        return np.nan
-    website_traffic = website_traffic.copy()
-    website_traffic['date_diff'] = (website_traffic['date'] - target_date).abs()
-    closest = website_traffic.loc[website_traffic['date_diff'].idxmin()]
-    if closest['date_diff'].days > 30:
-        return np.nan
-    return closest['traffic']
-
-def calc_correlation(df, traffic_col, revenue_col='revenue'):
-    valid = df[[traffic_col, revenue_col]].dropna()
-    if len(valid) < 3:
-        return {'pearson_r': np.nan, 'pearson_p': np.nan, 'spearman_r': np.nan, 'spearman_p': np.nan, 'n': len(valid)}
-    pearson_r, pearson_p = pearsonr(valid[traffic_col], valid[revenue_col])
-    spearman_r, spearman_p = spearmanr(valid[traffic_col], valid[revenue_col])
-    return {'pearson_r': pearson_r, 'pearson_p': pearson_p, 'spearman_r': spearman_r, 'spearman_p': spearman_p, 'n': len(valid)}
-
-# Load data
+pipeline = Pipeline(TOP_250_LOWER)
+
+# Load data (each stage below is cached in .analysis-cache/ - see analysis/pipeline.py)
 print("\n📂 Loading data...")
-revenue_df = pd.read_csv('revenue-history.csv')
-traffic_df = pd.read_csv('traffic-data.csv')
-print(f"   Revenue: {revenue_df.shape[0]} rows")
-print(f"   Traffic: {traffic_df.shape[0]} rows")
-
-# Process revenue
-website_col = 'Website'
-month_cols = [col for col in revenue_df.columns if any(year in str(col) for year in ['2022', '2023', '2024', '2025', '2026'])]
-revenue_clean = revenue_df[revenue_df[website_col].notna() & (revenue_df[website_col] != '-')].copy()
-
-revenue_records = []
-for idx, row in revenue_clean.iterrows():
-    website = str(row[website_col]).strip().lower()
-    niche = row.get('Niche', 'Unknown')
-    for month_col in month_cols:
-        rev_val = parse_revenue(row[month_col])
-        if not pd.isna(rev_val):
-            try:
-                month_date = pd.to_datetime(month_col, format='%b %Y')
-                revenue_records.append({'website': website, 'niche': niche, 'month': month_date, 'revenue': rev_val})
-            except:
-                pass
-
-revenue_long = pd.DataFrame(revenue_records)
-print(f"   Revenue records: {len(revenue_long)}")
-
-# Process traffic
-traffic_website_col = traffic_df.columns[1]
-traffic_date_cols = [col for col in traffic_df.columns if '-' in str(col) and any(year in str(col) for year in ['2024', '2025', '2026'])]
-
-traffic_records = []
-for idx, row in traffic_df.iterrows():
-    website = str(row[traffic_website_col]).strip().lower() if pd.notna(row[traffic_website_col]) else None
-    if not website:
-        continue
-    for date_col in traffic_date_cols:
-        traffic_val = row[date_col]
-        parsed_date = parse_traffic_date(date_col)
-        if parsed_date and pd.notna(traffic_val):
-            try:
-                traffic_num = float(traffic_val)
-                if traffic_num > 0:
-                    traffic_records.append({'website': website, 'date': parsed_date, 'traffic': traffic_num})
-            except:
-                pass
-
-traffic_long = pd.DataFrame(traffic_records)
-print(f"   Traffic records: {len(traffic_long)}")
-
-# Filter to top 250
-revenue_top250 = revenue_long[revenue_long['website'].isin(TOP_250_LOWER)].copy()
-traffic_top250 = traffic_long[traffic_long['website'].isin(TOP_250_LOWER)].copy()
+loaded = pipeline.get('load')
+revenue_top250 = loaded['revenue']
+traffic_top250 = loaded['traffic']
+revenue_filtered = loaded['revenue_filtered']
+
+print(f"   Revenue records: {loaded['revenue_records']}")
+print(f"   Traffic records: {loaded['traffic_records']}")
 
 sites_with_revenue = set(revenue_top250['website'].unique())
 sites_with_traffic = set(traffic_top250['website'].unique())
@@ -204,29 +101,8 @@ print(f"   Sites with BOTH: {len(sites_with_both)}")
 
 # Build combined dataset
 print("\n⏳ Building combined dataset (aligning traffic snapshots with monthly revenue)...")
-traffic_min_date = traffic_top250['date'].min()
-revenue_filtered = revenue_top250[revenue_top250['month'] >= traffic_min_date.replace(day=1)].copy()
-
-combined_records = []
-total = len(revenue_filtered)
-for i, (idx, row) in enumerate(revenue_filtered.iterrows()):
-    if i % 500 == 0 and i > 0:
-        print(f"   Processing {i}/{total}...")
-    website = row['website']
-    month = row['month']
-    record = {
-        'website': website,
-        'month': month,
-        'niche': row['niche'],
-        'revenue': row['revenue'],
-        'traffic_latest': get_same_month_latest(traffic_top250, website, month),
-        'traffic_avg': get_same_month_avg(traffic_top250, website, month),
-        'traffic_lag30': get_lagged_traffic(traffic_top250, website, month, 30),
-        'traffic_lag60': get_lagged_traffic(traffic_top250, website, month, 60)
-    }
-    combined_records.append(record)
-
-combined_df = pd.DataFrame(combined_records)
+# All four snapshot methods for every site-month (groupby + merge_asof), recomputed only for changed months
+combined_df = pipeline.get('align')
 print(f"   Combined records: {len(combined_df)}")
 
 # Data completeness
@@ -241,25 +117,10 @@ print("\n" + "="*70)
 print("CORRELATION ANALYSIS: Traffic vs Revenue")
 print("="*70)
 
-segments = [10, 50, 100, 250]
-traffic_methods = ['traffic_latest', 'traffic_avg', 'traffic_lag30', 'traffic_lag60']
-method_labels = ['Same-Month Latest', 'Same-Month Avg', '30-Day Lagged', '60-Day Lagged']
-
-results = []
-for seg_size in segments:
-    seg_sites = [s.lower() for s in TOP_250_SITES[:seg_size]]
-    seg_data = combined_df[combined_df['website'].isin(seg_sites)]
-    for method, label in zip(traffic_methods, method_labels):
-        corr = calc_correlation(seg_data, method)
-        results.append({
-            'Segment': f'Top {seg_size}',
-            'Method': label,
-            'Pearson r': corr['pearson_r'],
-            'Spearman r': corr['spearman_r'],
-            'N': corr['n']
-        })
-
-results_df = pd.DataFrame(results)
+segments = SEGMENTS
+method_labels = METHOD_LABELS
+
+results_df = pipeline.get('correlate')
 
 # Print correlation table
 print("\n📈 PEARSON CORRELATION (r) BY SEGMENT AND METHOD:")
@@ -276,6 +137,15 @@ pivot_s = pivot_s[method_labels]
 pivot_s = pivot_s.reindex(['Top 10', 'Top 50', 'Top 100', 'Top 250'])
 print(pivot_s.round(4).to_string())
 
+# Uncertainty for every segment x method cell
+print(f"\n📏 95% BOOTSTRAP CONFIDENCE INTERVALS ({DEFAULT_RESAMPLES:,} resamples, permutation p-values):")
+print("-"*70)
+intervals_df = pipeline.get('intervals')
+for _, cell in intervals_df.iterrows():
+    print(f"   {cell['Segment']:<8} {cell['Method']:<18} "
+          f"r = {cell['pearson_r']:.3f} [{cell['pearson_lo']:.3f}, {cell['pearson_hi']:.3f}] p_perm = {cell['pearson_perm_p']:.4f} | "
+          f"ρ = {cell['spearman_r']:.3f} [{cell['spearman_lo']:.3f}, {cell['spearman_hi']:.3f}] (n={cell['n']:.0f})")
+
 # Best method per segment
 print("\n" + "="*70)
 print("BEST TRAFFIC METHOD BY SEGMENT")
@@ -319,20 +189,35 @@ if lag30_avg > same_latest_avg or lag60_avg > same_latest_avg:
 else:
     print("\n❌ NOT CONFIRMED: Same-month traffic shows similar or stronger correlation.")
 
+# Full lag curve instead of the 30/60-day points
+print("\n" + "="*70)
+print(f"LAG SWEEP: Correlation at every lag 0-{DEFAULT_MAX_LAG} days")
+print("="*70)
+lag_results = pipeline.get('lag_sweep')
+sweep_df = lag_results['sweep']
+print("\n📈 BEST LAG BY SEGMENT (strongest |Pearson r|):")
+print("-"*70)
+for _, best in lag_results['segment_best'].iterrows():
+    lag0 = sweep_df[(sweep_df['segment'] == best['segment']) & (sweep_df['lag'] == 0)]['pearson_r'].iloc[0]
+    print(f"   {best['segment']:<8} lag {best['lag']:>3.0f} days: Pearson r = {best['pearson_r']:.4f}, "
+          f"Spearman ρ = {best['spearman_r']:.4f} (n={best['n']:.0f}; lag 0 r = {lag0:.4f})")
+
+site_best = lag_results['site_best']
+if len(site_best) > 0:
+    print(f"\n📈 BEST LAG PER SITE ({len(site_best)} sites with ≥6 months):")
+    print("-"*70)
+    lag_bins = pd.cut(site_best['lag'], bins=[-1, 14, 45, 75, 105, 135, DEFAULT_MAX_LAG],
+                      labels=['0-14', '15-45', '46-75', '76-105', '106-135', f'136-{DEFAULT_MAX_LAG}'])
+    for label, count in lag_bins.value_counts(sort=False).items():
+        print(f"   {label:>8} days: {count} sites")
+    print(f"   Median best lag: {site_best['lag'].median():.0f} days")
+
 # Revenue efficiency analysis
 print("\n" + "="*70)
 print("REVENUE EFFICIENCY ANALYSIS")
 print("="*70)
 
-site_summary = combined_df.groupby('website').agg({
-    'revenue': 'sum',
-    'traffic_avg': 'mean',
-    'niche': 'first'
-}).reset_index()
-
-site_summary['rptu'] = site_summary['revenue'] / site_summary['traffic_avg']
-site_summary['rptu'] = site_summary['rptu'].replace([np.inf, -np.inf], np.nan)
-site_summary['rank'] = site_summary['website'].apply(lambda x: TOP_250_LOWER.index(x) + 1 if x in TOP_250_LOWER else 999)
+site_summary = pipeline.get('efficiency')
 site_summary = site_summary.sort_values('rank')
 
 print("\n💰 TOP 10 MOST EFFICIENT SITES (Highest Revenue per Traffic Unit):")
@@ -92,6 +92,68 @@ test.describe('API Endpoint Availability', () => {
     const lastSync = new Date(data.last_sync);
     expect(lastSync.getTime()).not.toBeNaN();
   });
+
+  test('series pyramid API returns data', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    
+    const response = await page.request.get('/api/data/pyramid');
+    expect(response.status()).toBe(200);
+    
+    const data = await response.json();
+    expect(data.levels).toEqual(['daily', 'weekly', 'monthly']);
+    expect(data).toHaveProperty('series');
+    expect(Object.keys(data.series.traffic_monthly || {}).length).toBeGreaterThan(0);
+  });
+
+  test('forecast API returns data', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    
+    const response = await page.request.get('/api/data/forecast');
+    expect(response.status()).toBe(200);
+    
+    const data = await response.json();
+    expect(data.horizon).toBeGreaterThan(0);
+    expect(data).toHaveProperty('series');
+    const [domain, forecast] = Object.entries(data.series.traffic_monthly || {})[0] || [];
+    expect(domain).toBeTruthy();
+    expect(forecast.dates.length).toBe(data.horizon);
+    expect(forecast.lower.length).toBe(forecast.values.length);
+    expect(forecast.upper.length).toBe(forecast.values.length);
+  });
+
+  test('stability API returns data', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+
+    const response = await page.request.get('/api/data/stability');
+    expect(response.status()).toBe(200);
+
+    const data = await response.json();
+    expect(data).toHaveProperty('sites');
+    const [domain, site] = Object.entries(data.sites)[0] || [];
+    expect(domain).toBeTruthy();
+    expect(site.n_traffic_months).toBeGreaterThanOrEqual(data.min_months);
+    expect(Object.keys(data.quadrants)).toContain(site.quadrant);
+  });
+
+  test('sync-history API returns runs', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    
+    const response = await page.request.get('/api/data/sync-history');
+    expect(response.status()).toBe(200);
+    
+    const data = await response.json();
+    expect(data.date).toMatch(/^\d{4}-\d{2}-\d{2}$/);
+    expect(data.runs.length).toBeGreaterThan(0);
+    expect(data.runs[0]).toHaveProperty('timestamp');
+    expect(data.runs[0]).toHaveProperty('stages');
+    
+    // Older days page back from the latest one
+    if (data.older) {
+      const older = await page.request.get(`/api/data/sync-history?date=${data.older}`);
+      expect(older.status()).toBe(200);
+      expect((await older.json()).newer).toBe(data.date);
+    }
+  });
 });
 
 test.describe('Chart Data Validation - Monthly View', () => {
@@ -722,3 +784,55 @@ test.describe('Console Error Monitoring', () => {
     expect(failedRequests).toHaveLength(0);
   });
 });
+
+test.describe('Traffic CSV Extraction', () => {
+  // Our columns are Jan 1-3 (out of order); the "_N" columns and the second
+  // block (same dates, "Mon D-YYYY" headers) hold values that must not be used
+  const TRAFFIC_CSV = [
+    'Last update 1/15/2026 6:00:00 AM AEDT,Website,Niche,Status,Live Date,Notes,' +
+      'Dec 30 - 2025_1,Jan 2 - 2026,Jan 1 - 2026,Jan 3 - 2026,Jan 3 - 2026_1,Jan 1-2026,Jan 2-2026',
+    ',MixedCase.Example.COM,Tech,Live,,,999,200,100,"1,300",888,777,666',
+    ',gaps.example.com,Tech,Live,,,999,,-,50,888,777,666',
+    ',mixedcase.example.com,Tech,Live,,,1,2,3,4,5,6,7',
+  ].join('\n');
+
+  // Loads the fixture CSV through the page's own loadTrafficCSV, twice: the
+  // first call builds the dataset, the second is served from its cache
+  async function extractTraffic(page, domainList) {
+    await page.route('**/api/data/traffic', route => route.fulfill({
+      status: 200,
+      contentType: 'text/csv',
+      body: TRAFFIC_CSV,
+    }));
+    return page.evaluate(async (domainList) => {
+      const saved = csvCache.traffic;
+      csvCache.traffic = null;
+      try {
+        const first = await loadTrafficCSV(domainList);
+        const cached = await loadTrafficCSV(domainList);
+        return { first, cached };
+      } finally {
+        csvCache.traffic = saved;
+      }
+    }, domainList);
+  }
+
+  test('extracts our data columns by date for a domain in any case', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    await waitForChartRender(page);
+    
+    const domainList = ['mixedcase.example.com', 'MIXEDCASE.EXAMPLE.COM', 'gaps.example.com', 'missing.example.com'];
+    const { first, cached } = await extractTraffic(page, domainList);
+    const dates = ['Jan 1 2026', 'Jan 2 2026', 'Jan 3 2026'];
+    
+    // The first matching row wins, whatever the case of the lookup
+    expect(first['mixedcase.example.com']).toEqual({ dates, ourData: [100, 200, 1300] });
+    expect(first['MIXEDCASE.EXAMPLE.COM']).toEqual({ dates, ourData: [100, 200, 1300] });
+    
+    // Empty and "-" cells are null but keep their dates
+    expect(first['gaps.example.com']).toEqual({ dates, ourData: [null, null, 50] });
+    
+    expect(first['missing.example.com']).toEqual({ dates: [], ourData: [] });
+    expect(cached).toEqual(first);
+  });
+});
@@ -837,3 +837,91 @@ test.describe('Ahrefs Links', () => {
     await expect(trafficLink).toHaveAttribute('target', '_blank');
   });
 });
+
+test.describe('Series Pyramid Level Switching', () => {
+  // Current resolution plus the pyramid-backed series as plotted, read from the page
+  async function chartLevelState(page) {
+    return page.evaluate(() => {
+      const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+      const toTimestamp = (dateStr) => {
+        const [month, day, year] = dateStr.split(' ');
+        return new Date(parseInt(year), monthNames.indexOf(month), parseInt(day)).getTime();
+      };
+      const dates = currentDomainData.dates;
+      return {
+        level: currentSeriesLevel,
+        rangeStart: toTimestamp(dates[0]),
+        rangeEnd: toTimestamp(dates[dates.length - 1]),
+        series: currentChart.w.config.series
+          .filter(s => ['Internal Monthly Traffic', 'DR', 'RD'].includes(s.name))
+          .map(s => ({ name: s.name, points: s.data }))
+      };
+    });
+  }
+
+  // Pyramid points stay inside the daily date range and have no gaps between the first and last value
+  function expectPointsLikeDaily(state) {
+    for (const { name, points } of state.series) {
+      for (const point of points) {
+        expect(point.x, `${name} point inside the date range`).toBeGreaterThanOrEqual(state.rangeStart);
+        expect(point.x, `${name} point inside the date range`).toBeLessThanOrEqual(state.rangeEnd);
+      }
+      const filled = points.map(p => p.y !== null && p.y !== undefined);
+      const first = filled.indexOf(true);
+      const last = filled.lastIndexOf(true);
+      if (first !== -1) {
+        expect(filled.slice(first, last + 1).every(Boolean), `${name} has no gaps inside its data`).toBe(true);
+      }
+    }
+  }
+
+  test('long ranges use a downsampled level bounded to the date range', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    await waitForChartRender(page);
+    
+    await page.locator('#chartDateRange').selectOption('all');
+    await page.waitForTimeout(1000);
+    
+    const state = await chartLevelState(page);
+    test.skip(state.level === 'daily', 'No series pyramid, or less than a year of data');
+    expect(['weekly', 'monthly']).toContain(state.level);
+    expectPointsLikeDaily(state);
+  });
+
+  test('switching levels by range and zoom keeps points in range', async ({ page }) => {
+    await page.goto(DASHBOARD_URL);
+    await waitForChartRender(page);
+    
+    const select = page.locator('#chartDateRange');
+    await select.selectOption('all');
+    await page.waitForTimeout(1000);
+    const longState = await chartLevelState(page);
+    test.skip(longState.level === 'daily', 'No series pyramid, or less than a year of data');
+    
+    // Short range -> daily
+    await select.selectOption('30');
+    await page.waitForTimeout(1000);
+    expect((await chartLevelState(page)).level).toBe('daily');
+    
+    // Back to all time, then zoom into the last two months -> daily
+    await select.selectOption('all');
+    await page.waitForTimeout(1000);
+    await page.evaluate(({ start, end }) => currentChart.zoomX(start, end), {
+      start: longState.rangeEnd - 60 * 24 * 60 * 60 * 1000,
+      end: longState.rangeEnd
+    });
+    await page.waitForTimeout(1000);
+    expect((await chartLevelState(page)).level).toBe('daily');
+    
+    // Zoom back out across the boundary -> the downsampled level again, same bounds
+    await page.evaluate(({ start, end }) => currentChart.zoomX(start, end), {
+      start: longState.rangeStart,
+      end: longState.rangeEnd
+    });
+    await page.waitForTimeout(1000);
+    const zoomedOut = await chartLevelState(page);
+    expect(zoomedOut.level).toBe(longState.level);
+    expectPointsLikeDaily(zoomedOut);
+    await expect(page.locator('.apexcharts-svg')).toBeVisible();
+  });
+});
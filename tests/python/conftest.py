@@ -0,0 +1,45 @@
+"""
+Shared fixtures for the Python tests (analysis engines and the sync Lambda).
+
+Run from the repo root:
+    python -m pytest tests/python
+"""
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from devtools.synthetic import PortfolioSpec, write_portfolio  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def portfolio_spec():
+    """A small synthetic portfolio: 40 domains x 150 daily dates, revenue from two years before."""
+    return PortfolioSpec(n_domains=40, n_dates=150, seed=11)
+
+
+@pytest.fixture(scope='session')
+def portfolio_dir(tmp_path_factory, portfolio_spec):
+    """portfolio_spec written to disk: tabs/<tab>.csv and bucket/<file> (see write_portfolio)."""
+    out_dir = tmp_path_factory.mktemp('portfolio')
+    write_portfolio(portfolio_spec, str(out_dir), archived=20)
+    return out_dir
+
+
+@pytest.fixture(scope='session')
+def synced_bucket(tmp_path_factory, portfolio_dir):
+    """The bucket after one pinned-clock sync of the portfolio tabs over its bucket snapshot."""
+    from devtools.fake_s3 import InMemoryS3
+    from devtools.sync_harness import load_tabs, run_sync
+
+    body, s3, _ = run_sync(load_tabs(str(portfolio_dir / 'tabs')), s3=InMemoryS3(seed_dir=str(portfolio_dir / 'bucket')),
+                           quiet=True)
+    assert body['statusCode'] == 200, body
+    out_dir = tmp_path_factory.mktemp('synced')
+    s3.dump_dir(str(out_dir))
+    return out_dir
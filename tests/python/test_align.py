@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from analysis.align import align_traffic, method_columns
+
+
+# The per-row helpers align_traffic replaced (run_analysis.py before the join rewrite)
+
+def get_month_end(month_date):
+    return month_date + pd.offsets.MonthEnd(0)
+
+
+def get_same_month_latest(traffic_df, website, month_date):
+    month_start = month_date.replace(day=1)
+    month_end = get_month_end(month_date)
+    mask = (traffic_df['website'] == website) & (traffic_df['date'] >= month_start) & (traffic_df['date'] <= month_end)
+    subset = traffic_df[mask]
+    if len(subset) == 0:
+        return np.nan
+    return subset.loc[subset['date'].idxmax(), 'traffic']
+
+
+def get_same_month_avg(traffic_df, website, month_date):
+    month_start = month_date.replace(day=1)
+    month_end = get_month_end(month_date)
+    mask = (traffic_df['website'] == website) & (traffic_df['date'] >= month_start) & (traffic_df['date'] <= month_end)
+    subset = traffic_df[mask]
+    if len(subset) == 0:
+        return np.nan
+    return subset['traffic'].mean()
+
+
+def get_lagged_traffic(traffic_df, website, month_date, lag_days):
+    month_end = get_month_end(month_date)
+    target_date = month_end - pd.Timedelta(days=lag_days)
+    website_traffic = traffic_df[traffic_df['website'] == website]
+    if len(website_traffic) == 0:
+        return np.nan
+    website_traffic = website_traffic.copy()
+    website_traffic['date_diff'] = (website_traffic['date'] - target_date).abs()
+    closest = website_traffic.loc[website_traffic['date_diff'].idxmin()]
+    if closest['date_diff'].days > 30:
+        return np.nan
+    return closest['traffic']
+
+
+def reference_align(revenue_df, traffic_df):
+    combined = revenue_df[['website', 'month', 'niche', 'revenue']].reset_index(drop=True).copy()
+    rows = list(zip(combined['website'], combined['month']))
+    combined['traffic_latest'] = [get_same_month_latest(traffic_df, w, m) for w, m in rows]
+    combined['traffic_avg'] = [get_same_month_avg(traffic_df, w, m) for w, m in rows]
+    for lag in (30, 60):
+        combined[f'traffic_lag{lag}'] = [get_lagged_traffic(traffic_df, w, m, lag) for w, m in rows]
+    for col in method_columns():
+        combined[col] = combined[col].astype(np.float64)
+    return combined
+
+
+def frames(revenue_rows, traffic_rows):
+    revenue = pd.DataFrame(revenue_rows, columns=['website', 'month', 'revenue'])
+    revenue['month'] = pd.to_datetime(revenue['month'])
+    revenue['niche'] = 'Tech'
+    traffic = pd.DataFrame(traffic_rows, columns=['website', 'date', 'traffic'])
+    traffic['date'] = pd.to_datetime(traffic['date'])
+    traffic['traffic'] = traffic['traffic'].astype(np.float64)
+    return revenue, traffic
+
+
+def test_align_matches_per_row_helpers_on_edge_cases():
+    revenue, traffic = frames(
+        [('a.com', '2025-03-01', 100.0),
+         ('a.com', '2025-04-01', 120.0),
+         ('b.com', '2025-03-01', 50.0),
+         ('c.com', '2025-03-01', 10.0),   # no traffic at all
+         ('d.com', '2025-06-01', 10.0)],  # nearest snapshot beyond tolerance
+        [('a.com', '2025-03-01', 1000),
+         ('a.com', '2025-03-31', 1100),
+         ('a.com', '2025-03-31', 1500),   # duplicate date: the first row wins
+         # Both 1 day from Mar 31 - 60 = Jan 30: the earlier row in the frame wins
+         ('a.com', '2025-01-31', 700),
+         ('a.com', '2025-01-29', 650),
+         ('b.com', '2025-03-15', 400),   # target Mar 1 for lag30: 14 days away
+         ('b.com', '2025-02-15', 300),   # 14 days the other way, later in the frame
+         ('d.com', '2025-03-01', 5)])
+
+    expected = reference_align(revenue, traffic)
+    result = align_traffic(revenue, traffic)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.loc[0, 'traffic_latest'] == 1100
+    assert result.loc[0, 'traffic_lag60'] == 700
+    assert result.loc[2, 'traffic_lag30'] == 400
+    assert result.loc[3, method_columns()].isna().all()
+    assert np.isnan(result.loc[4, 'traffic_lag30'])
+
+
+def test_align_matches_per_row_helpers_on_random_snapshots():
+    rng = np.random.default_rng(5)
+    sites = [f'site{i}.com' for i in range(8)]
+    days = pd.date_range('2024-10-01', '2025-06-30', freq='D')
+
+    traffic_rows = []
+    for site in sites:
+        # Sparse, irregular snapshots with gaps longer than the lag tolerance
+        picked = np.sort(rng.choice(len(days), size=rng.integers(5, 60), replace=False))
+        traffic_rows += [(site, days[i], float(rng.integers(0, 5000))) for i in picked]
+    order = rng.permutation(len(traffic_rows))
+    traffic_rows = [traffic_rows[i] for i in order]
+
+    months = pd.date_range('2024-09-01', '2025-07-01', freq='MS')
+    revenue_rows = [(site, month, float(rng.integers(1, 500))) for site in sites for month in months
+                    if rng.random() < 0.7]
+
+    revenue, traffic = frames(revenue_rows, traffic_rows)
+    pd.testing.assert_frame_equal(align_traffic(revenue, traffic), reference_align(revenue, traffic))
+
+
+def test_align_empty_revenue_keeps_columns():
+    revenue, traffic = frames([], [('a.com', '2025-03-01', 1)])
+    result = align_traffic(revenue, traffic)
+    assert list(result.columns) == ['website', 'month', 'niche', 'revenue'] + method_columns()
+    assert len(result) == 0
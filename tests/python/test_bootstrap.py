@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr
+
+from analysis.bootstrap import INTERVAL_COLUMNS, correlation_intervals
+
+
+def cells():
+    rng = np.random.default_rng(9)
+    x = rng.lognormal(size=120)
+    y = 0.5 * x + rng.normal(size=120)
+    y[::11] = np.nan
+    noise = rng.normal(size=60)
+    return {
+        'related': (x, y),
+        'unrelated': (noise, rng.normal(size=60)),
+        'too-few': (np.array([1.0, 2.0, np.nan]), np.array([3.0, 4.0, 5.0])),
+    }
+
+
+def test_intervals_do_not_depend_on_workers_or_batching():
+    serial = correlation_intervals(cells(), n_resamples=400, seed=3, batch_size=400, workers=1)
+    pooled = correlation_intervals(cells(), n_resamples=400, seed=3, batch_size=400, workers=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+    reseeded = correlation_intervals(cells(), n_resamples=400, seed=4, batch_size=400, workers=1)
+    assert not np.isclose(reseeded.loc['related', 'pearson_lo'], serial.loc['related', 'pearson_lo'])
+
+
+def test_intervals_bracket_the_observed_correlation():
+    intervals = correlation_intervals(cells(), n_resamples=500, seed=0, batch_size=128, workers=1)
+    assert list(intervals.columns) == INTERVAL_COLUMNS
+
+    x, y = cells()['related']
+    keep = ~np.isnan(y)
+    related = intervals.loc['related']
+    assert related['n'] == keep.sum()
+    assert np.isclose(related['pearson_r'], pearsonr(x[keep], y[keep])[0])
+    assert related['pearson_lo'] <= related['pearson_r'] <= related['pearson_hi']
+    assert related['spearman_lo'] <= related['spearman_r'] <= related['spearman_hi']
+    assert related['pearson_perm_p'] < 0.01
+    assert intervals.loc['unrelated', 'pearson_perm_p'] > 0.01
+
+    too_few = intervals.loc['too-few']
+    assert too_few['n'] == 2
+    assert too_few.drop('n').isna().all()
@@ -0,0 +1,103 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from analysis.forecast import (MIN_HISTORY, STALE_MONTHS, _horizon_paths, fit_forecast, forecast_document,
+                               future_months, parameter_grid)
+
+
+def series(n_months, level=7.0, slope=0.0, amplitude=0.0, phase=0.0):
+    """Monthly values whose log1p is a line plus a 12-month sine."""
+    t = np.arange(n_months)
+    return np.expm1(level + slope * t + amplitude * np.sin(2 * np.pi * t / 12 + phase))
+
+
+def test_recovers_seasonal_and_trend_series():
+    truth = np.stack([
+        series(54, slope=0.01, amplitude=0.3),
+        series(54, level=5.0, slope=-0.015, amplitude=0.2, phase=1.0),
+        series(54, level=9.0, amplitude=0.4),
+        series(54, level=6.0),
+    ])
+    result = fit_forecast(truth[:, :48], horizon=6)
+
+    assert result['fitted'].all() and result['seasonal'].all()
+    np.testing.assert_allclose(result['mean'], truth[:, 48:], rtol=0.015)
+    assert np.isfinite(result['params']).all()
+
+
+def test_short_history_gets_the_damped_trend_only():
+    truth = series(26, slope=0.02)
+    result = fit_forecast(truth[None, :20], horizon=6)
+
+    assert result['fitted'][0] and not result['seasonal'][0]
+    assert result['params'][0, 2] == 0.0  # gamma
+    np.testing.assert_allclose(result['mean'][0], truth[20:], rtol=0.015)
+
+
+def test_stale_and_short_rows_are_not_fitted():
+    n_months = 30
+    values = np.tile(series(n_months, slope=0.01), (4, 1))
+    values[0, n_months - STALE_MONTHS:] = np.nan         # nothing in the last STALE_MONTHS months
+    values[1, :n_months - MIN_HISTORY + 1] = np.nan      # one month short of MIN_HISTORY
+    values[2, :n_months - MIN_HISTORY] = np.nan          # exactly MIN_HISTORY
+    values[3, n_months - STALE_MONTHS + 1:] = np.nan     # last observation just inside the window
+
+    result = fit_forecast(values)
+
+    assert result['fitted'].tolist() == [False, False, True, True]
+    assert np.isnan(result['mean'][:2]).all() and np.isnan(result['params'][:2]).all()
+    assert np.isfinite(result['mean'][2:]).all()
+    assert fit_forecast(values, min_history=MIN_HISTORY + 1)['fitted'].tolist() == [False, False, False, True]
+
+
+def test_intervals_are_ordered_and_widen():
+    rng = np.random.default_rng(4)
+    values = np.stack([series(40, level=rng.uniform(3, 9), slope=rng.normal(0, 0.02), amplitude=rng.uniform(0, 0.5))
+                       for _ in range(60)])
+    values *= np.exp(rng.normal(0, 0.15, values.shape))
+    values[rng.random(values.shape) < 0.1] = np.nan
+
+    result = fit_forecast(values, horizon=9)
+    mean, lower, upper = (result[key][result['fitted']] for key in ('mean', 'lower', 'upper'))
+
+    assert result['fitted'].sum() > 50
+    assert (lower <= mean).all() and (mean <= upper).all()
+    assert (lower >= 0).all()
+    width = np.log1p(upper) - np.log1p(lower)
+    assert (np.diff(width, axis=1) >= -1e-9).all()
+
+    narrow = fit_forecast(values, horizon=9, interval=0.5)
+    assert (narrow['upper'][result['fitted']] <= upper).all()
+
+
+def test_horizon_paths_follow_the_damped_trend_and_season():
+    grid = parameter_grid(seasonal=True)
+    best = np.array([np.flatnonzero((grid[0] == 0.5) & (grid[1] == 0.0) & (grid[2] == 0.0) & (grid[3] == 0.9))[0]])
+    season = np.arange(12, dtype=float)[None, :] / 10
+    mean, spread = _horizon_paths(grid, best, np.array([2.0]), np.array([0.1]), season, n_t=25, m=12, horizon=3)
+
+    # Columns 25..27 fall in calendar slots 1..3; trend adds 0.9, 0.9 + 0.81, ...
+    np.testing.assert_allclose(mean[0], [2.0 + 0.09 + 0.1, 2.0 + 0.171 + 0.2, 2.0 + 0.2439 + 0.3])
+    # With beta = gamma = 0 the variance grows by alpha^2 per step
+    np.testing.assert_allclose(spread[0], np.sqrt([1.0, 1.25, 1.5]))
+
+
+def test_future_months_cross_the_year_boundary():
+    assert future_months(date(2025, 11, 1), 4) == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1),
+                                                   date(2026, 3, 1)]
+    assert future_months(pd.Timestamp('2025-12-01'), 2) == [date(2026, 1, 1), date(2026, 2, 1)]
+    assert future_months(date(2025, 1, 1), 0) == []
+
+
+def test_forecast_document_dates_and_fitted_domains():
+    months = [date(2024, 1, 1) + pd.DateOffset(months=i) for i in range(24)]
+    values = np.stack([series(24, slope=0.01), np.full(24, np.nan)])
+    doc = forecast_document({'revenue': (['a.com', 'b.com'], months, values), 'traffic_monthly': ([], [], None)},
+                            horizon=3, generated_at='2026-01-15T06:00:00Z')
+
+    assert doc['generated_at'] == '2026-01-15T06:00:00Z'
+    assert list(doc['series']['revenue']) == ['a.com']
+    assert doc['series']['revenue']['a.com']['dates'] == ['Jan 1 2026', 'Feb 1 2026', 'Mar 1 2026']
+    assert doc['series']['traffic_monthly'] == {}
@@ -0,0 +1,39 @@
+import numpy as np
+from scipy.stats import pearsonr, spearmanr
+
+from analysis.align import align_traffic
+from analysis.lagsweep import lagged_matrix, masked_pearson, masked_spearman
+from analysis.loaders import load_revenue_long, load_traffic_long
+
+
+def test_lagged_matrix_matches_align_lags(synced_bucket):
+    revenue = load_revenue_long(str(synced_bucket / 'revenue-history.csv'))
+    traffic = load_traffic_long(str(synced_bucket / 'traffic-data.csv'))
+    revenue = revenue[revenue['month'] >= traffic['date'].min().replace(day=1)].reset_index(drop=True)
+
+    aligned = align_traffic(revenue, traffic, lags=(30, 60))
+    matrix = lagged_matrix(revenue, traffic, [30, 60])
+
+    np.testing.assert_array_equal(matrix[0], aligned['traffic_lag30'].to_numpy())
+    np.testing.assert_array_equal(matrix[1], aligned['traffic_lag60'].to_numpy())
+    assert np.isfinite(matrix).any()
+
+
+def test_masked_correlations_match_scipy_on_present_pairs():
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=(4, 40))
+    y = x * rng.uniform(0.2, 2, size=(4, 1)) + rng.normal(size=(4, 40))
+    x[rng.random(x.shape) < 0.2] = np.nan
+    y[rng.random(y.shape) < 0.2] = np.nan
+    y[3, 2:] = np.nan  # too few pairs
+
+    r, p, n = masked_pearson(x, y)
+    rho, rho_p, _ = masked_spearman(x, y)
+    for row in range(3):
+        keep = ~np.isnan(x[row]) & ~np.isnan(y[row])
+        assert n[row] == keep.sum()
+        expected_r, expected_p = pearsonr(x[row][keep], y[row][keep])
+        expected_rho, expected_rho_p = spearmanr(x[row][keep], y[row][keep])
+        assert np.isclose(r[row], expected_r) and np.isclose(p[row], expected_p)
+        assert np.isclose(rho[row], expected_rho) and np.isclose(rho_p[row], expected_rho_p)
+    assert np.isnan(r[3]) and np.isnan(p[3]) and np.isnan(rho[3])
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from analysis import lake
+from analysis.pipeline import Pipeline
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture(scope='module')
+def lake_dir(tmp_path_factory, portfolio_dir):
+    out_dir = tmp_path_factory.mktemp('lake')
+    lake.write_lake(lake.load_sources(src_dir=str(portfolio_dir / 'bucket')), str(out_dir))
+    return out_dir
+
+
+def test_analysis_frames_match_csv_dtypes(lake_dir, portfolio_dir):
+    revenue_long, traffic_long = lake.load_analysis_frames(str(lake_dir))
+    csv = Pipeline([], src_dir=str(portfolio_dir / 'bucket'), lake_dir=str(portfolio_dir / 'no-lake'),
+                   store_dir=str(portfolio_dir / 'no-store'), cache_dir=None, verbose=False)
+    csv_load = csv._stage_load()
+    assert revenue_long['website'].dtype == traffic_long['website'].dtype
+    assert list(revenue_long.columns) == ['website', 'niche', 'month', 'revenue']
+    assert list(traffic_long.columns) == ['website', 'date', 'traffic']
+    assert revenue_long['month'].dtype == traffic_long['date'].dtype
+    assert csv_load['revenue_records'] == len(revenue_long)
+    assert csv_load['traffic_records'] == len(traffic_long)
+
+
+def test_lake_align_matches_csv_align(lake_dir, portfolio_dir, portfolio_spec):
+    sites = portfolio_spec.domains
+    outputs = []
+    for lake_root in (portfolio_dir / 'no-lake', lake_dir):
+        pipeline = Pipeline(sites, src_dir=str(portfolio_dir / 'bucket'), lake_dir=str(lake_root),
+                            store_dir=str(portfolio_dir / 'no-store'), cache_dir=None, verbose=False)
+        aligned = pipeline.get('align')
+        outputs.append(aligned.sort_values(['website', 'month'], kind='mergesort').reset_index(drop=True))
+
+    from_csv, from_lake = outputs
+    assert len(from_csv) > 0
+    assert from_csv['traffic_lag30'].notna().any()
+    pd.testing.assert_frame_equal(from_lake, from_csv)
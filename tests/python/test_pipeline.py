@@ -0,0 +1,110 @@
+import csv
+import re
+import shutil
+
+import pandas as pd
+import pytest
+
+from analysis.pipeline import STAGES, Pipeline
+
+
+@pytest.fixture
+def src_dir(tmp_path, synced_bucket):
+    """A private copy of the synced CSVs, so a test can edit its revenue."""
+    for name in ('revenue-history.csv', 'traffic-data.csv'):
+        shutil.copy(synced_bucket / name, tmp_path / name)
+    return tmp_path
+
+
+@pytest.fixture
+def sites(portfolio_spec):
+    return portfolio_spec.domains
+
+
+def run_pipeline(src_dir, sites, capsys, seed=0):
+    pipeline = Pipeline(sites, src_dir=str(src_dir), lake_dir=str(src_dir / 'no-lake'),
+                        store_dir=str(src_dir / 'no-store'), cache_dir=str(src_dir / 'cache'),
+                        n_resamples=50, seed=seed)
+    capsys.readouterr()
+    outputs = pipeline.run()
+    return outputs, capsys.readouterr().out
+
+
+def stage_status(log):
+    """{stage: 'cached' | 'computed'} from the pipeline's log lines."""
+    return dict(re.findall(r'(\w+): (cached|computed)', log))
+
+
+def months_reused(log):
+    reused, total = re.search(r'align: (\d+)/(\d+) months reused', log).groups()
+    return int(reused), int(total)
+
+
+def test_second_run_is_served_from_cache(src_dir, sites, capsys):
+    first, log = run_pipeline(src_dir, sites, capsys)
+    assert set(stage_status(log).values()) == {'computed'}
+    assert months_reused(log)[0] == 0
+
+    second, log = run_pipeline(src_dir, sites, capsys)
+    assert stage_status(log) == {stage: 'cached' for stage in STAGES}
+    pd.testing.assert_frame_equal(second['align'], first['align'])
+
+
+def test_revenue_edit_recomputes_only_its_month(src_dir, sites, capsys):
+    first, _ = run_pipeline(src_dir, sites, capsys)
+    aligned_months = first['align']['month'].dt.strftime('%b %Y').unique()
+
+    path = src_dir / 'revenue-history.csv'
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    header = rows[0]
+    column = header.index(aligned_months[len(aligned_months) // 2])
+    site_row = next(row for row in rows[1:] if row[header.index('Website')] == sites[0])
+    site_row[column] = '$12,345.00'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f, lineterminator='\n').writerows(rows)
+
+    second, log = run_pipeline(src_dir, sites, capsys)
+    status = stage_status(log)
+    assert status['load'] == 'computed' and status['align'] == 'computed'
+    reused, total = months_reused(log)
+    assert (reused, total) == (len(aligned_months) - 1, len(aligned_months))
+
+    changed = second['align'].compare(first['align'])
+    assert len(changed) == 1
+    assert second['align'].loc[changed.index[0], 'revenue'] == 12345.0
+
+
+def test_seed_change_reuses_aligned_months(src_dir, sites, capsys):
+    first, _ = run_pipeline(src_dir, sites, capsys)
+    second, log = run_pipeline(src_dir, sites, capsys, seed=1)
+
+    # Every stage key includes the parameters, but the per-month align entries don't
+    assert stage_status(log)['intervals'] == 'computed'
+    reused, total = months_reused(log)
+    assert reused == total
+    pd.testing.assert_frame_equal(second['align'], first['align'])
+
+
+def test_align_deletes_month_entries_from_older_keys(src_dir, sites, capsys):
+    first, log = run_pipeline(src_dir, sites, capsys)
+    align_dir = src_dir / 'cache' / 'align-months'
+    entries = set(align_dir.glob('*.pkl'))
+    assert len(entries) == months_reused(log)[1]
+    (align_dir / 'unrelated.tmp').write_bytes(b'')
+
+    # Drop one aligned month's revenue: its old entry is no longer used by any month
+    path = src_dir / 'revenue-history.csv'
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    column = rows[0].index(first['align']['month'].dt.strftime('%b %Y').unique()[1])
+    for row in rows[1:]:
+        row[column] = '$1.00' if row[column].startswith('$') else row[column]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f, lineterminator='\n').writerows(rows)
+
+    _, log = run_pipeline(src_dir, sites, capsys)
+    assert 'align: removed 1 stale month entries' in log
+    remaining = set(align_dir.glob('*.pkl'))
+    assert len(remaining) == len(entries) and len(entries - remaining) == 1
+    assert (align_dir / 'unrelated.tmp').exists()
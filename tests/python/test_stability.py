@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+
+from analysis.stability import (QUADRANTS, STABILITY_COLUMNS, classify_quadrants, monthly_average_matrix,
+                                site_stability, stability_document)
+from devtools.sync_harness import load_sync_module, run_sync
+
+
+# The per-site loop and row-wise classifier stability.py replaced
+# (run_analysis_with_visuals.py section 7 before the rewrite)
+
+def reference_stability(sites, values):
+    records = []
+    for website, row in zip(sites, values):
+        traffic_values = row[~np.isnan(row)]
+        if len(traffic_values) < 3:
+            continue
+        mean_traffic = np.mean(traffic_values)
+        std_traffic = np.std(traffic_values)
+        cv = std_traffic / mean_traffic if mean_traffic > 0 else np.nan
+        x = np.arange(len(traffic_values))
+        slope, intercept, r_value, _, _ = linregress(x, traffic_values)
+        residual_std = np.std(traffic_values - (slope * x + intercept))
+        records.append({
+            'website': website,
+            'mean_traffic': mean_traffic,
+            'std_traffic': std_traffic,
+            'cv': cv,
+            'trend_slope': slope,
+            'slope_pct_per_period': 100 * slope / mean_traffic if mean_traffic > 0 else 0,
+            'trend_adjusted_cv': residual_std / mean_traffic if mean_traffic > 0 else np.nan,
+            'trend_r_squared': r_value ** 2 if not np.isnan(r_value) else np.nan,
+            'n_traffic_months': len(traffic_values)
+        })
+    return pd.DataFrame(records, columns=STABILITY_COLUMNS)
+
+
+def classify_site(row, median_cv):
+    if pd.isna(row['cv']) or pd.isna(row['slope_pct_per_period']):
+        return 'Unknown'
+    is_stable = row['cv'] <= median_cv
+    is_growing = row['slope_pct_per_period'] > 0
+    if is_stable and is_growing:
+        return 'Stable + Growing'
+    elif is_stable and not is_growing:
+        return 'Stable + Declining'
+    elif not is_stable and is_growing:
+        return 'Volatile + Growing'
+    return 'Volatile + Declining'
+
+
+def random_matrix(seed=3, n_sites=60, n_months=18):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(6, 1, size=(n_sites, 1)) * (1 + rng.normal(0, 0.02, size=(n_sites, 1)) * np.arange(n_months))
+    values *= np.exp(rng.normal(0, rng.uniform(0.01, 0.5, size=(n_sites, 1)), size=values.shape))
+    values[rng.random(values.shape) < 0.3] = np.nan   # months without a snapshot
+    values[0] = np.nan
+    values[0, [2, 9]] = 100.0                         # too few months
+    values[1] = np.nan
+    values[1, ::2] = 250.0                            # flat: NaN R^2
+    values[2, :] = 0.0                                # zero mean: NaN CV
+    sites = np.array([f'site{i:02d}.com' for i in range(n_sites)], dtype=object)
+    return sites, values
+
+
+def test_stability_matches_per_site_linregress():
+    sites, values = random_matrix()
+    expected = reference_stability(sites, values)
+    result = site_stability(sites=sites, values=values)
+
+    pd.testing.assert_frame_equal(result.drop(columns='n_traffic_months'),
+                                  expected.drop(columns='n_traffic_months'), rtol=1e-9, atol=1e-9)
+    assert result['n_traffic_months'].tolist() == expected['n_traffic_months'].tolist()
+    assert 'site00.com' not in set(result['website'])
+    assert np.isnan(result.loc[result['website'] == 'site01.com', 'trend_r_squared']).all()
+
+
+def test_long_table_and_matrix_paths_agree():
+    rng = np.random.default_rng(8)
+    dates = pd.date_range('2025-01-01', '2025-09-30', freq='D')
+    rows = [(site, day, float(rng.integers(0, 3000)))
+            for site in ('b.com', 'a.com', 'c.com') for day in dates if rng.random() < 0.2]
+    traffic = pd.DataFrame(rows, columns=['website', 'date', 'traffic'])
+
+    sites, months, values = monthly_average_matrix(traffic)
+    assert list(sites) == ['a.com', 'b.com', 'c.com']
+    assert len(months) == 9
+    march = traffic[(traffic['website'] == 'b.com') & (traffic['date'].dt.month == 3)]['traffic']
+    assert values[1, months.get_loc(pd.Period('2025-03', 'M'))] == march.mean()
+
+    pd.testing.assert_frame_equal(site_stability(traffic), site_stability(sites=sites, values=values))
+
+
+def test_quadrants_match_row_wise_classifier():
+    sites, values = random_matrix(seed=5)
+    stability = site_stability(sites=sites, values=values)
+    stability.loc[3, 'slope_pct_per_period'] = np.nan
+    median_cv = stability['cv'].median()
+
+    labels = classify_quadrants(stability['cv'], stability['slope_pct_per_period'])
+    expected = stability.apply(classify_site, axis=1, median_cv=median_cv)
+    assert labels.tolist() == expected.tolist()
+    assert set(labels) == set(QUADRANTS) | {'Unknown'}
+
+    # A CV equal to the split counts as stable
+    split = stability.loc[4, 'cv']
+    labels = classify_quadrants(stability['cv'], stability['slope_pct_per_period'], median_cv=split)
+    assert labels.tolist() == stability.apply(classify_site, axis=1, median_cv=split).tolist()
+    assert labels[4].startswith('Stable')
+
+
+def test_stability_document_is_plain_json():
+    sites, values = random_matrix()
+    doc = stability_document(list(sites), values, generated_at='2026-01-15T06:00:00Z')
+    expected = reference_stability(sites, values).set_index('website')
+
+    json.dumps(doc, allow_nan=False)
+    assert list(doc['sites']) == list(expected.index)
+    assert sum(doc['quadrants'].values()) == len(doc['sites'])
+    assert doc['sites']['site01.com']['trend_r_squared'] is None
+    assert doc['sites']['site02.com']['cv'] is None and doc['sites']['site02.com']['quadrant'] == 'Unknown'
+    site = doc['sites']['site10.com']
+    assert site['n_traffic_months'] == expected.loc['site10.com', 'n_traffic_months']
+    assert site['cv'] == round(expected.loc['site10.com', 'cv'], 6)
+
+
+def test_sync_publishes_stability_from_the_forecast_matrix(portfolio_dir):
+    from devtools.fake_s3 import InMemoryS3
+    from devtools.sync_harness import load_tabs
+
+    tabs = load_tabs(str(portfolio_dir / 'tabs'))
+    body, s3, log = run_sync(tabs, s3=InMemoryS3(seed_dir=str(portfolio_dir / 'bucket')), quiet=True)
+    assert body['statusCode'] == 200, body
+    assert 'STEP 2d: Traffic Stability' in log
+
+    published = json.loads(s3.get_object(Bucket='traffic-dashboard-theta', Key='stability.json')['Body'].read())
+    traffic = s3.get_object(Bucket='traffic-dashboard-theta', Key='traffic-data.csv')['Body'].read().decode('utf-8')
+    sync = load_sync_module()
+    rows = list(csv.reader(io.StringIO(traffic)))
+    domains, _, matrix = sync.monthly_matrices({'traffic_monthly': rows})['traffic_monthly']
+    expected = stability_document(domains, matrix, generated_at=published['generated_at'])
+
+    assert published == json.loads(json.dumps(expected))
+    assert len(published['sites']) > 0
+    sync_log = json.loads(s3.get_object(Bucket='traffic-dashboard-theta', Key='sync-log.json')['Body'].read())
+    assert sync_log['files']['stability.json']['status'] == 'success'
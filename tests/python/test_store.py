@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from analysis import store
+from analysis.loaders import load_traffic_long
+from analysis.pipeline import Pipeline
+
+
+def test_load_traffic_long_matches_csv_loader(synced_bucket):
+    matrix = store.open_store(str(synced_bucket / 'matrix'), 'traffic_monthly')
+    sites = matrix.domains[::3] + ['not-in-the-store.com']
+
+    from_store = store.load_traffic_long(matrix, sites)
+    from_csv = load_traffic_long(str(synced_bucket / 'traffic-data.csv'))
+    from_csv = from_csv[from_csv['website'].isin(sites)].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(from_store, from_csv)
+    assert store.count_present(matrix, chunk_rows=7) == len(load_traffic_long(str(synced_bucket / 'traffic-data.csv')))
+
+
+def test_pipeline_reads_traffic_from_store(synced_bucket, portfolio_spec):
+    sites = portfolio_spec.domains
+    outputs = []
+    for store_dir in (synced_bucket / 'no-store', synced_bucket / 'matrix'):
+        pipeline = Pipeline(sites, src_dir=str(synced_bucket), lake_dir=str(synced_bucket / 'no-lake'),
+                            store_dir=str(store_dir), cache_dir=None, verbose=False)
+        outputs.append((pipeline._uses_store(), pipeline.get('load'), pipeline.get('align')))
+
+    (csv_store, csv_load, csv_align), (uses_store, store_load, store_align) = outputs
+    assert not csv_store and uses_store
+    assert store_load['traffic_records'] == csv_load['traffic_records']
+    pd.testing.assert_frame_equal(store_load['traffic'], csv_load['traffic'])
+    pd.testing.assert_frame_equal(store_align, csv_align)
+    assert np.isfinite(store_align['traffic_avg']).any()
+
+
+def test_monthly_matrix_matches_groupby_in_any_chunking(synced_bucket):
+    matrix = store.open_store(str(synced_bucket / 'matrix'), 'traffic_monthly')
+    long = store.load_traffic_long(matrix)
+    long['month'] = long['date'].dt.to_period('M')
+    grouped = long.sort_values('date', kind='mergesort').groupby(['website', 'month'])['traffic']
+
+    for how, reference in (('avg', grouped.mean()), ('latest', grouped.last())):
+        months, values = store.monthly_matrix(matrix, how=how, chunk_rows=7)
+        np.testing.assert_array_equal(values, store.monthly_matrix(matrix, how=how, chunk_rows=len(matrix.domains))[1])
+
+        expected = reference.unstack().reindex(index=matrix.domains, columns=pd.PeriodIndex(months.astype(str), freq='M'))
+        np.testing.assert_allclose(values, expected.to_numpy(dtype=float), rtol=1e-12)
+        assert np.isnan(values).any() and np.isfinite(values).any()
@@ -0,0 +1,489 @@
+"""
+Offline sync tests through devtools/sync_harness.py.
+
+fixtures/sync/ holds a small synthetic portfolio (15 domains, 60 dates, the
+oldest 10 archived out of the sheet): tabs/ is the sheet, seed/ the bucket
+before the sync, expected/ the nine CSVs the sync writes. expected/ is the
+output of the Lambda before the streaming/windowed rewrite, so any change
+that alters a byte of the exports fails here - regenerate it only for a
+change that is meant to alter the output.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from devtools import fake_s3
+from devtools.fake_s3 import InMemoryS3
+from devtools.sync_harness import DEFAULT_NOW, fake_sheets_session, load_sync_module, load_tabs, run_sync
+from devtools.synthetic import daily_header
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sync')
+EXPECTED_FILES = sorted(os.listdir(os.path.join(FIXTURES, 'expected')))
+HISTORY_TABS = ('Traffic Monthly', 'Traffic Average', 'DR')
+
+
+@pytest.fixture
+def sync():
+    return load_sync_module()
+
+
+def fixture_tabs():
+    return load_tabs(os.path.join(FIXTURES, 'tabs'))
+
+
+def fixture_bucket():
+    return InMemoryS3(seed_dir=os.path.join(FIXTURES, 'seed'))
+
+
+def read_object(s3, key):
+    return s3.get_object(Bucket='traffic-dashboard-theta', Key=key)['Body'].read()
+
+
+def assert_exports_equal(s3, expected):
+    """The nine CSV exports in s3 match expected ({file name: bytes}) byte for byte."""
+    for name in EXPECTED_FILES:
+        assert read_object(s3, name) == expected[name], name
+
+
+def expected_exports():
+    exports = {}
+    for name in EXPECTED_FILES:
+        with open(os.path.join(FIXTURES, 'expected', name), 'rb') as f:
+            exports[name] = f.read()
+    return exports
+
+
+def test_sync_matches_expected_exports():
+    body, s3, _ = run_sync(fixture_tabs(), s3=fixture_bucket(), quiet=True)
+
+    assert body['statusCode'] == 200, body
+    assert not body.get('errors')
+    assert len(EXPECTED_FILES) == 9
+    assert_exports_equal(s3, expected_exports())
+
+
+def test_multipart_upload_matches_single_put(sync, monkeypatch):
+    # Parts small enough that every export goes up in several of them
+    monkeypatch.setattr(sync, 'UPLOAD_PART_BYTES', 1024)
+    monkeypatch.setattr(fake_s3, 'MIN_PART_BYTES', 1024)
+
+    s3 = fixture_bucket()
+    started = []
+    create_upload = s3.create_multipart_upload
+
+    def counting_create(**kwargs):
+        started.append(kwargs['Key'])
+        return create_upload(**kwargs)
+
+    s3.create_multipart_upload = counting_create
+    body, s3, _ = run_sync(fixture_tabs(), s3=s3, quiet=True)
+
+    assert body['statusCode'] == 200, body
+    expected = expected_exports()
+    assert sorted(set(started)) == [name for name in EXPECTED_FILES if '-priority' not in name]
+    assert_exports_equal(s3, expected)
+    assert not s3._multipart, 'multipart uploads left open'
+
+
+def test_failed_stream_aborts_upload(sync, monkeypatch):
+    monkeypatch.setattr(sync, 'UPLOAD_PART_BYTES', 1024)
+    monkeypatch.setattr(fake_s3, 'MIN_PART_BYTES', 1024)
+    s3 = InMemoryS3()
+
+    def rows():
+        yield ['Website', 'Jan 1 - 2026']
+        for i in range(200):
+            yield [f'site{i}.com', str(i)]
+        raise RuntimeError('sheet went away')
+
+    with pytest.raises(RuntimeError):
+        sync.stream_tab_to_s3(s3, rows(), 'broken.csv')
+    assert not s3._multipart
+    with pytest.raises(Exception):
+        read_object(s3, 'broken.csv')
+
+
+def with_new_day(sync, tabs):
+    """
+    The tabs one day later: a new date column after the newest one (and its
+    '_1' twin in Traffic Monthly) and an edited recent cell; older columns
+    are unchanged, as in the real sheet. Returns (tabs, new date header).
+    """
+    changed = {}
+    new_header = None
+    for tab, rows in tabs.items():
+        rows = [list(row) for row in rows]
+        changed[tab] = rows
+        if tab == 'Revenue':
+            continue
+        header_idx = 3 if tab == 'Traffic Average' else 0
+        header = rows[header_idx]
+        width = len(header)
+        for row in rows[header_idx:]:
+            row.extend([''] * (width - len(row)))
+
+        dated = [(idx, sync.column_date(col)) for idx, col in enumerate(header)
+                 if sync.column_date(col) and not str(col).endswith('_1')]
+        last_idx, (year, month, day) = dated[-1]
+        new_header = daily_header(datetime(year, month, day).date() + timedelta(days=1))
+
+        inserts = [(last_idx + 1, last_idx, new_header)]
+        if tab == 'Traffic Monthly':
+            last_twin = max(idx for idx, col in enumerate(header) if str(col).endswith('_1'))
+            inserts.append((last_twin + 1, last_twin, new_header + '_1'))
+        for at, source, label in sorted(inserts, reverse=True):
+            header.insert(at, label)
+            for row in rows[header_idx + 1:]:
+                row.insert(at, row[source])
+
+        first = rows[header_idx + 1]
+        first[last_idx] = '12,345'
+    return changed, new_header
+
+
+def synced_once(tmp_path):
+    """Bucket directory after a first sync of the fixture tabs, and its sync-state.json."""
+    body, s3, _ = run_sync(fixture_tabs(), s3=fixture_bucket(), quiet=True)
+    assert body['statusCode'] == 200, body
+    s3.dump_dir(str(tmp_path / 'after-first'))
+    return tmp_path / 'after-first', json.loads(read_object(s3, 'sync-state.json'))['tabs']
+
+
+def second_run(bucket_dir, tabs, keep_state=True):
+    s3 = InMemoryS3(seed_dir=str(bucket_dir))
+    if not keep_state:
+        s3.delete_object(Bucket='traffic-dashboard-theta', Key='sync-state.json')
+    later = datetime.fromisoformat(DEFAULT_NOW) + timedelta(hours=2)
+    body, s3, log = run_sync(tabs, s3=s3, now=later, quiet=True)
+    assert body['statusCode'] == 200, body
+    return s3, log
+
+
+def test_second_run_reads_column_window(sync, tmp_path):
+    bucket_dir, before = synced_once(tmp_path)
+    tabs, new_header = with_new_day(sync, fixture_tabs())
+
+    # With sync-state.json the history tabs read only their recent columns,
+    # without it they are read in full; the exports must not differ
+    window_s3, window_log = second_run(bucket_dir, tabs)
+    full_s3, full_log = second_run(bucket_dir, tabs, keep_state=False)
+    assert window_log.count('(column window)') == len(HISTORY_TABS)
+    assert '(column window)' not in full_log
+    for name in EXPECTED_FILES:
+        assert read_object(window_s3, name) == read_object(full_s3, name), name
+
+    # The first run wrote the copies in domain order, so both runs stream them
+    assert 'not in domain order' not in window_log + full_log
+    assert window_log.count('Streaming existing') == len(HISTORY_TABS)
+
+    traffic_header = read_object(window_s3, 'traffic-data.csv').split(b'\n', 1)[0].decode('utf-8')
+    assert new_header in traffic_header.split(',')
+
+    after = json.loads(read_object(window_s3, 'sync-state.json'))['tabs']
+    for tab in HISTORY_TABS:
+        # A window read keeps the last full read's time; the newest column moves on
+        assert after[tab]['last_full_read'] == before[tab]['last_full_read']
+        assert after[tab]['newest_date_column'] != before[tab]['newest_date_column']
+
+
+def test_window_read_falls_back_for_new_domain(sync, tmp_path):
+    bucket_dir, before = synced_once(tmp_path)
+    tabs, _ = with_new_day(sync, fixture_tabs())
+    for tab in HISTORY_TABS:
+        rows = tabs[tab]
+        added = list(rows[-1])
+        added[1] = 'aaa-new-site.com'  # sorts first, before any S3 row streams by
+        rows.append(added)
+
+    window_s3, window_log = second_run(bucket_dir, tabs)
+    full_s3, _ = second_run(bucket_dir, tabs, keep_state=False)
+    assert window_log.count('not in the S3 copy yet, falling back to a full read') == len(HISTORY_TABS)
+    for name in EXPECTED_FILES:
+        assert read_object(window_s3, name) == read_object(full_s3, name), name
+    assert b'aaa-new-site.com' in read_object(window_s3, 'traffic-data.csv')
+
+    after = json.loads(read_object(window_s3, 'sync-state.json'))['tabs']
+    for tab in HISTORY_TABS:
+        assert after[tab]['last_full_read'] != before[tab]['last_full_read']
+
+
+def test_second_run_downloads_each_history_copy_once(sync, tmp_path):
+    bucket_dir, _ = synced_once(tmp_path)
+    s3 = InMemoryS3(seed_dir=str(bucket_dir))
+    reads = []
+    get_object = s3.get_object
+
+    def counting_get(**kwargs):
+        reads.append(kwargs['Key'])
+        return get_object(**kwargs)
+
+    s3.get_object = counting_get
+    body, s3, _ = run_sync(fixture_tabs(), s3=s3, quiet=True)
+    assert body['statusCode'] == 200, body
+
+    # The merge streams each S3 copy once; the CSV metadata comes from the upload
+    csv_reads = sorted(key for key in reads if key.endswith('.csv'))
+    assert csv_reads == ['DR History.csv', 'internal-average-traffic.csv', 'traffic-data.csv']
+
+    logged = json.loads(read_object(s3, 'sync-log.json'))['csv_metadata']
+    downloaded = sync.extract_csv_metadata(s3)
+    for name, metadata in downloaded.items():
+        assert {key: logged[name][key] for key in metadata} == metadata, name
+
+
+def test_sync_log_summary_never_reads_history_back(sync, monkeypatch):
+    monkeypatch.setattr(sync, 'SUMMARY_HISTORY_RUNS', 3)
+    s3 = fixture_bucket()
+    history_reads = []
+    get_object, list_objects = s3.get_object, s3.list_objects_v2
+
+    def counting_get(**kwargs):
+        if kwargs['Key'].startswith('sync-history/'):
+            history_reads.append(kwargs['Key'])
+        return get_object(**kwargs)
+
+    def counting_list(**kwargs):
+        if kwargs.get('Prefix', '').startswith('sync-history'):
+            history_reads.append(kwargs['Prefix'])
+        return list_objects(**kwargs)
+
+    s3.get_object, s3.list_objects_v2 = counting_get, counting_list
+    times = ['2026-01-14T23:30:00', '2026-01-15T00:00:00', '2026-01-15T00:30:00', '2026-01-15T01:00:00']
+    for now in times:
+        body, s3, _ = run_sync(fixture_tabs(), s3=s3, now=now, quiet=True)
+        assert body['statusCode'] == 200, body
+
+    assert history_reads == []
+    history = json.loads(read_object(s3, 'sync-log.json'))['history']
+    assert [entry['timestamp'] for entry in history] == [t + 'Z' for t in reversed(times[1:])]
+    assert all('stages' not in entry for entry in history)
+    records = list_objects(Bucket='traffic-dashboard-theta', Prefix='sync-history/')['Contents']
+    assert len(records) == len(times)
+
+
+def test_overlapping_runs_keep_their_history_records(sync):
+    s3 = fixture_bucket()
+    times = ['2026-01-15T00:00:00', '2026-01-15T00:30:00', '2026-01-15T01:00:00']
+    run_sync(fixture_tabs(), s3=s3, now=times[0], quiet=True)
+
+    # The second run overlaps the third and writes sync-log.json last, from a
+    # read taken before the third run had written anything
+    stale_log = read_object(s3, 'sync-log.json')
+    run_sync(fixture_tabs(), s3=s3, now=times[2], quiet=True)
+    s3.put_object(Bucket='traffic-dashboard-theta', Key='sync-log.json', Body=stale_log)
+    run_sync(fixture_tabs(), s3=s3, now=times[1], quiet=True)
+
+    # The summary can miss the third run; its record in the partition stays
+    history = json.loads(read_object(s3, 'sync-log.json'))['history']
+    assert [entry['timestamp'] for entry in history] == [times[1] + 'Z', times[0] + 'Z']
+    records = s3.list_objects_v2(Bucket='traffic-dashboard-theta', Prefix='sync-history/')['Contents']
+    stamps = sorted(json.loads(read_object(s3, r['Key']))['timestamp'] for r in records)
+    assert stamps == [t + 'Z' for t in times]
+    assert all('stages' in json.loads(read_object(s3, r['Key'])) for r in records)
+
+
+def test_sync_log_summary_carries_the_previous_runs(sync):
+    s3 = fixture_bucket()
+    older = [{'timestamp': f'2026-01-1{day}T06:00:00Z', 'status': 'success'} for day in (4, 3)]
+    s3.put_object(Bucket='traffic-dashboard-theta', Key='sync-log.json',
+                  Body=json.dumps({'history': older}).encode('utf-8'))
+    run_sync(fixture_tabs(), s3=s3, quiet=True)
+
+    history = json.loads(read_object(s3, 'sync-log.json'))['history']
+    assert [entry['timestamp'] for entry in history] == [DEFAULT_NOW + 'Z'] + [e['timestamp'] for e in older]
+
+
+# ---- series pyramid ------------------------------------------------------
+
+def test_downsample_keeps_min_and_max_per_bucket(sync):
+    from datetime import date
+    points = [(date(2025, 6, 1), 5.0),                          # a Sunday: alone in the week of May 26
+              (date(2025, 6, 2), 10.0), (date(2025, 6, 3), 40.0), (date(2025, 6, 4), 20.0),
+              (date(2025, 6, 5), 3.0), (date(2025, 6, 8), 30.0),   # max before min in the week of Jun 2
+              (date(2025, 6, 9), 7.0), (date(2025, 6, 10), 7.0),   # flat week
+              (date(2025, 6, 30), 12.0), (date(2025, 7, 1), 50.0)]  # one week, two months
+
+    assert sync.downsample_min_max(points, 'weekly') == [
+        (date(2025, 6, 1), 5.0), (date(2025, 6, 3), 40.0), (date(2025, 6, 5), 3.0),
+        (date(2025, 6, 9), 7.0), (date(2025, 6, 30), 12.0), (date(2025, 7, 1), 50.0)]
+    assert sync.downsample_min_max(points, 'monthly') == [
+        (date(2025, 6, 3), 40.0), (date(2025, 6, 5), 3.0), (date(2025, 7, 1), 50.0)]
+    assert sync.downsample_min_max([], 'weekly') == []
+
+
+def test_series_pyramid_levels_and_formatting(sync):
+    from datetime import date
+    days = [date(2025, 6, 1) + timedelta(days=i) for i in range(21)]
+    values = ['1,200', '', '0', '2.5', '-'] + [str(100 + i) for i in range(16)]
+    csv_data = [['Website', 'Niche'] + [daily_header(d) for d in days],
+                ['Site.COM', 'Tech'] + values,
+                ['empty.com', 'Tech'] + [''] * len(days)]
+
+    doc = sync.build_series_pyramid({'traffic_monthly': csv_data})
+    assert doc['levels'] == ['daily', 'weekly', 'monthly']
+    assert list(doc['series']['traffic_monthly']) == ['site.com']
+
+    levels = doc['series']['traffic_monthly']['site.com']
+    # Week of May 26: Jun 1 only; week of Jun 2: Jun 4 (2.5) .. Jun 8 (102); then Jun 9..15, Jun 16..21
+    assert levels['weekly'] == {'dates': ['Jun 1 2025', 'Jun 4 2025', 'Jun 8 2025', 'Jun 9 2025', 'Jun 15 2025',
+                                          'Jun 16 2025', 'Jun 21 2025'],
+                                'values': [1200, 2.5, 102, 103, 109, 110, 115]}
+    assert levels['monthly'] == {'dates': ['Jun 1 2025', 'Jun 4 2025'], 'values': [1200, 2.5]}
+
+
+# ---- request scheduler ---------------------------------------------------
+
+def client_error(sync, code, status):
+    return sync.ClientError({'Error': {'Code': code, 'Message': code},
+                             'ResponseMetadata': {'HTTPStatusCode': status}}, 'PutObject')
+
+
+def make_scheduler(sync, sleeps, **kwargs):
+    return sync.RequestScheduler({'s3': (1000.0, 1000)}, sleep=sleeps.append, **kwargs)
+
+
+def test_scheduler_retries_throttled_requests(sync):
+    sleeps = []
+    scheduler = make_scheduler(sync, sleeps)
+    failures = [client_error(sync, 'SlowDown', 503), client_error(sync, 'SlowDown', 503)]
+
+    def request():
+        if failures:
+            raise failures.pop()
+        return 'ok'
+
+    assert scheduler.call('s3', request) == 'ok'
+    stats = scheduler.summary()['s3']
+    assert (stats['requests'], stats['attempts'], stats['retries'], stats['throttled'], stats['failed']) == (1, 3, 2, 2, 0)
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= sync.BACKOFF_BASE_SECONDS * 2 for delay in sleeps)
+
+
+def test_scheduler_does_not_retry_or_count_expected_errors(sync):
+    sleeps = []
+    scheduler = make_scheduler(sync, sleeps)
+
+    def request():
+        raise client_error(sync, 'NoSuchKey', 404)
+
+    with pytest.raises(sync.ClientError):
+        scheduler.call('s3', request)
+    stats = scheduler.summary()['s3']
+    assert (stats['attempts'], stats['retries'], stats['failed']) == (1, 0, 0)
+    assert sleeps == []
+
+
+def test_scheduler_gives_up_after_max_retries(sync):
+    sleeps = []
+    scheduler = make_scheduler(sync, sleeps, max_retries=2)
+
+    def request():
+        raise client_error(sync, 'InternalError', 500)
+
+    with pytest.raises(sync.ClientError):
+        scheduler.call('s3', request)
+    stats = scheduler.summary()['s3']
+    assert (stats['attempts'], stats['retries'], stats['failed']) == (3, 2, 1)
+
+
+def test_scheduler_hedges_slow_reads(sync):
+    scheduler = sync.RequestScheduler({'sheets': (1000.0, 1000)}, hedge_after={'sheets': 0.05})
+    release = threading.Event()
+    calls = []
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            calls.append(len(calls))
+            attempt = calls[-1]
+        if attempt == 0:
+            release.wait(5)  # the first attempt stalls until the test ends
+            return 'slow'
+        return 'fast'
+
+    try:
+        assert scheduler.call('sheets', request, hedge=True) == 'fast'
+    finally:
+        release.set()
+        scheduler.close()
+    stats = scheduler.summary()['sheets']
+    assert (stats['hedged'], stats['hedge_wins'], stats['attempts']) == (1, 1, 2)
+
+
+# ---- Sheets session ------------------------------------------------------
+
+def request_params(request):
+    return {name: values if len(values) > 1 else values[0] for name, values in parse_qs(urlsplit(request.url).query).items()}
+
+
+def test_sheets_session_request_and_response_shape(sync):
+    tabs = fixture_tabs()
+    session, adapter = fake_sheets_session(tabs)
+
+    values = sync.read_sheet_data(session, sync.TRAFFIC_DR_SHEET_ID, 'Traffic Monthly')
+    assert values == [row[:max(i + 1 for i, cell in enumerate(row) if cell)] for row in tabs['Traffic Monthly']]
+    request = adapter.requests[-1]
+    assert request.method == 'GET' and request.headers['Accept-Encoding'] == 'gzip'
+    assert urlsplit(request.url).path == f"/v4/spreadsheets/{sync.TRAFFIC_DR_SHEET_ID}/values/%27Traffic%20Monthly%27"
+    assert request_params(request) == {'valueRenderOption': 'FORMATTED_VALUE', 'dateTimeRenderOption': 'FORMATTED_STRING'}
+
+    result = session.spreadsheets().values().batchGet(spreadsheetId=sync.REVENUE_SHEET_ID,
+                                                      ranges=["'Revenue'!A1:D2", "'Revenue'!3:3"]).execute()
+    assert urlsplit(adapter.requests[-1].url).path == f"/v4/spreadsheets/{sync.REVENUE_SHEET_ID}/values:batchGet"
+    assert request_params(adapter.requests[-1]) == {'ranges': ["'Revenue'!A1:D2", "'Revenue'!3:3"]}
+    assert [r['values'] for r in result['valueRanges']] == [[row[:4] for row in tabs['Revenue'][:2]],
+                                                            [tabs['Revenue'][2]]]
+
+
+def test_sheets_value_render_reaches_every_read(sync, monkeypatch):
+    monkeypatch.setattr(sync, 'SHEETS_VALUE_RENDER', 'UNFORMATTED_VALUE')
+    session, adapter = fake_sheets_session(fixture_tabs())
+    body, _, _ = run_sync(session, s3=fixture_bucket(), quiet=True)
+
+    assert body['statusCode'] == 200, body
+    assert len(adapter.requests) >= 5
+    assert {request_params(r)['valueRenderOption'] for r in adapter.requests} == {'UNFORMATTED_VALUE'}
+
+
+def test_sheets_errors_map_into_the_scheduler(sync, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sync, '_scheduler', sync.RequestScheduler({'sheets': (1000.0, 1000)}, sleep=sleeps.append,
+                                                                  max_retries=3))
+
+    # 429 and 5xx are retried (after the server's Retry-After), the read then succeeds
+    session, adapter = fake_sheets_session(fixture_tabs(), fail=[429, 503, 500])
+    assert session.get_values(sync.TRAFFIC_DR_SHEET_ID, "'DR'!1:1")['values'][0][1] == 'Website'
+    stats = sync._scheduler.summary()['sheets']
+    assert (stats['requests'], stats['attempts'], stats['retries'], stats['throttled'], stats['failed']) == (1, 4, 3, 1, 0)
+    assert sleeps == [0.0, 0.0, 0.0]
+
+    # An API error (unknown tab -> 400) is raised at once with the API's error body
+    with pytest.raises(sync.requests.HTTPError) as error:
+        session.get_values(sync.TRAFFIC_DR_SHEET_ID, "'Missing'")
+    assert error.value.response.status_code == 400
+    assert error.value.response.json()['error']['status'] == 'INVALID_ARGUMENT'
+    assert sync._scheduler.summary()['sheets']['attempts'] == 5
+
+    # Out of retries: the last 503 surfaces and counts as failed
+    adapter.fail = [503] * 4
+    with pytest.raises(sync.requests.HTTPError):
+        session.get_values(sync.TRAFFIC_DR_SHEET_ID, "'DR'!1:1")
+    assert sync._scheduler.summary()['sheets']['failed'] == 1
+
+
+def test_sync_over_sheets_session_survives_throttling():
+    session, adapter = fake_sheets_session(fixture_tabs(), fail=[429, 503])
+    body, s3, _ = run_sync(session, s3=fixture_bucket(), quiet=True)
+
+    assert body['statusCode'] == 200, body
+    assert not body.get('errors')
+    assert_exports_equal(s3, expected_exports())
+    record = s3.list_objects_v2(Bucket='traffic-dashboard-theta', Prefix='sync-history/')['Contents'][0]
+    sheets = json.loads(read_object(s3, record['Key']))['requests']['sheets']
+    assert (sheets['retries'], sheets['throttled'], sheets['failed']) == (2, 1, 0)
+    assert sheets['attempts'] == len(adapter.requests)
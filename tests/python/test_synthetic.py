@@ -0,0 +1,90 @@
+import csv
+import os
+
+import numpy as np
+
+from analysis.pipeline import Pipeline
+from devtools.synthetic import (TAB_FILES, PortfolioSpec, daily_header, generate_tabs, load_top_sites,
+                                write_portfolio)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def test_same_arguments_give_the_same_tabs():
+    first = generate_tabs(PortfolioSpec(n_domains=12, n_dates=40, seed=5))
+    assert first == generate_tabs(PortfolioSpec(n_domains=12, n_dates=40, seed=5))
+    assert first != generate_tabs(PortfolioSpec(n_domains=12, n_dates=40, seed=6))
+
+
+def test_tab_shapes_and_headers(portfolio_spec):
+    tabs = generate_tabs(portfolio_spec)
+    n_dates = len(portfolio_spec.dates)
+    assert set(tabs) == set(TAB_FILES)
+
+    traffic = tabs['Traffic Monthly']
+    assert traffic[0][0].startswith('Last update ')
+    assert traffic[0][1:6] == ['Website', 'Niche', 'Status', 'Live Date', 'Notes']
+    assert traffic[0][6] == daily_header(portfolio_spec.dates[0])
+    assert traffic[0][6 + n_dates] == daily_header(portfolio_spec.dates[0]) + '_1'
+    assert len(traffic) == portfolio_spec.n_domains + 1
+    assert {len(row) for row in traffic} == {6 + 2 * n_dates}
+    assert [row[1] for row in traffic[1:]] == portfolio_spec.domains
+
+    average = tabs['Traffic Average']
+    assert average[3][:2] == ['Agent', 'Website'] and len(average) == portfolio_spec.n_domains + 4
+
+    revenue = tabs['Revenue']
+    assert revenue[0][3] == 'Website' and revenue[0][-2:] == ['Total', 'Count']
+    assert len(revenue[0]) == 5 + len(portfolio_spec.months) + 2
+    assert revenue[-1][3] == 'Unmatched Payments'
+    future = revenue[0].index('Feb 2026')
+    assert {row[c] for row in revenue[1:-1] for c in range(future, len(revenue[0]) - 2)} <= {'-', 'x'}
+
+
+def test_archived_columns_stay_in_the_bucket(portfolio_dir, portfolio_spec):
+    sheet = read_csv(portfolio_dir / 'tabs' / 'DR.csv')
+    bucket = read_csv(portfolio_dir / 'bucket' / 'DR History.csv')
+    assert sheet[0][6] == daily_header(portfolio_spec.dates[20])
+    assert bucket[0][6] == daily_header(portfolio_spec.dates[0])
+    assert bucket[0][26:] == sheet[0][6:]
+    assert [row[1] for row in bucket] == [row[1] for row in sheet]
+
+    # Both Traffic Monthly blocks (internal, then '_1' Ahrefs) keep the archived dates
+    sheet = read_csv(portfolio_dir / 'tabs' / 'Traffic Monthly.csv')[0]
+    bucket = read_csv(portfolio_dir / 'bucket' / 'traffic-data.csv')[0]
+    assert len(bucket) - len(sheet) == 40
+    assert set(sheet) < set(bucket) and daily_header(portfolio_spec.dates[0]) + '_1' in bucket
+
+    # RD is not merged with history by the sync, so its snapshot loses the columns too
+    assert read_csv(portfolio_dir / 'bucket' / 'RD History.csv')[0] == read_csv(portfolio_dir / 'tabs' / 'RD.csv')[0]
+    # Metadata rows above the Traffic Average header are stripped in the bucket
+    assert read_csv(portfolio_dir / 'bucket' / 'internal-average-traffic.csv')[0][:2] == ['Agent', 'Website']
+
+
+def test_top_sites_name_the_highest_revenue_domains(tmp_path):
+    names = load_top_sites(os.path.join(REPO_ROOT, 'run_analysis.py'))
+    assert len(names) == 250 and names[0] == 'decoratoradvice.com'
+
+    plain = PortfolioSpec(n_domains=300, n_dates=60, seed=9)
+    spec = PortfolioSpec(n_domains=300, n_dates=60, seed=9, site_names=names[:20])
+    np.testing.assert_array_equal(spec.base, plain.base)   # same model, only names change
+
+    expected = spec.base + np.log(spec.rpm)
+    named = [spec.domains.index(name) for name in names[:20]]
+    assert expected[named].tolist() == sorted(expected[named], reverse=True)
+    assert expected[named].min() >= np.delete(expected, named).max()
+    assert len({d.lower() for d in spec.domains}) == spec.n_domains
+
+    # The analysis loaders (TOP_250_LOWER) now find the named sites in the bucket exports
+    write_portfolio(spec, str(tmp_path), tabs=['Traffic Monthly', 'Revenue'])
+    pipeline = Pipeline([n.lower() for n in names], src_dir=str(tmp_path / 'bucket'), lake_dir=str(tmp_path / 'no-lake'),
+                        store_dir=str(tmp_path / 'no-store'), cache_dir=None, verbose=False)
+    loaded = pipeline.get('load')
+    top = {n.lower() for n in names[:20]}
+    for frame in (loaded['traffic'], loaded['revenue']):   # less any not live in the window
+        assert set(frame['website']) <= top and frame['website'].nunique() >= 15